@@ -81,10 +81,16 @@ def _register_default_key_commands():
          'search_dash.py', 'Search in Dash'),
         ('R', UIKeyModifier.COMMAND | UIKeyModifier.SHIFT,
          'run_quickly.py', 'Run quickly...'),
+        ('F', UIKeyModifier.COMMAND | UIKeyModifier.SHIFT,
+         'find_in_files.py', 'Find in files...'),
+        ('O', UIKeyModifier.COMMAND | UIKeyModifier.CONTROL,
+         'open_symbol_quickly.py', 'Open symbol quickly...'),
         ('A', UIKeyModifier.COMMAND | UIKeyModifier.SHIFT,
          'action_quickly.py', 'Action quickly...'),
         ('B', UIKeyModifier.control | UIKeyModifier.SHIFT,
          'analyze.py', 'Analyze & Check style'),
+        ('B', UIKeyModifier.COMMAND | UIKeyModifier.CONTROL,
+         'analyze_project.py', 'Analyze project'),
         ('K', UIKeyModifier.COMMAND | UIKeyModifier.SHIFT,
          'clear_annotations.py', 'Clear annotations'),
         ('U', UIKeyModifier.COMMAND,
@@ -101,6 +107,8 @@ def _register_default_key_commands():
          'show_documentation.py', 'Show documentation'),
         ('R', UIKeyModifier.COMMAND | UIKeyModifier.ALTERNATE,
          'refactoring/rename.py', 'Refactor - Rename'),
+        ('R', UIKeyModifier.COMMAND | UIKeyModifier.ALTERNATE | UIKeyModifier.SHIFT,
+         'refactoring/rename_in_project.py', 'Refactor - Rename in project'),
         ('O', UIKeyModifier.COMMAND | UIKeyModifier.ALTERNATE,
          'refactoring/organize_imports.py', 'Refactor - Organize imports'),
         ('E', UIKeyModifier.COMMAND | UIKeyModifier.ALTERNATE,
@@ -170,6 +178,14 @@ def _check_for_updates():
     blackmamba.update.check()
 
 
+@system.Pythonista(appex=False)
+def _start_continuous_analysis():
+    from blackmamba.bundle import load
+    load('analyze')
+    from blackmamba.script.analyze import start_continuous_analysis
+    start_continuous_analysis()
+
+
 @system.Pythonista()
 @system.catch_exceptions
 def _main(config=None):
@@ -193,6 +209,8 @@ def _main(config=None):
     if get_config_value('general.register_key_commands', True):
         _register_default_key_commands()
         _register_ios11_default_key_commands()
+    if get_config_value('analyzer.continuous', False):
+        _start_continuous_analysis()
     info('Black Mamba initialized')
     _check_for_updates()
 
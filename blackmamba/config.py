@@ -1,5 +1,5 @@
 #!python3
-from collections import Mapping
+from collections.abc import Mapping
 from copy import deepcopy
 
 __all__ = ['get_config_value']
@@ -19,11 +19,14 @@ _DEFAULTS = {
             '': ['.git'],
             '.': ['.Trash', 'Examples',
                   'site-packages', 'site-packages-2', 'site-packages-3']
-        }
+        },
+        'gitignore': False
     },
     'analyzer': {
         'hud_alert_delay': 1.0,
         'remove_whitespaces': True,
+        'continuous': False,
+        'continuous_delay': 1.0,
         'flake8': [
             # 1st pass
             ['--select=E901,E999,F821,F822,F823'],
@@ -40,7 +43,8 @@ _DEFAULTS = {
             '': ['.git'],
             '.': ['.Trash', 'Examples',
                   'site-packages', 'site-packages-2', 'site-packages-3', 'stash_extensions']
-        }
+        },
+        'gitignore': False
     },
     'documentation': {
         'reuse': True,
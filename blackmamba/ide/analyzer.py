@@ -0,0 +1,881 @@
+#!python3
+
+"""Python source code analysis.
+
+Analyzers run in process on the source text, results are returned as
+`Violation` tuples. Nothing is written to or read from the file system.
+
+`Analyzer` keeps the last analyzed source & results of every file and checks
+only changed parts of the source.
+
+.. warning:: This module must not introduce dependency on the ``editor`` module.
+"""
+
+import os
+import re
+import sys
+import threading
+from bisect import bisect_right
+from collections import namedtuple, OrderedDict
+from difflib import SequenceMatcher
+from blackmamba.util.path import find_project_root
+
+
+Violation = namedtuple('Violation', ['code', 'line', 'column', 'text'])
+Violation.__doc__ = """Reported violation.
+
+Attributes:
+    code: Violation code (``E501``, ``F401``, ...).
+    line: Line number (starts from 1).
+    column: Column number (starts from 1).
+    text: Violation message without the code.
+"""
+
+
+_CODE_REGEX = re.compile(r'\A[A-Z]+\d*\Z')
+_DOC_CODES_REGEX = re.compile(r'\b[A-Z]\d\d\d\b')
+_LINE_REFERENCE_REGEX = re.compile(r'\bline \d+')
+_CONFIG_TYPES = (str, int, float, bool, list, tuple, type(None))
+
+
+def _doc_codes(check):
+    return _DOC_CODES_REGEX.findall(getattr(check, '__doc__', None) or '')
+
+
+def _is_stateful(check, parameters):
+    # Results of stateful checks depend on the whole source, they're never
+    # skipped for unchanged lines. E101 changes indent_char of the checker.
+    return 'checker_state' in parameters or 'E101' in _doc_codes(check)
+
+
+def _may_report_selected(plugin, decider):
+    # Plugin entry point name is the code prefix (F, C90, ...) or the plugin
+    # lists reported codes in the docstring (pycodestyle checks)
+    from flake8.style_guide import Decision
+
+    name = plugin['name']
+    if _CODE_REGEX.match(name):
+        return (
+            decider.decision_for(name) is Decision.Selected or
+            any(code.startswith(name) for code in decider.all_selected + decider.extended_selected)
+        )
+
+    codes = _doc_codes(plugin['plugin'])
+    return not codes or any(decider.decision_for(code) is Decision.Selected for code in codes)
+
+
+def _sorted(violations):
+    return sorted(violations, key=lambda x: (x.line, x.column))
+
+
+class _SharedSource:
+    # Lines, tokens and AST shared by all analyzers, created lazily
+    def __init__(self, lines):
+        if lines and lines[0].startswith('\uFEFF'):
+            lines[0] = lines[0][1:]
+
+        self.lines = lines
+        self._tokens = None
+        self._token_error = None
+        self._tree = None
+        self._tree_error = None
+
+    def tokens(self):
+        # Returns tuple (list of tuples (token, number of lines read by tokenizer), tokenizer error)
+        if self._tokens is None:
+            import tokenize
+
+            lines = self.lines
+            read = 0
+
+            def readline():
+                nonlocal read
+                if read >= len(lines):
+                    return ''
+                read += 1
+                return lines[read - 1]
+
+            self._tokens = []
+            try:
+                for token in tokenize.generate_tokens(readline):
+                    self._tokens.append((token, read))
+            except (tokenize.TokenError, SyntaxError) as e:
+                self._token_error = e
+
+        return self._tokens, self._token_error
+
+    def tree(self):
+        if self._tree is None and self._tree_error is None:
+            from ast import PyCF_ONLY_AST
+
+            try:
+                self._tree = compile(''.join(self.lines), '', 'exec', PyCF_ONLY_AST)
+            except (ValueError, SyntaxError, TypeError) as e:
+                self._tree_error = e
+
+        if self._tree_error:
+            raise self._tree_error
+
+        return self._tree
+
+    def signature(self):
+        # Significant tokens, equal signatures = equal AST (except locations)
+        import tokenize
+
+        ignored = (tokenize.COMMENT, tokenize.NL)
+        structural = (tokenize.INDENT, tokenize.DEDENT, tokenize.NEWLINE, tokenize.ENDMARKER)
+
+        return [
+            (token.type, '' if token.type in structural else token.string)
+            for token, _ in self.tokens()[0]
+            if token.type not in ignored
+        ]
+
+    def indent_char(self):
+        return next((line[0] for line in self.lines if line[:1] in ' \t'), None)
+
+    def blocks(self):
+        # Returns tuple (block start rows, rows where the first logical line
+        # of the block ends). Block is a top level statement.
+        import tokenize
+
+        skipped = (tokenize.NL, tokenize.COMMENT, tokenize.INDENT, tokenize.DEDENT, tokenize.ENDMARKER)
+
+        starts = []
+        ends = []
+        line_start = True
+
+        for token, _ in self.tokens()[0]:
+            if token.type in skipped:
+                continue
+
+            if line_start:
+                line_start = False
+                if token.start[1] == 0:
+                    starts.append(token.start[0])
+                    ends.append(None)
+
+            if token.type == tokenize.NEWLINE:
+                line_start = True
+                if ends and ends[-1] is None:
+                    ends[-1] = token.start[0]
+
+        if not starts or starts[0] != 1:
+            # Comments & blank lines before the first statement
+            starts.insert(0, 1)
+            ends.insert(0, 1)
+
+        return starts, [end or len(self.lines) for end in ends]
+
+    def logical_lines(self):
+        # Returns list of tuples (first row, last row) of logical lines. Brackets
+        # are counted as pep8 & flake8 do, even the unbalanced ones.
+        import tokenize
+
+        lines = []
+        first = None
+        parens = 0
+
+        for token, _ in self.tokens()[0]:
+            if first is None:
+                if token.type == tokenize.NL:
+                    continue
+                first = token.start[0]
+
+            if token.type == tokenize.OP:
+                if token.string in '([{':
+                    parens += 1
+                elif token.string in ')]}':
+                    parens -= 1
+            elif not parens and token.type in (tokenize.NEWLINE, tokenize.NL):
+                lines.append((first, token.end[0]))
+                first = None
+
+        if first is not None:
+            lines.append((first, len(self.lines)))
+
+        return lines
+
+
+class _LineDiff:
+    # Line diff of two sources, common prefix & suffix is skipped before
+    # the (slow) SequenceMatcher is used
+    def __init__(self, old, new):
+        count = min(len(old), len(new))
+
+        prefix = 0
+        while prefix < count and old[prefix] == new[prefix]:
+            prefix += 1
+
+        suffix = 0
+        while suffix < count - prefix and old[-1 - suffix] == new[-1 - suffix]:
+            suffix += 1
+
+        matcher = SequenceMatcher(None, old[prefix:len(old) - suffix], new[prefix:len(new) - suffix], autojunk=False)
+        opcodes = [
+            (tag, i1 + prefix, i2 + prefix, j1 + prefix, j2 + prefix)
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        ]
+
+        # Equal blocks (old index, new index, length)
+        self._equal = [(0, 0, prefix)]
+        self._equal.extend((i1, j1, i2 - i1) for tag, i1, i2, j1, j2 in opcodes if tag == 'equal')
+        self._equal.append((len(old) - suffix, len(new) - suffix, suffix))
+        self._old_starts = [x[0] for x in self._equal]
+
+        self.changes = [(j1, j2) for tag, i1, i2, j1, j2 in opcodes if tag != 'equal']
+        self.shifted = any(i != j for i, j, length in self._equal if length)
+
+    def map_line(self, line):
+        # Maps old line number to the new one, None if the line was changed
+        index = line - 1
+        old, new, length = self._equal[bisect_right(self._old_starts, index) - 1]
+        if old <= index < old + length:
+            return new + index - old + 1
+        return None
+
+
+class _Scope:
+    # Rows (line numbers) to check
+    def __init__(self, source, diff, signature_changed):
+        self.diff = diff
+        self.signature_changed = signature_changed
+        self.rows = set()
+
+        count = len(source.lines)
+        starts, ends = source.blocks()
+
+        for begin, end in diff.changes:
+            # Changed lines and lines around (deletions, trailing lines checks, ...)
+            first = bisect_right(starts, max(begin, 1)) - 1
+            last = bisect_right(starts, min(end + 1, count)) - 1
+
+            if last + 1 < len(starts):
+                # Blank lines checks of the next block first logical line
+                # depend on the previous block
+                self.rows.update(range(starts[first], ends[last + 1] + 1))
+            else:
+                self.rows.update(range(starts[first], count + 1))
+
+        # Logical lines crossing the scope boundary (backslash continuations,
+        # unbalanced brackets, ...) are checked as a whole and the following
+        # logical line too, because its blank lines checks depend on it
+        follow = False
+        for first, last in source.logical_lines() if self.rows else ():
+            covered = self.covers(first, last)
+            if covered or follow:
+                follow = covered and last not in self.rows
+                self.rows.update(range(first, last + 1))
+
+    def covers(self, first, last):
+        return any(row in self.rows for row in range(first, last + 1))
+
+    def remap(self, violations, stateful_codes=()):
+        # Violations of unchanged rows, stateful checks violations are dropped
+        result = []
+        for v in violations:
+            if stateful_codes and v.code.startswith(stateful_codes):
+                continue
+
+            line = self.diff.map_line(v.line)
+            if line is None or line in self.rows:
+                continue
+
+            result.append(v._replace(line=line))
+
+        return result
+
+    def remap_module(self, violations):
+        # Module (AST) violations if they can be reused, None otherwise
+        if self.signature_changed:
+            return None
+
+        result = []
+        for v in violations:
+            line = self.diff.map_line(v.line)
+            if line is None or (self.diff.shifted and _LINE_REFERENCE_REGEX.search(v.text)):
+                return None
+
+            result.append(v._replace(line=line))
+
+        return result
+
+
+#
+# flake8
+#
+
+def _shared_checker_class():
+    # flake8 is imported lazily, it's available only when the analyze bundle is loaded
+    from flake8.checker import FileChecker
+    from flake8.processor import FileProcessor
+    from flake8.exceptions import InvalidSyntax
+
+    class _SharedProcessor(FileProcessor):
+        # Replays shared tokens instead of tokenizing lines again
+        def __init__(self, filename, options, source):
+            self._source = source
+            super().__init__(filename, options, lines=source.lines)
+
+        @property
+        def file_tokens(self):
+            tokens, error = self._source.tokens()
+            if error:
+                raise InvalidSyntax(exception=error)
+            return [token for token, _ in tokens]
+
+        def generate_tokens(self):
+            tokens, error = self._source.tokens()
+
+            for token, read in tokens:
+                # Processor state (line_number, indent_char, ...) is updated
+                # as if lines were read by the tokenizer
+                while self.line_number < read:
+                    self.next_line()
+
+                if token[2][0] > self.total_lines:
+                    break
+
+                self.tokens.append(token)
+                yield token
+            else:
+                if error:
+                    raise InvalidSyntax(exception=error)
+
+        def build_ast(self):
+            return self._source.tree()
+
+    class _SharedChecker(FileChecker):
+        # Checks shared source instead of the file content. Only stateful
+        # checks run for rows out of scope, AST checks run only if module is True.
+        def __init__(self, filename, source, checks, options, scope=None, scope_checks=None, module=True):
+            self._source = source
+            self._scope = scope
+            self._scope_checks = scope_checks
+            self._module = module
+            self.module_results = 0
+            super().__init__(filename, checks, options)
+
+        def _make_processor(self):
+            return _SharedProcessor(self.filename, self.options, self._source)
+
+        def _run_out_of_scope(self, run, *args):
+            checks = self.checks
+            self.checks = self._scope_checks
+            try:
+                run(*args)
+            finally:
+                self.checks = checks
+
+        def run_logical_checks(self):
+            tokens = self.processor.tokens
+            if self._scope is None or not tokens or self._scope.covers(tokens[0][2][0], tokens[-1][3][0]):
+                super().run_logical_checks()
+            else:
+                self._run_out_of_scope(super().run_logical_checks)
+
+        def run_physical_checks(self, physical_line, override_error_line=None):
+            if self._scope is None or self.processor.line_number in self._scope.rows:
+                super().run_physical_checks(physical_line, override_error_line)
+            else:
+                self._run_out_of_scope(super().run_physical_checks, physical_line, override_error_line)
+
+        def run_ast_checks(self):
+            # Results of AST checks are at the end of the results list
+            self.module_results = len(self.results)
+            if self._module:
+                super().run_ast_checks()
+
+    return _SharedChecker
+
+
+class _Flake8:
+    # Parsed options, loaded plugins & decision engine of one flake8 pass
+    def __init__(self, arguments, root):
+        import flake8
+        from flake8.main import application
+
+        app = application.Application()
+        # Arguments start with the program name, project root is passed to find
+        # configuration files (setup.cfg, tox.ini, ...)
+        app.initialize(['flake8'] + list(arguments) + [root])
+
+        self.options = app.options
+        # Effective options (command line & configuration files) and versions
+        self.config = {
+            'python': list(sys.version_info[:2]),
+            'flake8': flake8.__version__,
+            'plugins': app.option_manager.generate_versions(),
+            'options': {
+                name: value
+                for name, value in vars(app.options).items()
+                if isinstance(value, _CONFIG_TYPES)
+            }
+        }
+        self.decider = app.guide.decider
+        # Plugins, which can't report any selected code, are not executed
+        self.checks = {
+            kind: [plugin for plugin in plugins if _may_report_selected(plugin, self.decider)]
+            for kind, plugins in app.check_plugins.to_dictionary().items()
+        }
+
+        stateful = [
+            plugin
+            for kind in ('logical_line_plugins', 'physical_line_plugins')
+            for plugin in self.checks[kind]
+            if _is_stateful(plugin['plugin'], plugin['parameters'])
+        ]
+        # Checks for rows out of scope
+        self.scope_checks = {
+            kind: [plugin for plugin in plugins if plugin in stateful]
+            for kind, plugins in self.checks.items()
+        }
+        self.scope_checks['ast_plugins'] = []
+        self.stateful_codes = tuple(code for plugin in stateful for code in _doc_codes(plugin['plugin']))
+
+        self.checker_class = _shared_checker_class()
+
+    def _violations(self, results, path):
+        from flake8.style_guide import Decision, Violation as Flake8Violation
+
+        violations = []
+        for code, line, column, text, physical_line in results:
+            if self.decider.decision_for(code) is not Decision.Selected:
+                continue
+
+            # flake8 reports column index, which can be None for syntax errors
+            column = (column or 0) + 1
+
+            if Flake8Violation(code, path, line, column, text, physical_line).is_inline_ignored(
+                    self.options.disable_noqa):
+                continue
+
+            violations.append(Violation(code, line, column, text))
+
+        return violations
+
+    def check(self, source, path, scope=None, module=True):
+        # Returns tuple (token violations, module violations), module violations
+        # are None if AST checks were skipped
+        checker = self.checker_class(path, source, self.checks, self.options, scope, self.scope_checks, module)
+        if not checker.should_process:
+            # flake8: noqa
+            return [], []
+
+        _, results, _ = checker.run_checks()
+
+        return (
+            self._violations(results[:checker.module_results], path),
+            self._violations(results[checker.module_results:], path) if module else None
+        )
+
+
+_FLAKE8_CONFIG_FILES = ('setup.cfg', 'tox.ini', '.flake8')
+_FLAKE8_CAPACITY = 8
+_flake8_passes = OrderedDict()
+_flake8_lock = threading.Lock()
+
+
+def _flake8_config_files(root):
+    # Tuple of (path, mtime) of configuration files flake8 reads, the nearest
+    # folder with any of them, starting at the root and going up
+    folder = root
+    while True:
+        files = []
+        for name in _FLAKE8_CONFIG_FILES:
+            config_path = os.path.join(folder, name)
+            try:
+                files.append((config_path, os.stat(config_path).st_mtime))
+            except OSError:
+                continue
+
+        parent = os.path.dirname(folder)
+        if files or parent == folder:
+            return tuple(files)
+        folder = parent
+
+
+def _flake8_key(arguments, path):
+    root = find_project_root(path)
+    return tuple(arguments), root, _flake8_config_files(root)
+
+
+def _flake8(arguments, path):
+    # Pass is shared by all files of the project and loaded again if any
+    # configuration file was modified, least recently used passes are dropped
+    key = _flake8_key(arguments, path)
+
+    with _flake8_lock:
+        flake8 = _flake8_passes.pop(key, None)
+        if flake8 is None:
+            flake8 = _Flake8(arguments, key[1])
+        _flake8_passes[key] = flake8
+
+        while len(_flake8_passes) > _FLAKE8_CAPACITY:
+            _flake8_passes.popitem(last=False)
+
+    return flake8
+
+
+def _check_flake8(source, path, passes, scope=None, previous=None, check=None):
+    # Returns list of tuples (token violations, module violations), one per pass
+    results = []
+
+    for index, arguments in enumerate(passes or [[]]):
+        if check:
+            check()
+
+        flake8 = _flake8(arguments, path)
+
+        if scope is None:
+            results.append(flake8.check(source, path))
+            continue
+
+        old_tokens, old_module = previous[index]
+        module = scope.remap_module(old_module)
+
+        tokens, new_module = flake8.check(source, path, scope, module is None)
+        results.append((
+            _sorted(tokens + scope.remap(old_tokens, flake8.stateful_codes)),
+            new_module if module is None else module
+        ))
+
+    return results
+
+
+def flake8_config(path, passes=None):
+    """Return effective flake8 configuration.
+
+    Args:
+        path: Source file path, used to find configuration files.
+        passes: List of passes, see `flake8_violations`.
+
+    Returns:
+        JSON serializable options & versions of all passes.
+
+    Raises:
+        Exception: flake8 failed.
+    """
+    return [_flake8(arguments, path).config for arguments in passes or [[]]]
+
+
+def _flatten_flake8(results):
+    return [v for tokens, module in results for v in _sorted(tokens + module)]
+
+
+def flake8_violations(text, path, passes=None):
+    """Run flake8 passes on the source text.
+
+    Options & plugins are loaded once per pass and project (see
+    `blackmamba.util.path.find_project_root`) and loaded again when any
+    configuration file is modified. Source is tokenized and parsed once,
+    tokens and AST are shared by all passes.
+    Every pass selects & ignores codes with its own decision engine and
+    plugins, which can't report any selected code, are skipped.
+
+    Args:
+        text: Python source code.
+        path: Source file path, used to find configuration files and in the ``# noqa`` handling.
+        passes: List of passes, every pass is a list of flake8 command line
+            arguments (``[['--select=E,W'], ['--select=C90', '--max-complexity=10']]``).
+            One pass with default options if not provided.
+
+    Returns:
+        List of `Violation`, ordered by line and column within a pass.
+
+    Raises:
+        Exception: flake8 failed.
+    """
+    source = _SharedSource(text.splitlines(True))
+    return _flatten_flake8(_check_flake8(source, path, passes))
+
+
+#
+# pep8 & pyflakes
+#
+
+def _shared_pep8_checker_class():
+    import pep8
+    import tokenize
+
+    class _Report(pep8.BaseReport):
+        def __init__(self, options):
+            super().__init__(options)
+            self.violations = []
+
+        def error(self, line_number, offset, text, check):
+            # If super doesn't return code, this one is ignored
+            code = super().error(line_number, offset, text, check)
+            if code:
+                self.violations.append(Violation(code, self.line_offset + line_number, offset + 1, text[5:]))
+            return code
+
+    class _SharedPep8Checker(pep8.Checker):
+        # Replays shared tokens instead of tokenizing lines again. Only stateful
+        # checks run for rows out of scope.
+        def __init__(self, source, options, scope=None):
+            self._source = source
+            self._scope = scope
+            super().__init__(None, source.lines, options)
+
+            self._all_physical_checks = self._physical_checks
+            self._all_logical_checks = self._logical_checks
+            self._scope_physical_checks = [c for c in self._physical_checks if _is_stateful(c[1], c[2])]
+            self._scope_logical_checks = [c for c in self._logical_checks if _is_stateful(c[1], c[2])]
+
+        def check_physical(self, line):
+            if self._scope is not None:
+                if self.line_number in self._scope.rows:
+                    self._physical_checks = self._all_physical_checks
+                else:
+                    self._physical_checks = self._scope_physical_checks
+
+            super().check_physical(line)
+
+        def check_logical(self):
+            if self._scope is not None:
+                if self._scope.covers(self.tokens[0][2][0], self.tokens[-1][3][0]):
+                    self._logical_checks = self._all_logical_checks
+                else:
+                    self._logical_checks = self._scope_logical_checks
+
+            super().check_logical()
+
+        def generate_tokens(self):
+            tokens, error = self._source.tokens()
+
+            for token, read in tokens:
+                # Checker state (line_number, indent_char) is updated as if
+                # lines were read by the tokenizer
+                while self.line_number < read:
+                    self.readline()
+
+                if token[2][0] > self.total_lines:
+                    return
+
+                self.maybe_check_physical(token)
+                yield token
+
+            if error:
+                try:
+                    raise error
+                except (SyntaxError, tokenize.TokenError):
+                    # Reads exception info from sys.exc_info
+                    self.report_invalid_syntax()
+
+    return pep8.StyleGuide, _Report, _SharedPep8Checker
+
+
+class _PyflakesReporter:
+    # pyflakes reporter, which collects violations instead of writing them to streams
+    def __init__(self):
+        self.violations = []
+
+    def unexpectedError(self, filename, msg):
+        pass
+
+    def syntaxError(self, filename, msg, lineno, offset, text):
+        if offset is not None:
+            line = text.splitlines()[-1]
+            offset = offset - (len(text) - len(line)) + 1
+        self.violations.append(Violation('E999', lineno, offset or 0, msg))
+
+    def flake(self, message):
+        self.violations.append(Violation(
+            type(message).__name__, message.lineno, message.col + 1, message.message % message.message_args
+        ))
+
+
+def _check_pyflakes(source, path, reporter):
+    # Same as pyflakes.api.check, but with the shared AST
+    from pyflakes import checker
+
+    try:
+        tree = source.tree()
+    except SyntaxError as e:
+        if e.text is None:
+            reporter.unexpectedError(path, 'problem decoding source')
+        else:
+            reporter.syntaxError(path, e.args[0], e.lineno, e.offset, e.text)
+        return
+    except Exception:
+        reporter.unexpectedError(path, 'problem decoding source')
+        return
+
+    w = checker.Checker(tree, path)
+    w.messages.sort(key=lambda m: m.lineno)
+    for message in w.messages:
+        reporter.flake(message)
+
+
+def _check_pep8_pyflakes(source, path, ignore, max_line_length, scope=None, previous=None, check=None):
+    # Returns tuple (pep8 violations, pyflakes violations)
+    style_guide_class, report_class, checker_class = _shared_pep8_checker_class()
+    options = style_guide_class(reporter=report_class).options
+    options.ignore = tuple(ignore or ())
+    if max_line_length:
+        options.max_line_length = max_line_length
+
+    pep8_checker = checker_class(source, options, scope)
+    pep8_checker.check_all()
+    pep8 = pep8_checker.report.violations
+
+    if check:
+        check()
+
+    pyflakes = None
+    if scope is not None:
+        stateful_codes = tuple(code for _, check, _ in pep8_checker._scope_physical_checks +
+                               pep8_checker._scope_logical_checks for code in _doc_codes(check))
+        pep8 += scope.remap(previous[0], stateful_codes)
+        pyflakes = scope.remap_module(previous[1])
+
+    if pyflakes is None:
+        reporter = _PyflakesReporter()
+        _check_pyflakes(source, path, reporter)
+        pyflakes = reporter.violations
+
+    return _sorted(pep8), pyflakes
+
+
+def pep8_pyflakes_config(ignore=None, max_line_length=None):
+    """Return effective pep8 & pyflakes configuration.
+
+    Args:
+        ignore: List of ignored pep8 codes.
+        max_line_length: Maximum line length, pep8 default if not provided.
+
+    Returns:
+        JSON serializable options & versions.
+    """
+    import pep8
+    import pyflakes
+
+    return {
+        'python': list(sys.version_info[:2]),
+        'pep8': pep8.__version__,
+        'pyflakes': pyflakes.__version__,
+        'ignore': sorted(ignore or ()),
+        'max_line_length': max_line_length or pep8.MAX_LINE_LENGTH
+    }
+
+
+def pep8_pyflakes_violations(text, path, ignore=None, max_line_length=None):
+    """Run pep8 & pyflakes on the source text.
+
+    Source is tokenized and parsed once. pep8 logical & physical line checks
+    get the shared tokens, pyflakes checks the shared AST.
+
+    Args:
+        text: Python source code.
+        path: Source file path.
+        ignore: List of ignored pep8 codes.
+        max_line_length: Maximum line length, pep8 default if not provided.
+
+    Returns:
+        Tuple (pep8 violations, pyflakes violations), lists of `Violation`. pyflakes
+        violation code is the message class name (``UnusedImport``, ...) or ``E999``
+        for syntax errors.
+    """
+    source = _SharedSource(text.splitlines(True))
+    return _check_pep8_pyflakes(source, path, ignore, max_line_length)
+
+
+#
+# Analyzer
+#
+
+_Snapshot = namedtuple('_Snapshot', ['lines', 'signature', 'indent_char', 'valid', 'results'])
+
+
+class Analyzer:
+    """Analyzer, which checks only changed parts of the source.
+
+    Last analyzed source & results are kept for every file and options. Line
+    diff of the last and the current source is computed and physical & logical
+    line checks run for changed top level statements only (plus the first
+    logical line of the following statement). Results of other lines are
+    moved from the last results.
+
+    Module checks (pyflakes, mccabe) run only if significant tokens were
+    changed (not just whitespaces, comments, blank lines, ...).
+
+    Args:
+        capacity: Maximum number of kept files.
+    """
+    def __init__(self, capacity=16):
+        self._capacity = capacity
+        self._snapshots = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _analyze(self, key, text, run):
+        source = _SharedSource(text.splitlines(True))
+
+        with self._lock:
+            snapshot = self._snapshots.pop(key, None)
+
+        scope = None
+        if snapshot and snapshot.lines == source.lines:
+            results = snapshot.results
+        else:
+            valid = source.tokens()[1] is None
+            if snapshot and snapshot.valid and valid and snapshot.indent_char == source.indent_char():
+                diff = _LineDiff(snapshot.lines, source.lines)
+                scope = _Scope(source, diff, snapshot.signature != source.signature())
+
+            results = run(source, scope, snapshot.results if scope else None)
+            snapshot = _Snapshot(source.lines, source.signature() if valid else None,
+                                 source.indent_char(), valid, results)
+
+        with self._lock:
+            self._snapshots[key] = snapshot
+            while len(self._snapshots) > self._capacity:
+                self._snapshots.popitem(last=False)
+
+        return results
+
+    def flake8(self, text, path, passes=None, check=None):
+        """Run flake8 passes on the source text.
+
+        See `flake8_violations`. ``check`` function is called between passes,
+        it can raise an exception to cancel the analysis.
+        """
+        passes = [list(p) for p in passes or [[]]]
+        # Results computed with the modified configuration files are not reused
+        key = ('flake8', path, tuple(_flake8_key(p, path) for p in passes))
+
+        def run(source, scope, previous):
+            return _check_flake8(source, path, passes, scope, previous, check)
+
+        return _flatten_flake8(self._analyze(key, text, run))
+
+    def pep8_pyflakes(self, text, path, ignore=None, max_line_length=None, check=None):
+        """Run pep8 & pyflakes on the source text.
+
+        See `pep8_pyflakes_violations`. ``check`` function is called between pep8
+        and pyflakes, it can raise an exception to cancel the analysis.
+        """
+        key = ('pep8_pyflakes', path, tuple(ignore or ()), max_line_length)
+
+        def run(source, scope, previous):
+            return _check_pep8_pyflakes(source, path, ignore, max_line_length, scope, previous, check)
+
+        return self._analyze(key, text, run)
+
+    def clear(self):
+        """Remove all kept sources & results."""
+        with self._lock:
+            self._snapshots.clear()
+
+
+_analyzer = None
+
+
+def get_analyzer():
+    """Return shared analyzer instance."""
+    global _analyzer
+
+    if _analyzer is None:
+        _analyzer = Analyzer()
+
+    return _analyzer
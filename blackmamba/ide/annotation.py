@@ -1,5 +1,7 @@
 #!python3
 
+import threading
+from collections import OrderedDict
 from enum import Enum
 
 
@@ -14,3 +16,119 @@ class Annotation(object):
         self.text = text
         self.style = style
         self.filename = filename
+
+
+_DEFERRED_DELAY = 0.05
+
+
+def _defer(function):
+    # Main thread, rendering can't interleave with clear_annotations & cancel
+    # called from the main thread
+    import ui
+    ui.delay(function, _DEFERRED_DELAY)
+
+
+class AnnotationBatch(object):
+    """Collects annotations and renders them at once.
+
+    Messages of the same line (and file) are merged into one annotation,
+    which is an error if any of them is an error. Only ``limit`` annotations
+    nearest to the cursor line are rendered by the `flush` call, the rest is
+    rendered later in chunks of the same size.
+
+    Args:
+        limit: Maximum number of annotations rendered at once.
+        separator: Separator of merged messages.
+        defer: Function accepting function to call later. Deferred annotations
+            are rendered on the main thread (``ui.delay``) if not provided.
+    """
+    def __init__(self, limit=50, separator=',\n', defer=None):
+        self.limit = limit
+        self.separator = separator
+        self._defer = defer or _defer
+        self._lines = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._lines)
+
+    def add(self, annotation):
+        """Add annotation (`Annotation`)."""
+        key = (annotation.filename, annotation.line)
+        style, messages = self._lines.get(key, (Style.warning, []))
+        messages.append(annotation.text)
+        self._lines[key] = (Style.error if annotation.style is Style.error else style, messages)
+
+    def extend(self, annotations):
+        """Add annotations (iterable of `Annotation`)."""
+        for annotation in annotations:
+            self.add(annotation)
+
+    def cancel(self):
+        """Cancel rendering of deferred annotations."""
+        with self._lock:
+            self._generation += 1
+
+    def flush(self, editor, line=None, scroll=True):
+        """Render added annotations.
+
+        Args:
+            editor: Pythonista ``editor`` module or any object with ``get_path``
+                and ``annotate_line`` functions.
+            line: Cursor line number, annotations nearest to this line are rendered
+                first. Annotations are rendered in the line order if not provided.
+            scroll: Scroll to the first rendered annotation.
+
+        Returns:
+            Number of deferred annotations.
+        """
+        def order(item):
+            (filename, number), _ = item
+            # Current file annotations first
+            return (filename is not None, abs(number - line) if line else 0, number)
+
+        annotations = [
+            (number, filename, style, self.separator.join(messages))
+            for (filename, number), (style, messages) in sorted(self._lines.items(), key=order)
+        ]
+        self._lines = OrderedDict()
+
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+
+        self._render(editor, annotations[:self.limit], scroll)
+
+        deferred = annotations[self.limit:]
+        if deferred:
+            path = editor.get_path()
+            self._defer(lambda: self._render_deferred(editor, path, deferred, generation))
+
+        return len(deferred)
+
+    def _is_current(self, generation):
+        # False if annotations were flushed or cancelled again
+        with self._lock:
+            return generation == self._generation
+
+    def _render(self, editor, annotations, scroll, generation=None):
+        for number, filename, style, text in annotations:
+            if generation is not None and not self._is_current(generation):
+                return False
+
+            editor.annotate_line(number, text, style.value, True, filename=filename, scroll=scroll)
+            scroll = False
+
+        return True
+
+    def _render_deferred(self, editor, path, annotations, generation):
+        if editor.get_path() != path:
+            return
+
+        if not self._render(editor, annotations[:self.limit], False, generation):
+            return
+
+        deferred = annotations[self.limit:]
+        if deferred:
+            self._defer(lambda: self._render_deferred(editor, path, deferred, generation))
@@ -0,0 +1,139 @@
+#!python3
+
+"""Continuous analysis of the current file.
+
+Editor is polled for the current file path, text and modification time. If
+anything was changed (edit, save, another tab was selected, ...), analysis is
+submitted to the debounced `blackmamba.util.worker.Worker`. Newer change cancels
+pending and running analysis and only results of the latest text are published.
+
+.. warning:: This module must not introduce dependency on any Pythonista module,
+    ``editor`` module is passed to `ContinuousAnalysis`.
+"""
+
+import os
+import threading
+import traceback
+from collections import namedtuple
+from blackmamba.log import error
+from blackmamba.util.worker import Worker
+
+
+_Snapshot = namedtuple('_Snapshot', ['path', 'text', 'mtime'])
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+class ContinuousAnalysis:
+    """Analyzes the current file whenever it's changed or saved.
+
+    Args:
+        editor: Pythonista ``editor`` module or any object with ``get_path`` & ``get_text`` functions.
+        analyze: Function accepting path, text and `blackmamba.util.worker.Token`, returns results.
+            Long running analysis should call ``token.check`` periodically.
+        publish: Function accepting path and results. Called from the background thread.
+        delay: Debounce interval (seconds), analysis is started if the file wasn't changed in this interval.
+        interval: Editor polling interval (seconds).
+        extensions: File extensions to analyze.
+    """
+    def __init__(self, editor, analyze, publish, delay=1.0, interval=0.5, extensions=('.py',)):
+        self._editor = editor
+        self._analyze = analyze
+        self._publish = publish
+        self._interval = interval
+        self._extensions = extensions
+        self._worker = Worker(delay)
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._stop_event = None
+        self._thread = None
+
+    def _current_snapshot(self):
+        path = self._editor.get_path()
+        if not path or not path.lower().endswith(self._extensions):
+            return None
+
+        text = self._editor.get_text()
+        if text is None:
+            return None
+
+        return _Snapshot(path, text, _mtime(path))
+
+    def poll(self):
+        """Check editor and submit analysis if the current file was changed.
+
+        Called periodically by the polling thread, can be called directly
+        as well (tests, ...).
+
+        Returns:
+            `True` if analysis was submitted, `False` otherwise.
+        """
+        snapshot = self._current_snapshot()
+
+        with self._lock:
+            if snapshot == self._snapshot:
+                return False
+            self._snapshot = snapshot
+
+        if snapshot is None:
+            self._worker.cancel()
+            return False
+
+        def job(token):
+            return self._analyze(snapshot.path, snapshot.text, token)
+
+        def done(results):
+            # Worker publishes results of not cancelled jobs only, but the editor
+            # can be changed before the next poll
+            if self._current_snapshot() == snapshot:
+                self._publish(snapshot.path, results)
+
+        self._worker.submit(job, done)
+        return True
+
+    def wait(self, timeout=None):
+        """Wait until submitted analysis is finished.
+
+        Returns:
+            `True` if there's nothing to do, `False` if timed out.
+        """
+        return self._worker.wait(timeout)
+
+    @property
+    def running(self):
+        """`True` if the polling thread is running."""
+        return self._thread is not None
+
+    def _run(self, stop_event):
+        while not stop_event.wait(self._interval):
+            try:
+                self.poll()
+            except Exception:
+                error(traceback.format_exc())
+
+    def start(self):
+        """Start polling thread."""
+        if self._thread:
+            return
+
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop_event,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop polling thread and cancel pending & running analysis."""
+        if not self._thread:
+            return
+
+        self._stop_event.set()
+        self._thread = None
+        self._stop_event = None
+
+        self._worker.cancel()
+        with self._lock:
+            self._snapshot = None
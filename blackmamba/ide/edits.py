@@ -0,0 +1,137 @@
+#!python3
+
+"""Minimal editor text updates.
+
+Replacing the whole editor text forces Pythonista to lay out & highlight
+everything again and the scroll position is lost. Old and new text is
+compared and only changed ranges are replaced.
+
+.. warning:: This module must not introduce dependency on any Pythonista module,
+    ``editor`` module is passed to `apply_text`.
+"""
+
+from collections import namedtuple
+from difflib import SequenceMatcher
+
+
+TextEdit = namedtuple('TextEdit', ['start', 'end', 'text'])
+TextEdit.__doc__ = """Replacement of the old text range.
+
+Attributes:
+    start: Range start offset in the old text.
+    end: Range end offset (excluded) in the old text.
+    text: Replacement.
+"""
+
+
+def _common_prefix_length(a, b):
+    count = min(len(a), len(b))
+    index = 0
+    while index < count and a[index] == b[index]:
+        index += 1
+    return index
+
+
+def _common_suffix_length(a, b, limit):
+    index = 0
+    while index < limit and a[-1 - index] == b[-1 - index]:
+        index += 1
+    return index
+
+
+def _character_edit(old, new, start):
+    # Replaced lines edit without common prefix & suffix characters
+    prefix = _common_prefix_length(old, new)
+    suffix = _common_suffix_length(old, new, min(len(old), len(new)) - prefix)
+    return TextEdit(start + prefix, start + len(old) - suffix, new[prefix:len(new) - suffix])
+
+
+def text_edits(old, new):
+    """Return edits transforming the old text to the new one.
+
+    Lines are compared first (common leading & trailing lines are skipped
+    before `difflib.SequenceMatcher` is used), replaced lines are reduced
+    to changed characters.
+
+    Args:
+        old: Old text.
+        new: New text.
+
+    Returns:
+        List of `TextEdit` ordered by offset, empty if texts are equal.
+    """
+    if old == new:
+        return []
+
+    old_lines = old.splitlines(True)
+    new_lines = new.splitlines(True)
+
+    prefix = _common_prefix_length(old_lines, new_lines)
+    suffix = _common_suffix_length(old_lines, new_lines, min(len(old_lines), len(new_lines)) - prefix)
+
+    matcher = SequenceMatcher(
+        None,
+        old_lines[prefix:len(old_lines) - suffix],
+        new_lines[prefix:len(new_lines) - suffix],
+        autojunk=False
+    )
+
+    offset = sum(len(line) for line in old_lines[:prefix])
+    edits = []
+
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        old_chunk = ''.join(old_lines[prefix + i1:prefix + i2])
+
+        if tag != 'equal':
+            new_chunk = ''.join(new_lines[prefix + j1:prefix + j2])
+            edits.append(_character_edit(old_chunk, new_chunk, offset))
+
+        offset += len(old_chunk)
+
+    return edits
+
+
+def _merge(edits, old):
+    # One edit from the first edit start to the last edit end
+    start, end = edits[0].start, edits[-1].end
+    parts = []
+    position = start
+    for edit in edits:
+        parts.append(old[position:edit.start])
+        parts.append(edit.text)
+        position = edit.end
+    return TextEdit(start, end, ''.join(parts))
+
+
+def apply_text(editor, text, start=0, end=None, max_edits=64):
+    """Replace editor text range with the text, changed parts only.
+
+    Edits are applied in the reverse offset order, offsets of not yet
+    applied edits are not affected.
+
+    Args:
+        editor: Pythonista ``editor`` module or any object with ``get_text`` and
+            ``replace_text`` functions.
+        text: New text of the range.
+        start: Range start offset.
+        end: Range end offset (excluded), end of the editor text if not provided.
+        max_edits: Maximum number of edits, edits are merged into one if exceeded.
+
+    Returns:
+        Number of applied edits, `None` if the editor has no text.
+    """
+    old = editor.get_text()
+    if old is None:
+        return None
+
+    if end is None:
+        end = len(old)
+
+    edits = text_edits(old[start:end], text)
+    if len(edits) > max_edits:
+        edits = [_merge(edits, old[start:end])]
+
+    for edit in reversed(edits):
+        editor.replace_text(start + edit.start, start + edit.end, edit.text)
+
+    return len(edits)
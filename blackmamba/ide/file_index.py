@@ -0,0 +1,346 @@
+#!python3
+
+"""Persistent file index.
+
+Index keeps list of subfolders & files for every visited folder along with
+folder modification time. Folder modification time changes whenever an item
+is added, removed or renamed in it, thus we can revalidate the index just by
+calling `os.stat` on every folder and list only folders with changed mtime.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from blackmamba.log import error
+from blackmamba.ide.ignore import IgnoreFilter, IgnoreRules, GITIGNORE, read_gitignore
+
+_VERSION = 2
+
+
+class _Folder:
+    __slots__ = ('mtime', 'folders', 'files', 'gitignore', 'rules')
+
+    def __init__(self, mtime, folders, files, gitignore=None):
+        self.mtime = mtime
+        self.folders = folders
+        self.files = files
+        # Tuple (mtime, list of lines) of the .gitignore file
+        self.gitignore = gitignore
+        # Compiled .gitignore rules, not persisted
+        self.rules = None
+
+
+def cache_file_name(root):
+    root = os.path.normpath(root)
+    return 'file_index-{}.json'.format(hashlib.md5(root.encode('utf-8')).hexdigest())
+
+
+def _gitignore_mtime(folder):
+    try:
+        return os.stat(os.path.join(folder, GITIGNORE)).st_mtime
+    except OSError:
+        return None
+
+
+class FileIndex:
+    """File index of the folder tree.
+
+    Contents of the ``.gitignore`` files is indexed as well.
+
+    Args:
+        root: Root folder path.
+        ignore_folders: Folders to ignore, patterns or legacy dictionary, see
+            `blackmamba.ide.ignore.ignore_patterns`.
+        cache_path: Path of the file where the index is persisted, `None` to disable persistence.
+        gitignore: `True` to skip folders & files ignored by ``.gitignore`` files.
+    """
+    def __init__(self, root, ignore_folders=None, cache_path=None, gitignore=False):
+        self.root = os.path.normpath(root)
+        self._folder_filter = IgnoreFilter(self.root, ignore_folders, gitignore=self.gitignore_rules if gitignore else None)
+        self._cache_path = cache_path
+        self._folders = {}
+        # Revalidated folders of the walk in progress, per thread
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def is_empty(self):
+        return not self._folders
+
+    def subfolders(self, folder, folder_filter=None):
+        """Return list of indexed subfolder paths.
+
+        Args:
+            folder: Folder path.
+            folder_filter: Additional subfolders filter, see `blackmamba.ide.ignore.IgnoreFilter`.
+        """
+        entry = self._folders.get(folder)
+        if not entry:
+            return []
+
+        names = self._folder_filter(folder, entry.folders)
+        if folder_filter:
+            names = folder_filter(folder, names)
+
+        return [os.path.join(folder, name) for name in names]
+
+    def gitignore_rules(self, folder):
+        """Return `blackmamba.ide.ignore.IgnoreRules` of the folder ``.gitignore`` file or `None`."""
+        entry = getattr(self._local, 'revalidated', {}).get(folder) or self._folders.get(folder)
+        if not entry or not entry.gitignore:
+            return None
+
+        if entry.rules is None:
+            entry.rules = IgnoreRules(entry.gitignore[1])
+        return entry.rules
+
+    def _relpath(self, folder):
+        return '' if folder == self.root else folder[len(self.root) + 1:]
+
+    def _abspath(self, relpath):
+        return os.path.join(self.root, relpath) if relpath else self.root
+
+    def load(self):
+        """Load persisted index.
+
+        Returns:
+            `True` if index was loaded, `False` otherwise.
+        """
+        if not self._cache_path or not os.path.isfile(self._cache_path):
+            return False
+
+        try:
+            with open(self._cache_path, 'rt') as input:
+                content = json.load(input)
+        except Exception as e:
+            error('Failed to load file index: {}'.format(e))
+            return False
+
+        if content.get('version') != _VERSION or content.get('root') != self.root:
+            return False
+
+        self._folders = {
+            self._abspath(relpath): _Folder(*value)
+            for relpath, value in content.get('folders', {}).items()
+        }
+        return True
+
+    def save(self):
+        """Persist index to the cache file."""
+        if not self._cache_path:
+            return
+
+        content = {
+            'version': _VERSION,
+            'root': self.root,
+            'folders': {
+                self._relpath(folder): [entry.mtime, entry.folders, entry.files, entry.gitignore]
+                for folder, entry in self._folders.items()
+            }
+        }
+
+        tmp_path = '{}.tmp'.format(self._cache_path)
+        try:
+            with open(tmp_path, 'wt') as output:
+                json.dump(content, output, separators=(',', ':'))
+            os.replace(tmp_path, self._cache_path)
+        except Exception as e:
+            error('Failed to save file index: {}'.format(e))
+
+    @staticmethod
+    def _scan(folder, mtime):
+        folders = []
+        files = []
+
+        for entry in os.scandir(folder):
+            try:
+                if entry.is_dir():
+                    folders.append(entry.name)
+                else:
+                    files.append(entry.name)
+            except OSError:
+                continue
+
+        gitignore = None
+        if GITIGNORE in files:
+            gitignore_mtime = _gitignore_mtime(folder)
+            lines = read_gitignore(folder)
+            if lines is not None:
+                gitignore = (gitignore_mtime, lines)
+
+        return _Folder(mtime, folders, files, gitignore)
+
+    @staticmethod
+    def _is_stale(folder, entry, mtime):
+        if not entry or entry.mtime != mtime:
+            return True
+
+        # .gitignore modification doesn't change the folder mtime
+        return entry.gitignore is not None and entry.gitignore[0] != _gitignore_mtime(folder)
+
+    def _visit(self, start, folders, visited):
+        changed = False
+
+        stack = [start]
+        while stack:
+            folder = stack.pop()
+
+            try:
+                mtime = os.stat(folder).st_mtime
+            except OSError:
+                continue
+
+            entry = folders.get(folder)
+            if self._is_stale(folder, entry, mtime):
+                try:
+                    entry = self._scan(folder, mtime)
+                except OSError:
+                    continue
+                changed = True
+
+            visited[folder] = entry
+            yield folder, entry
+            stack.extend(reversed(self._walk_subfolders(folder, entry)))
+
+        return changed
+
+    def _revalidate(self, start):
+        # Generator yielding revalidated (folder, entry), returns changed flag.
+        # Folders are revalidated against the snapshot of the index without
+        # holding the lock, index is modified when it's exhausted only
+        snapshot = self._folders
+        visited = {}
+
+        # Subfolders filter needs revalidated .gitignore rules
+        self._local.revalidated = visited
+        try:
+            changed = yield from self._visit(start, snapshot, visited)
+        finally:
+            self._local.revalidated = {}
+
+        with self._lock:
+            return self._swap(start, visited) or changed
+
+    def _swap(self, start, visited):
+        # Replace revalidated subtree, lock must be held, returns True if any folder was removed
+        if start == self.root:
+            folders = visited
+            removed = len(self._folders) - len(visited)
+        else:
+            prefix = os.path.join(start, '')
+            folders = {
+                f: e for f, e in self._folders.items()
+                if f != start and not f.startswith(prefix)
+            }
+            removed = len(self._folders) - len(folders) - len(visited)
+            folders.update(visited)
+
+        self._folders = folders
+        return removed != 0
+
+    def refresh(self, folder=None):
+        """Revalidate index against the file system.
+
+        Only folders with changed modification time are listed again.
+
+        Args:
+            folder: Revalidate this folder subtree only, whole index if `None`.
+
+        Returns:
+            `True` if index was changed, `False` otherwise.
+        """
+        start = os.path.normpath(folder) if folder else self.root
+
+        revalidate = self._revalidate(start)
+        while True:
+            try:
+                next(revalidate)
+            except StopIteration as e:
+                return e.value
+
+    def walk(self, folder_filter=None):
+        """Revalidate & persist index, yield folders as soon as they're revalidated.
+
+        Lock is not held while folders are yielded, other revalidations are not
+        blocked. Index is modified only if the iterator is exhausted, abandoned
+        walk leaves it untouched.
+
+        Args:
+            folder_filter: Additional subfolders filter, see `blackmamba.ide.ignore.IgnoreFilter`.
+
+        Yields:
+            Tuple (folder path, list of file names) in the walk order.
+        """
+        allowed = {self.root}
+        revalidate = self._revalidate(self.root)
+
+        while True:
+            try:
+                folder, entry = next(revalidate)
+            except StopIteration as e:
+                changed = e.value
+                break
+
+            if folder not in allowed:
+                continue
+
+            names = self._folder_filter(folder, entry.folders)
+            if folder_filter:
+                names = folder_filter(folder, names)
+            allowed.update(os.path.join(folder, name) for name in names)
+
+            yield folder, self._folder_filter.files(folder, entry.files)
+
+        if changed:
+            self.save()
+
+    def _walk_subfolders(self, folder, entry):
+        return [os.path.join(folder, name) for name in self._folder_filter(folder, entry.folders)]
+
+    def update(self):
+        """Load, refresh & persist index if changed.
+
+        Returns:
+            `True` if index was changed, `False` otherwise.
+        """
+        if self.is_empty:
+            self.load()
+
+        changed = self.refresh()
+        if changed:
+            self.save()
+        return changed
+
+    def folders(self, folder_filter=None):
+        """Return iterator over indexed folders in the walk order.
+
+        Args:
+            folder_filter: Additional subfolders filter, see `blackmamba.ide.ignore.IgnoreFilter`.
+
+        Yields:
+            Tuple (folder path, list of file names).
+        """
+        stack = [self.root]
+        while stack:
+            folder = stack.pop()
+
+            entry = self._folders.get(folder)
+            if not entry:
+                continue
+
+            yield folder, self._folder_filter.files(folder, entry.files)
+            stack.extend(reversed(self.subfolders(folder, folder_filter)))
+
+    def files(self, folder_filter=None):
+        """Return iterator over indexed files.
+
+        Args:
+            folder_filter: Additional subfolders filter, see `blackmamba.ide.ignore.IgnoreFilter`.
+
+        Yields:
+            Tuple (folder path, file name).
+        """
+        for folder, files in self.folders(folder_filter):
+            for name in files:
+                yield folder, name
@@ -0,0 +1,67 @@
+#!python3
+
+"""Identifier index of Python files.
+
+Every file is split into identifiers (names, attributes, words in comments
+and strings). It's used to find files, which can contain an identifier,
+before the slow analysis (rope, ...) is used. Index is updated incrementally,
+see `blackmamba.ide.incremental_index`.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from blackmamba.ide.incremental_index import IncrementalIndex
+
+_IDENTIFIER_REGEX = re.compile(r'[^\W\d]\w*')
+
+
+def identifiers(text):
+    """Return set of identifiers in the text."""
+    return frozenset(_IDENTIFIER_REGEX.findall(text))
+
+
+def _parse_file(data):
+    # Runs in the worker
+    return identifiers(data.decode('utf-8', errors='replace'))
+
+
+class IdentifierIndex(IncrementalIndex):
+    """Identifier index of files.
+
+    Args:
+        executor: `concurrent.futures.Executor` used to read files. Thread pool
+            is used if not provided.
+    """
+    def __init__(self, executor=None):
+        super().__init__(_parse_file, executor)
+
+    def files(self, identifier):
+        """Return files containing the identifier.
+
+        Returns:
+            Sorted list of file paths.
+        """
+        return sorted(path for path, entry in self.entries.items() if identifier in entry.value)
+
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+_INDEXES_CAPACITY = 4
+
+
+def get_identifier_index(root):
+    """Return shared identifier index of the root folder.
+
+    Indexes of least recently used roots are dropped.
+    """
+    with _indexes_lock:
+        index = _indexes.pop(root, None)
+        if index is None:
+            index = IdentifierIndex()
+        _indexes[root] = index
+
+        while len(_indexes) > _INDEXES_CAPACITY:
+            _indexes.popitem(last=False)
+
+    return index
@@ -0,0 +1,286 @@
+#!python3
+
+"""Gitignore style ignore rules.
+
+Supported pattern syntax (subset of the ``.gitignore`` one):
+
+* blank lines and lines starting with ``#`` are ignored,
+* ``!`` negates the pattern, the last matching pattern wins,
+* trailing ``/`` matches folders only,
+* pattern with ``/`` at the beginning or in the middle is anchored to the
+  base folder, otherwise it matches at any depth,
+* ``*`` matches anything except ``/``, ``?`` matches any character except ``/``,
+  ``[...]`` matches one character from the range,
+* ``**/`` matches zero or more folders, trailing ``/**`` matches everything inside.
+
+All patterns are compiled into one regular expression (one per group of
+consecutive patterns with the same negation), every path is matched just once.
+"""
+
+import os
+import re
+from collections.abc import Mapping
+
+GITIGNORE = '.gitignore'
+
+
+def _translate_segment(segment):
+    result = []
+    i = 0
+    n = len(segment)
+
+    while i < n:
+        c = segment[i]
+        i += 1
+
+        if c == '*':
+            result.append('[^/]*')
+        elif c == '?':
+            result.append('[^/]')
+        elif c == '\\' and i < n:
+            result.append(re.escape(segment[i]))
+            i += 1
+        elif c == '[':
+            end = segment.find(']', i + 1 if segment[i:i + 1] in ('!', ']') else i)
+            if end == -1:
+                result.append('\\[')
+                continue
+            chars = segment[i:end].replace('\\', '\\\\').replace('[', '\\[')
+            if chars.startswith('!'):
+                chars = '^' + chars[1:]
+            result.append('[{}]'.format(chars))
+            i = end + 1
+        else:
+            result.append(re.escape(c))
+
+    return ''.join(result)
+
+
+def _translate(pattern):
+    # Returns tuple (negate, folders only, regex) or None if there's no pattern
+    pattern = pattern.rstrip()
+    if not pattern or pattern.startswith('#'):
+        return None
+
+    negate = pattern.startswith('!')
+    if negate:
+        pattern = pattern[1:]
+    elif pattern.startswith(('\\!', '\\#')):
+        pattern = pattern[1:]
+
+    folders_only = pattern.endswith('/')
+    pattern = pattern.rstrip('/')
+    if not pattern:
+        return None
+
+    anchored = '/' in pattern
+    segments = pattern.lstrip('/').split('/')
+
+    parts = ['' if anchored else '(?:.*/)?']
+    for i, segment in enumerate(segments):
+        last = i == len(segments) - 1
+
+        if segment == '**':
+            parts.append('.+' if last else '(?:.*/)?')
+        else:
+            parts.append(_translate_segment(segment))
+            if not last:
+                parts.append('/')
+
+    # Folder paths are matched with trailing '/'
+    parts.append('/' if folders_only else '/?')
+    return negate, folders_only, ''.join(parts)
+
+
+class IgnoreRules:
+    """Compiled ignore rules.
+
+    Args:
+        patterns: Iterable of patterns.
+    """
+    def __init__(self, patterns):
+        groups = []
+        self.folders_only = True
+
+        for pattern in patterns:
+            translated = _translate(pattern)
+            if not translated:
+                continue
+
+            negate, folders_only, regex = translated
+            self.folders_only = self.folders_only and folders_only
+
+            if groups and groups[-1][0] == negate:
+                groups[-1][1].append(regex)
+            else:
+                groups.append((negate, [regex]))
+
+        # The last matching pattern wins, groups are matched in the reversed order
+        self._groups = [
+            (negate, re.compile('|'.join(regexes), re.DOTALL))
+            for negate, regexes in reversed(groups)
+        ]
+
+    def __bool__(self):
+        return bool(self._groups)
+
+    def match(self, path, is_folder=False):
+        """Match path against rules.
+
+        Args:
+            path: Path relative to the rules base folder, ``/`` separated.
+            is_folder: `True` if the path is a folder.
+
+        Returns:
+            `True` if the path is ignored, `False` if it's explicitly not ignored
+            (negated pattern) and `None` if no pattern matches.
+        """
+        if is_folder:
+            path += '/'
+
+        for negate, regex in self._groups:
+            if regex.fullmatch(path):
+                return not negate
+
+        return None
+
+
+def read_gitignore(folder):
+    """Read ``.gitignore`` patterns.
+
+    Returns:
+        List of lines or `None` if the file can't be read.
+    """
+    try:
+        with open(os.path.join(folder, GITIGNORE), 'rt', encoding='utf-8', errors='replace') as input:
+            return input.read().splitlines()
+    except OSError:
+        return None
+
+
+def _escape(name):
+    return re.sub(r'([\[\]*?!#\\])', r'\\\1', name)
+
+
+def ignore_patterns(ignore_folders, root=None):
+    """Convert ignore folders configuration to patterns.
+
+    Args:
+        ignore_folders: List of patterns or dictionary in the legacy format, key is
+            a parent folder name and value is a list of folder names to ignore.
+            ``''`` key matches any parent and ``'.'`` matches the root folder.
+        root: Root folder path, legacy rules with the root folder name key
+            are anchored to it.
+
+    Returns:
+        List of patterns.
+    """
+    if not ignore_folders:
+        return []
+
+    if not isinstance(ignore_folders, Mapping):
+        return list(ignore_folders)
+
+    root_name = os.path.basename(os.path.normpath(root)) if root else None
+    patterns = []
+
+    for parent, names in ignore_folders.items():
+        for name in names:
+            if parent == '':
+                patterns.append('{}/'.format(_escape(name)))
+                continue
+
+            if parent == '.' or parent == root_name:
+                patterns.append('/{}/'.format(_escape(name)))
+
+            if parent != '.':
+                patterns.append('**/{}/{}/'.format(_escape(parent), _escape(name)))
+
+    return patterns
+
+
+class IgnoreFilter:
+    """Folder & file names filter.
+
+    Instance is callable with the same arguments as `folders`.
+
+    Args:
+        root: Root folder path, patterns are relative to it.
+        patterns: Patterns or legacy ignore folders dictionary, see `ignore_patterns`.
+        ignore_hidden: Ignore folders starting with ``'.'``.
+        gitignore: Function accepting folder path, returns `IgnoreRules` of the
+            folder ``.gitignore`` file or `None`. ``.gitignore`` files are not
+            honoured if not provided.
+    """
+    def __init__(self, root, patterns=None, ignore_hidden=False, gitignore=None):
+        self.root = os.path.normpath(root)
+        self._rules = IgnoreRules(ignore_patterns(patterns, self.root))
+        self._ignore_hidden = ignore_hidden
+        self._gitignore = gitignore
+
+    def _relpath(self, base, folder, name):
+        if folder == base:
+            return name
+        return '{}/{}'.format(folder[len(base) + 1:].replace(os.sep, '/'), name)
+
+    def _gitignore_chain(self, folder):
+        # Rules of the folder and all its parents (up to the root), the closest first
+        chain = []
+        while True:
+            rules = self._gitignore(folder)
+            if rules:
+                chain.append((folder, rules))
+
+            if folder == self.root or len(folder) <= len(self.root):
+                return chain
+            folder = os.path.dirname(folder)
+
+    def _ignored(self, folder, name, is_folder, chain):
+        if self._rules.match(self._relpath(self.root, folder, name), is_folder):
+            return True
+
+        for base, rules in chain:
+            ignored = rules.match(self._relpath(base, folder, name), is_folder)
+            if ignored is not None:
+                return ignored
+
+        return False
+
+    def folders(self, folder, names):
+        """Filter subfolder names.
+
+        Args:
+            folder: Parent folder path.
+            names: List of subfolder names.
+
+        Returns:
+            List of not ignored subfolder names.
+        """
+        if self._ignore_hidden:
+            names = [name for name in names if not name.startswith('.')]
+
+        chain = self._gitignore_chain(folder) if self._gitignore else []
+        if not self._rules and not chain:
+            return names
+
+        return [name for name in names if not self._ignored(folder, name, True, chain)]
+
+    def files(self, folder, names):
+        """Filter file names.
+
+        Args:
+            folder: Parent folder path.
+            names: List of file names.
+
+        Returns:
+            List of not ignored file names.
+        """
+        chain = self._gitignore_chain(folder) if self._gitignore else []
+        chain = [(base, rules) for base, rules in chain if not rules.folders_only]
+        if self._rules.folders_only and not chain:
+            return names
+
+        return [name for name in names if not self._ignored(folder, name, False, chain)]
+
+    def __call__(self, folder, names):
+        return self.folders(folder, names)
@@ -0,0 +1,138 @@
+#!python3
+
+"""Incrementally updated index of files.
+
+Base of indexes keeping one parsed value per file (symbols, identifiers, ...).
+File is read again only if its modification time or size was changed and
+parsed again only if its content hash was changed. Stale files are read and
+parsed in parallel (thread pool, Pythonista doesn't support `multiprocessing`).
+"""
+
+import os
+import hashlib
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+
+IndexEntry = namedtuple('IndexEntry', ['mtime', 'size', 'digest', 'value'])
+IndexEntry.__doc__ = """Indexed file.
+
+Attributes:
+    mtime: File modification time.
+    size: File size.
+    digest: Hash of the file content.
+    value: Parsed value.
+"""
+
+
+def _index_file(path, parse, digest):
+    # Runs in the worker, value is None if digest wasn't changed
+    stat = os.stat(path)
+    with open(path, 'rb') as input:
+        data = input.read()
+
+    new_digest = hashlib.md5(data).hexdigest()
+    if new_digest == digest:
+        return IndexEntry(stat.st_mtime, stat.st_size, digest, None)
+
+    return IndexEntry(stat.st_mtime, stat.st_size, new_digest, parse(data))
+
+
+class IncrementalIndex:
+    """Index of values parsed from files.
+
+    Args:
+        parse: Function accepting file content (`bytes`), returns value. Called from the executor threads.
+        executor: `concurrent.futures.Executor` used to read & parse files. Thread pool
+            is used if not provided.
+    """
+    def __init__(self, parse, executor=None):
+        self._parse = parse
+        self._executor = executor
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def entries(self):
+        """Dictionary of file path and `IndexEntry`, must not be modified."""
+        with self._lock:
+            return self._entries
+
+    @entries.setter
+    def entries(self, entries):
+        with self._lock:
+            self._entries = entries
+
+    def _index_files(self, paths, entries, check):
+        executor = self._executor or ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+
+        futures = [
+            executor.submit(_index_file, path, self._parse, entries[path].digest if path in entries else None)
+            for path in paths
+        ]
+
+        try:
+            for path, future in zip(paths, futures):
+                if check:
+                    check()
+
+                try:
+                    entry = future.result()
+                except OSError:
+                    entries.pop(path, None)
+                    continue
+
+                if entry.value is None:
+                    entry = entry._replace(value=entries[path].value)
+                entries[path] = entry
+        finally:
+            for future in futures:
+                future.cancel()
+
+            if not self._executor:
+                executor.shutdown(wait=False)
+
+    def update(self, paths, check=None):
+        """Update index.
+
+        New and modified files are indexed in parallel, files not in paths are removed.
+
+        Args:
+            paths: Iterable of file paths.
+            check: Function called periodically, can raise to cancel update. Index
+                is not modified if the update is cancelled.
+
+        Returns:
+            `True` if index was changed, `False` otherwise.
+        """
+        with self._lock:
+            entries = {}
+            stale = []
+
+            for path in paths:
+                if check:
+                    check()
+
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+
+                entry = self._entries.get(path)
+                if entry:
+                    entries[path] = entry
+                    if entry.mtime == stat.st_mtime and entry.size == stat.st_size:
+                        continue
+
+                stale.append(path)
+
+            if not stale and len(entries) == len(self._entries):
+                return False
+
+            self._index_files(stale, entries, check)
+            self._entries = entries
+            return True
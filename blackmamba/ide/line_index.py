@@ -0,0 +1,82 @@
+#!python3
+
+"""Line start offsets of the text.
+
+.. warning:: This module must not introduce dependency on the ``editor`` module.
+"""
+
+from bisect import bisect_right
+
+
+class LineIndex:
+    """Line start offsets of the text snapshot.
+
+    Offsets are collected once, conversions between the offset and the
+    (line number, column index) are binary searches.
+
+    Args:
+        text: Text.
+    """
+    def __init__(self, text):
+        self.text = text
+
+        starts = [0]
+        find = text.find
+        index = find('\n')
+        while index != -1:
+            starts.append(index + 1)
+            index = find('\n', index + 1)
+
+        self._starts = starts
+
+    @property
+    def line_count(self):
+        """Number of lines, trailing new line doesn't start a new line."""
+        if not self.text:
+            return 0
+
+        count = len(self._starts)
+        return count - 1 if self.text.endswith('\n') else count
+
+    def line_number(self, offset):
+        """Return line number (starts from 1) of the offset."""
+        return bisect_right(self._starts, offset)
+
+    def column_index(self, offset):
+        """Return column index (starts from 0) of the offset."""
+        return offset - self._starts[bisect_right(self._starts, offset) - 1]
+
+    def line_offset(self, line_number):
+        """Return offset of the line start.
+
+        Args:
+            line_number: Line number (starts from 1).
+
+        Returns:
+            Offset of the line start or text length if line is out of range.
+        """
+        if 1 <= line_number <= self.line_count:
+            return self._starts[line_number - 1]
+        return len(self.text)
+
+
+_index = None
+
+
+def get_line_index(text):
+    """Return line index of the text.
+
+    Last index is reused until the text is changed.
+
+    Args:
+        text: Text.
+
+    Returns:
+        `LineIndex` instance.
+    """
+    global _index
+
+    if _index is None or _index.text != text:
+        _index = LineIndex(text)
+
+    return _index
@@ -0,0 +1,199 @@
+#!python3
+
+"""Incremental Python source outline.
+
+Source is split into top level blocks, every block starts with the ``class``,
+``def``, ``async def`` or decorator line at the column 0. Blocks are parsed
+separately and their nodes are cached by the block text. Only changed blocks
+are parsed again when the source is modified.
+
+Whole source is parsed if any block can't be parsed alone (``def`` at the
+column 0 in a multiline string, ...).
+
+.. warning:: This module must not introduce dependency on the ``editor`` module.
+"""
+
+import ast
+import re
+import hashlib
+from collections import namedtuple, OrderedDict
+
+
+class NodeKind:
+    cls = 'class'
+    function = 'function'
+    todo = 'todo'
+    fixme = 'fixme'
+
+
+Node = namedtuple('Node', ['kind', 'name', 'line', 'column', 'level', 'parents'])
+Node.__doc__ = """Outline node.
+
+Attributes:
+    kind: `NodeKind` value.
+    name: Node name or comment text.
+    line: Line number (starts from 1).
+    column: Column index (starts from 0).
+    level: Nesting level.
+    parents: Tuple of parent node names.
+"""
+
+_BLOCK_START_RE = re.compile(r'^(?:class\b|def\b|async\s+def\b|@)', re.MULTILINE)
+_COMMENT_RE = re.compile(r'\A.*#\s*\[?(?i:(?P<tag>TODO|FIXME))\]?[ :]*(?P<text>.*?)\s*\Z')
+
+
+def _ast_nodes(parent, line_offset=0, level=0, parents=()):
+    nodes = []
+
+    for child in parent.body:
+        if isinstance(child, ast.ClassDef):
+            kind = NodeKind.cls
+        elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            kind = NodeKind.function
+        else:
+            continue
+
+        nodes.append(Node(kind, child.name, child.lineno + line_offset, child.col_offset, level, parents))
+        nodes.extend(_ast_nodes(child, line_offset, level + 1, parents + (child.name,)))
+
+    return nodes
+
+
+def comment_nodes(lines):
+    """Return TODO & FIXME comment nodes.
+
+    Args:
+        lines: List of source lines.
+
+    Returns:
+        List of `Node`.
+    """
+    nodes = []
+
+    for number, line in enumerate(lines, 1):
+        if '#' not in line:
+            continue
+
+        match = _COMMENT_RE.fullmatch(line)
+        if match:
+            tag = match.group('tag').upper()
+            nodes.append(Node(
+                NodeKind.todo if tag == 'TODO' else NodeKind.fixme,
+                match.group('text') or tag, number, 0, 0, ()
+            ))
+
+    return nodes
+
+
+def split_blocks(text):
+    """Split source into top level blocks.
+
+    Returns:
+        List of tuples (start line index, block text).
+    """
+    offsets = []
+    decorated = False
+    for match in _BLOCK_START_RE.finditer(text):
+        # Decorators belong to the following definition
+        if not decorated:
+            offsets.append(match.start())
+        decorated = match.group().startswith('@')
+
+    if not offsets or offsets[0]:
+        offsets.insert(0, 0)
+
+    blocks = []
+    line = 0
+    for begin, end in zip(offsets, offsets[1:] + [len(text)]):
+        block = text[begin:end]
+        blocks.append((line, block))
+        line += block.count('\n')
+
+    return blocks
+
+
+class _FileOutline:
+    def __init__(self):
+        self.digest = None
+        self.nodes = None
+        self.blocks = {}
+
+    def _parse_blocks(self, text):
+        blocks = {}
+        nodes = []
+
+        for line, block in split_blocks(text):
+            block_nodes = self.blocks.get(block)
+            if block_nodes is None:
+                block_nodes = _ast_nodes(ast.parse(block))
+            blocks[block] = block_nodes
+
+            nodes.extend(n._replace(line=n.line + line) for n in block_nodes)
+
+        self.blocks = blocks
+        return nodes
+
+    def outline(self, text):
+        digest = hashlib.md5(text.encode('utf-8', errors='replace')).digest()
+        if digest == self.digest:
+            return self.nodes
+
+        try:
+            nodes = self._parse_blocks(text)
+        except SyntaxError:
+            self.blocks = {}
+            nodes = _ast_nodes(ast.parse(text))
+
+        nodes = sorted(nodes + comment_nodes(text.splitlines()), key=lambda x: x.line)
+
+        self.digest = digest
+        self.nodes = nodes
+        return nodes
+
+
+class OutlineCache:
+    """Outline cache.
+
+    Outline is cached by the source hash, top level blocks are cached by
+    their text.
+
+    Args:
+        capacity: Maximum number of cached files.
+    """
+    def __init__(self, capacity=8):
+        self._capacity = capacity
+        self._files = OrderedDict()
+
+    def outline(self, text, filename=None):
+        """Return source outline.
+
+        Args:
+            text: Python source code.
+            filename: Source file name, key of the cache.
+
+        Returns:
+            List of `Node` ordered by line.
+
+        Raises:
+            SyntaxError: Source code is not valid.
+        """
+        outline = self._files.pop(filename, None) or _FileOutline()
+
+        self._files[filename] = outline
+        while len(self._files) > self._capacity:
+            self._files.popitem(last=False)
+
+        return outline.outline(text)
+
+
+_cache = None
+
+
+def get_outline_cache():
+    """Return shared outline cache instance."""
+    global _cache
+
+    if _cache is None:
+        _cache = OutlineCache()
+
+    return _cache
@@ -0,0 +1,148 @@
+#!python3
+
+"""Analysis of all project files.
+
+Files are analyzed in parallel (thread pool, Pythonista doesn't support
+`multiprocessing`) and results are cached per file. Cache is content
+addressed, file is analyzed again only if its content or the effective
+configuration was changed.
+
+.. warning:: This module must not introduce dependency on the ``editor`` module.
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from blackmamba.log import error
+from blackmamba.util.path import find_project_root
+from blackmamba.ide.analyzer import Violation
+from blackmamba.ide.result_cache import ResultCache, result_key
+
+
+def _read(path):
+    try:
+        with open(path, 'rt', encoding='utf-8', errors='replace') as input:
+            return input.read()
+    except OSError as e:
+        error('Failed to read {}: {}'.format(path, e))
+        return None
+
+
+class _ProjectConfig:
+    # Effective configuration computed once per project root
+    def __init__(self, config):
+        self._config = config
+        self._configs = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, path):
+        root = find_project_root(path)
+
+        with self._lock:
+            if root not in self._configs:
+                self._configs[root] = self._config(path)
+            return self._configs[root]
+
+
+def _analyze_file(path, analyze, config, cache):
+    # Runs in the executor, returns list of violations or None if the file can't be read
+    text = _read(path)
+    if text is None:
+        return None
+
+    key = result_key(text, config(path))
+
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        return [Violation(*v) for v in cached]
+
+    violations = analyze(text, path)
+    if cache is not None:
+        cache.set(key, [list(v) for v in violations])
+    return violations
+
+
+def _completed(future, futures, check):
+    # Yields result of the completed future
+    if check:
+        check()
+
+    path = futures[future]
+    try:
+        violations = future.result()
+    except Exception as e:
+        error('Failed to analyze {}: {}'.format(path, e))
+        return
+
+    if violations is not None:
+        yield path, violations
+
+
+def analyze_files(paths, analyze, config, cache=None, executor=None, check=None):
+    """Analyze files in parallel.
+
+    Files are read, looked up in the cache and analyzed in the executor.
+
+    Args:
+        paths: Iterable of file paths.
+        analyze: Function accepting text and path, returns list of `blackmamba.ide.analyzer.Violation`.
+            Called from the executor threads.
+        config: Function accepting path, returns JSON serializable effective configuration
+            of the file analysis (options, tool versions, ...), see `blackmamba.ide.result_cache.result_key`.
+            Called once per project root (`blackmamba.util.path.find_project_root`).
+        cache: `blackmamba.ide.result_cache.ResultCache` for violations, not cached if not provided.
+        executor: `concurrent.futures.Executor` used to analyze files. Thread pool
+            is used if not provided.
+        check: Function called periodically, can raise to cancel analysis.
+
+    Yields:
+        Tuple (path, list of `blackmamba.ide.analyzer.Violation`) in the order of completion,
+        even if paths are still being submitted. Files which can't be read or analyzed are skipped.
+    """
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+
+    config = _ProjectConfig(config)
+    completed = queue.Queue()
+    futures = {}
+    done = 0
+
+    try:
+        for path in paths:
+            if check:
+                check()
+
+            future = executor.submit(_analyze_file, path, analyze, config, cache)
+            futures[future] = path
+            future.add_done_callback(completed.put)
+
+            while not completed.empty():
+                yield from _completed(completed.get(), futures, check)
+                done += 1
+
+        while done < len(futures):
+            yield from _completed(completed.get(), futures, check)
+            done += 1
+    finally:
+        for future in futures:
+            future.cancel()
+
+        if own_executor:
+            executor.shutdown(wait=False)
+
+
+_cache = None
+
+
+def get_project_result_cache():
+    """Return shared cache of project files analysis results."""
+    global _cache
+
+    if _cache is None:
+        from blackmamba.util.path import get_cache_path
+        _cache = ResultCache(get_cache_path('project_analysis.json'), capacity=4096, max_size=16 * 1024 * 1024)
+        _cache.load()
+
+    return _cache
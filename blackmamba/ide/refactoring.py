@@ -9,6 +9,8 @@ from blackmamba.uikit.keyboard import (
     register_key_event_handler, unregister_key_event_handlers
 )
 from objc_util import ObjCClass, ObjCInstance, on_main_thread
+from blackmamba.ide.edits import apply_text
+import blackmamba.ide.tab as tab
 
 
 NSMutableAttributedString = ObjCClass('NSMutableAttributedString')
@@ -118,15 +120,40 @@ def ask_if_apply_change_set(change_set):
     return view.apply_changes
 
 
-def apply_change_set(change_set, path=None, initial_selection=None):
+def get_paths_opened_in_other_tabs(change_set, path):
+    """Return paths of changed files (except the path one) opened in editor tabs."""
+    opened = set(tab.get_paths() or [])
+    return [
+        change.resource.real_path
+        for change in change_set.changes
+        if change.resource.real_path != path and change.resource.real_path in opened
+    ]
+
+
+def apply_change_set(change_set, path=None, initial_selection=None, write_other_files=False):
     #
     # Why not project.do(change_set)?
     #
     #  - iCloud, Files, ... - there're special functions to update files, not a simple file system
     #  - we have to be sure just one file (= opened) is updated only, because of Pythonista reloading, ...
     #
+    # Other files are written only if write_other_files is True (project wide
+    # rename, ...), they're written via rope resources to keep the project
+    # up to date. Files opened in other tabs are skipped, Pythonista would
+    # overwrite them with the tab content.
+    #
+    # Returns list of skipped file paths.
+    #
+    skipped = []
+    opened = get_paths_opened_in_other_tabs(change_set, path) if path and write_other_files else []
+
     for change in change_set.changes:
         if path and not change.resource.real_path == path:
+            if write_other_files and hasattr(change, 'new_contents'):
+                if change.resource.real_path in opened:
+                    skipped.append(change.resource.real_path)
+                else:
+                    change.resource.write(change.new_contents)
             # Make sure we modify opened file only
             continue
 
@@ -135,6 +162,8 @@ def apply_change_set(change_set, path=None, initial_selection=None):
             continue
 
         end = len(editor.get_text()) - 1
-        editor.replace_text(0, end, change.new_contents)
+        apply_text(editor, change.new_contents, 0, end)
         if initial_selection:
             editor.set_selection(*initial_selection, scroll=True)
+
+    return skipped
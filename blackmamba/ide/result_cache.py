@@ -0,0 +1,163 @@
+#!python3
+
+"""Persistent cache of analysis results.
+
+Results are addressed by the hash of the analyzed text and the effective
+configuration (options, tool versions, ...). Least recently used results are
+evicted when the number of results or their size exceeds the limit.
+
+.. warning:: This module must not introduce dependency on the ``editor`` module.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from blackmamba.log import error
+
+_VERSION = 1
+
+
+def result_key(text, config):
+    """Return cache key of the text analyzed with the configuration.
+
+    Args:
+        text: Analyzed text.
+        config: JSON serializable configuration (options, tool versions, ...).
+
+    Returns:
+        Key (hex digest).
+    """
+    digest = hashlib.sha1(json.dumps(config, sort_keys=True, default=str).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(text.encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """LRU cache of JSON serializable results.
+
+    Args:
+        cache_path: Path of the file where the cache is persisted, `None` to disable persistence.
+        capacity: Maximum number of results.
+        max_size: Maximum size of all results (length of JSON encoded results).
+    """
+    def __init__(self, cache_path=None, capacity=256, max_size=4 * 1024 * 1024):
+        self._cache_path = cache_path
+        self._capacity = capacity
+        self._max_size = max_size
+        self._entries = OrderedDict()
+        self._size = 0
+        self._modified = False
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self._capacity or self._size > self._max_size):
+            _, (size, _) = self._entries.popitem(last=False)
+            self._size -= size
+
+    def get(self, key):
+        """Return result or `None` if there's no result for the key."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, result):
+        """Store result, least recently used results are evicted if limits are exceeded."""
+        size = len(json.dumps(result, separators=(',', ':')))
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._size -= old[0]
+
+            self._entries[key] = (size, result)
+            self._size += size
+            self._evict()
+            self._modified = True
+
+    def clear(self):
+        """Remove all results."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._modified = True
+
+    def load(self):
+        """Load persisted cache.
+
+        Returns:
+            `True` if cache was loaded, `False` otherwise.
+        """
+        if not self._cache_path or not os.path.isfile(self._cache_path):
+            return False
+
+        try:
+            with open(self._cache_path, 'rt') as input:
+                content = json.load(input)
+        except Exception as e:
+            error('Failed to load result cache: {}'.format(e))
+            return False
+
+        if not isinstance(content, dict) or content.get('version') != _VERSION:
+            return False
+
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            # Least recently used first
+            for key, size, result in content.get('results', []):
+                self._entries[key] = (size, result)
+                self._size += size
+            self._evict()
+            self._modified = False
+        return True
+
+    def save(self):
+        """Persist cache to the cache file if it was modified."""
+        if not self._cache_path:
+            return
+
+        with self._lock:
+            if not self._modified:
+                return
+
+            content = {
+                'version': _VERSION,
+                'results': [
+                    [key, size, result]
+                    for key, (size, result) in self._entries.items()
+                ]
+            }
+            self._modified = False
+
+        tmp_path = '{}.tmp'.format(self._cache_path)
+        try:
+            with open(tmp_path, 'wt') as output:
+                json.dump(content, output, separators=(',', ':'))
+            os.replace(tmp_path, self._cache_path)
+        except Exception as e:
+            error('Failed to save result cache: {}'.format(e))
+
+
+_cache = None
+
+
+def get_result_cache():
+    """Return shared result cache instance."""
+    global _cache
+
+    if _cache is None:
+        from blackmamba.util.path import get_cache_path
+        _cache = ResultCache(get_cache_path('analyzer_results.json'))
+        _cache.load()
+
+    return _cache
@@ -0,0 +1,398 @@
+#!python3
+
+"""Persistent object database of rope projects.
+
+Rope projects are created without the ``.ropeproject`` folder and the default
+`rope.base.oi.memorydb.MemoryDB` never persists static & dynamic object
+analysis results. Even if it does, the whole database is pickled as one blob.
+
+`SqliteDB` stores scopes in the sqlite database. File paths are loaded on
+demand, scopes of a file when the file is accessed and every scope is unpickled
+when it's accessed. Only added, modified and removed scopes are written and
+the database is compacted in the background thread when there's too much
+free space.
+
+.. warning:: This module must not introduce dependency on the ``editor`` module.
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+from rope.base.oi import objectdb
+from blackmamba.log import error
+
+_VERSION = 1
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY)',
+    'CREATE TABLE IF NOT EXISTS scopes ('
+    'path TEXT NOT NULL, key TEXT NOT NULL, data BLOB NOT NULL, PRIMARY KEY (path, key))'
+)
+
+
+class ScopeInfo(objectdb.ScopeInfo):
+    def __init__(self, call_info=None, per_name=None):
+        self.call_info = call_info or {}
+        self.per_name = per_name or {}
+
+    def get_per_name(self, name):
+        return self.per_name.get(name, None)
+
+    def save_per_name(self, name, value):
+        self.per_name[name] = value
+
+    def get_returned(self, parameters):
+        return self.call_info.get(parameters, None)
+
+    def get_call_infos(self):
+        for args, returned in self.call_info.items():
+            yield objectdb.CallInfo(args, returned)
+
+    def add_call(self, parameters, returned):
+        self.call_info[parameters] = returned
+
+    def dumps(self):
+        return pickle.dumps((self.call_info, self.per_name), pickle.HIGHEST_PROTOCOL)
+
+
+def _load_scope(data):
+    try:
+        return ScopeInfo(*pickle.loads(data))
+    except Exception as e:
+        error('Failed to load rope scope info: {}'.format(e))
+        return ScopeInfo()
+
+
+class FileInfo(objectdb.FileInfo):
+    """Scopes of one file.
+
+    Args:
+        stored: Dictionary of scope key and pickled scope info stored in the database.
+    """
+    def __init__(self, stored=None):
+        self._stored = dict(stored or {})
+        # Pickled data (not accessed yet) or ScopeInfo
+        self._scopes = dict(self._stored)
+
+    def create_scope(self, key):
+        self._scopes[key] = ScopeInfo()
+
+    def keys(self):
+        return self._scopes.keys()
+
+    def __contains__(self, key):
+        return key in self._scopes
+
+    def __getitem__(self, key):
+        scope = self._scopes[key]
+        if isinstance(scope, bytes):
+            scope = _load_scope(scope)
+            self._scopes[key] = scope
+        return scope
+
+    def __delitem__(self, key):
+        del self._scopes[key]
+
+    def __iter__(self):
+        for key in self._scopes:
+            yield key
+
+    def __len__(self):
+        return len(self._scopes)
+
+    def __setitem__(self, key, scope):
+        self._scopes[key] = scope
+
+    def changes(self):
+        """Return scopes changed since the last write.
+
+        Returns:
+            List of tuples (key, pickled data), data is `None` for removed scopes.
+        """
+        changes = [(key, None) for key in self._stored if key not in self._scopes]
+
+        for key, scope in self._scopes.items():
+            if isinstance(scope, bytes):
+                continue
+
+            data = scope.dumps()
+            if data != self._stored.get(key):
+                changes.append((key, data))
+
+        return changes
+
+    def written(self, changes):
+        """Mark changes returned by `changes` as written."""
+        for key, data in changes:
+            if data is None:
+                self._stored.pop(key, None)
+            else:
+                self._stored[key] = data
+
+
+class SqliteDB(objectdb.FileDict):
+    """Object database backend (`rope.base.oi.objectdb.ObjectDB`) stored in the sqlite database.
+
+    Connection is closed after every write, rope writes when the project is synced or closed.
+
+    Args:
+        db_path: Database file path.
+        compact_ratio: Database is compacted after write if the ratio of free pages is higher.
+        compact_pages: Database with fewer pages is never compacted.
+    """
+    def __init__(self, db_path, compact_ratio=0.25, compact_pages=256):
+        self.files = self
+        self._db_path = db_path
+        self._compact_ratio = compact_ratio
+        self._compact_pages = compact_pages
+        self._connection = None
+        self._paths = None
+        self._files = {}
+        self._created = set()
+        self._removed = set()
+        self._lock = threading.RLock()
+        self._compaction = None
+
+    def _connect(self):
+        connection = sqlite3.connect(self._db_path, check_same_thread=False)
+        try:
+            if connection.execute('PRAGMA user_version').fetchone()[0] != _VERSION:
+                connection.execute('DROP TABLE IF EXISTS files')
+                connection.execute('DROP TABLE IF EXISTS scopes')
+                connection.execute('PRAGMA user_version = {}'.format(_VERSION))
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        return connection
+
+    def _get_connection(self):
+        if self._connection is None:
+            try:
+                self._connection = self._connect()
+            except sqlite3.DatabaseError as e:
+                # Corrupted database, start from scratch
+                error('Failed to open rope object database, removing it: {}'.format(e))
+                os.remove(self._db_path)
+                self._connection = self._connect()
+        return self._connection
+
+    def _close_connection(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _get_paths(self):
+        if self._paths is None:
+            rows = self._get_connection().execute('SELECT path FROM files')
+            self._paths = {path for path, in rows}
+        return self._paths
+
+    def keys(self):
+        with self._lock:
+            return list(self._get_paths())
+
+    def __iter__(self):
+        for path in self.keys():
+            yield path
+
+    def __len__(self):
+        with self._lock:
+            return len(self._get_paths())
+
+    def __setitem__(self, path, file_info):
+        self._add(path, file_info)
+
+    def __contains__(self, path):
+        with self._lock:
+            return path in self._get_paths()
+
+    def __getitem__(self, path):
+        with self._lock:
+            if path not in self._get_paths():
+                raise KeyError(path)
+
+            file_info = self._files.get(path)
+            if file_info is None:
+                rows = self._get_connection().execute('SELECT key, data FROM scopes WHERE path = ?', (path,))
+                file_info = FileInfo({key: data for key, data in rows})
+                self._files[path] = file_info
+
+            return file_info
+
+    def create(self, path):
+        self._add(path, FileInfo())
+
+    def _add(self, path, file_info):
+        with self._lock:
+            if path in self:
+                del self[path]
+
+            self._get_paths().add(path)
+            self._files[path] = file_info
+            self._created.add(path)
+
+    def rename(self, file, newfile):
+        with self._lock:
+            if file not in self:
+                return
+
+            old_file_info = self[file]
+            file_info = FileInfo()
+            for key in old_file_info:
+                file_info._scopes[key] = old_file_info[key]
+
+            del self[file]
+            self._add(newfile, file_info)
+
+    def __delitem__(self, path):
+        with self._lock:
+            self._get_paths().remove(path)
+            self._files.pop(path, None)
+            self._created.discard(path)
+            self._removed.add(path)
+
+    def write(self):
+        """Write changes and close the connection.
+
+        Database is compacted in the background thread if needed.
+        """
+        with self._lock:
+            try:
+                self._write()
+            except Exception as e:
+                error('Failed to write rope object database: {}'.format(e))
+                return
+            finally:
+                self._close_connection()
+
+            self._compact_if_needed()
+
+    def _write(self):
+        if self._connection is None and not (self._created or self._removed or self._files):
+            # Nothing was loaded, nothing was changed
+            return
+
+        connection = self._get_connection()
+        written = []
+
+        with connection:
+            for path in self._removed:
+                connection.execute('DELETE FROM scopes WHERE path = ?', (path,))
+                connection.execute('DELETE FROM files WHERE path = ?', (path,))
+
+            connection.executemany('INSERT OR IGNORE INTO files (path) VALUES (?)', ((path,) for path in self._created))
+
+            for path, file_info in self._files.items():
+                changes = file_info.changes()
+                for key, data in changes:
+                    if data is None:
+                        connection.execute('DELETE FROM scopes WHERE path = ? AND key = ?', (path, key))
+                    else:
+                        connection.execute(
+                            'INSERT OR REPLACE INTO scopes (path, key, data) VALUES (?, ?, ?)', (path, key, data)
+                        )
+                written.append((file_info, changes))
+
+        for file_info, changes in written:
+            file_info.written(changes)
+        self._created.clear()
+        self._removed.clear()
+
+    def _compaction_needed(self):
+        connection = self._get_connection()
+        pages = connection.execute('PRAGMA page_count').fetchone()[0]
+        free_pages = connection.execute('PRAGMA freelist_count').fetchone()[0]
+        return pages >= self._compact_pages and free_pages > pages * self._compact_ratio
+
+    def _compact_if_needed(self):
+        if self._compaction is not None and self._compaction.is_alive():
+            return
+
+        try:
+            needed = self._compaction_needed()
+        except Exception as e:
+            error('Failed to check rope object database: {}'.format(e))
+            return
+        finally:
+            self._close_connection()
+
+        if needed:
+            self._compaction = threading.Thread(target=self.compact, daemon=True)
+            self._compaction.start()
+
+    def compact(self):
+        """Rebuild the database file, free pages are released.
+
+        Database is locked, reads & writes wait until it's compacted.
+        """
+        with self._lock:
+            try:
+                self._get_connection().execute('VACUUM')
+            except Exception as e:
+                error('Failed to compact rope object database: {}'.format(e))
+            finally:
+                self._close_connection()
+
+    def wait(self, timeout=None):
+        """Wait until the background compaction is finished.
+
+        Returns:
+            `True` if there's nothing to do, `False` if timed out.
+        """
+        compaction = self._compaction
+        if compaction is None:
+            return True
+
+        compaction.join(timeout)
+        return not compaction.is_alive()
+
+
+def _validate_modified_files(object_info, written):
+    # Rope observes files modified in the session only
+    for path in object_info.objectdb.get_files():
+        resource = object_info.to_pyobject.path_to_resource(path)
+        if resource is None:
+            continue
+
+        try:
+            modified = os.path.getmtime(resource.real_path) > written
+        except OSError:
+            continue
+
+        if modified:
+            object_info._resource_changed(resource)
+
+
+def install_objectdb(project, db_path):
+    """Replace the project object database with `SqliteDB`.
+
+    Files which do not exist anymore are removed from the database, scopes
+    of files modified since the database was written (or modified later, when
+    the project is validated) are validated. Database is written whenever the
+    project is synced or closed.
+
+    Args:
+        project: `rope.base.project.Project`.
+        db_path: Database file path.
+
+    Returns:
+        Installed `SqliteDB`.
+    """
+    object_info = project.pycore.object_info
+    try:
+        written = os.path.getmtime(db_path)
+    except OSError:
+        written = None
+
+    db = SqliteDB(db_path)
+    object_info.objectdb = objectdb.ObjectDB(db, object_info.validation)
+    # Same as the validate_objectdb project preference
+    object_info._init_validation()
+    if written is not None:
+        _validate_modified_files(object_info, written)
+    project.data_files.add_write_hook(db.write)
+    return db
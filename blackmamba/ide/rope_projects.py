@@ -0,0 +1,148 @@
+#!python3
+
+"""Rope projects shared by refactoring scripts.
+
+Creating new `rope.base.project.Project` for every refactoring throws away
+the module cache and all the analysis. Projects are kept in the registry,
+keyed by the project root folder, and least recently used projects are
+closed when the capacity is exceeded.
+
+Files are modified by Pythonista, not by rope. Project is validated whenever
+it's reused - rope resource observers compare modification times of cached
+modules and only modified modules are analyzed again.
+
+Object information (static & dynamic object analysis results) is persisted
+per project root in the caches folder (`blackmamba.ide.rope_objectdb`).
+
+.. warning:: This module must not introduce dependency on the ``editor`` module.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from blackmamba.log import error
+from blackmamba.util.path import find_project_root, get_cache_path
+
+
+def _objectdb_path(root):
+    return get_cache_path('rope_objectdb-{}.sqlite'.format(hashlib.md5(root.encode('utf-8')).hexdigest()))
+
+
+def _create_project(root):
+    from rope.base.project import Project
+    from blackmamba.ide.rope_objectdb import install_objectdb
+
+    project = Project(root, ropefolder=None)
+    try:
+        install_objectdb(project, _objectdb_path(root))
+    except Exception as e:
+        error('Failed to install rope object database, using in-memory one: {}'.format(e))
+    return project
+
+
+def _close_project(project):
+    try:
+        project.close()
+    except Exception as e:
+        error('Failed to close rope project {}: {}'.format(project.address, e))
+
+
+class ProjectRegistry:
+    """Registry of rope projects.
+
+    Args:
+        capacity: Maximum number of open projects.
+        project_factory: Function accepting root folder, returns new project.
+            `rope.base.project.Project` without ``.ropeproject`` folder if not provided.
+    """
+    def __init__(self, capacity=4, project_factory=None):
+        self._capacity = capacity
+        self._project_factory = project_factory or _create_project
+        self._projects = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._projects)
+
+    def project(self, path):
+        """Return project of the file.
+
+        Args:
+            path: File path, project root is found by `blackmamba.util.path.find_project_root`.
+
+        Returns:
+            Validated project.
+        """
+        root = find_project_root(path)
+        closed = []
+
+        with self._lock:
+            project = self._projects.pop(root, None)
+            if project is None:
+                project = self._project_factory(root)
+            else:
+                project.validate()
+
+            self._projects[root] = project
+
+            while len(self._projects) > self._capacity:
+                closed.append(self._projects.popitem(last=False)[1])
+
+        for old_project in closed:
+            _close_project(old_project)
+
+        return project
+
+    @contextmanager
+    def open(self, path):
+        """Context manager providing project of the file, see `project`.
+
+        Project is discarded if an exception other than
+        `rope.base.exceptions.RopeError` is raised.
+        """
+        from rope.base.exceptions import RopeError
+
+        project = self.project(path)
+        try:
+            yield project
+        except RopeError:
+            raise
+        except Exception:
+            # Project state can be inconsistent
+            self.discard(project)
+            raise
+
+    def discard(self, project):
+        """Close the project and remove it from the registry.
+
+        Use it if the project state can be inconsistent (unexpected failure, ...).
+        """
+        with self._lock:
+            for root, registered in list(self._projects.items()):
+                if registered is project:
+                    del self._projects[root]
+
+        _close_project(project)
+
+    def close(self):
+        """Close all projects."""
+        with self._lock:
+            projects = list(self._projects.values())
+            self._projects.clear()
+
+        for project in projects:
+            _close_project(project)
+
+
+_registry = None
+
+
+def get_project_registry():
+    """Return shared rope project registry."""
+    global _registry
+
+    if _registry is None:
+        _registry = ProjectRegistry()
+
+    return _registry
@@ -2,65 +2,56 @@
 
 import editor
 from blackmamba.config import get_config_value
+from blackmamba.ide.line_index import get_line_index
 
 
-def get_line_count():
+def _line_index():
     text = editor.get_text()
 
     if text is None:
         return None
 
-    return len(text.splitlines())
+    return get_line_index(text)
+
+
+def get_line_count():
+    index = _line_index()
+
+    if index is None:
+        return None
+
+    return index.line_count
 
 
 def get_line_number():
-    text = editor.get_text()
+    index = _line_index()
 
-    if text is None:
+    if index is None:
         return None
 
-    return text.count('\n', 0, editor.get_selection()[0]) + 1
+    return index.line_number(editor.get_selection()[0])
 
 
 def get_column_index():
-    text = editor.get_text()
+    index = _line_index()
 
-    if text is None:
+    if index is None:
         return None
 
-    col = 0
-    index = editor.get_selection()[0]
-    while index > 0:
-        if text[index - 1] == '\n':
-            break
-        index -= 1
-        col += 1
-
-    return col
+    return index.column_index(editor.get_selection()[0])
 
 
 def scroll_to_line(line_number, relative=False):
-    text = editor.get_text()
-    if not text:
+    index = _line_index()
+    if index is None or not index.text:
         return
 
     if relative:
-        current_line = get_line_number()
-        line_count = get_line_count()
-
-        if current_line is None or line_count is None:
-            return
-
-        line_number = max(min(current_line + line_number, line_count), 1)
+        current_line = index.line_number(editor.get_selection()[0])
+        line_number = max(min(current_line + line_number, index.line_count), 1)
 
     # https://github.com/omz/Pythonista-Issues/issues/365
-    start = 0
-    for index, line in enumerate(text.splitlines(True)):
-        if index == line_number - 1:
-            editor.set_selection(start)
-            return
-        start += len(line)
-    editor.set_selection(start)
+    editor.set_selection(index.line_offset(line_number))
 
 
 def page_up():
@@ -0,0 +1,182 @@
+#!python3
+
+"""Workspace symbol index.
+
+Classes, functions, methods and module level assignments of Python files.
+Symbols are cached per file and updated incrementally, see
+`blackmamba.ide.incremental_index`.
+"""
+
+import os
+import ast
+import json
+from collections import namedtuple
+from blackmamba.log import error
+from blackmamba.ide.incremental_index import IncrementalIndex, IndexEntry
+
+_VERSION = 1
+
+
+class SymbolKind:
+    cls = 'class'
+    function = 'function'
+    method = 'method'
+    variable = 'variable'
+
+
+Symbol = namedtuple('Symbol', ['kind', 'name', 'line', 'column', 'container'])
+Symbol.__doc__ = """Symbol.
+
+Attributes:
+    kind: `SymbolKind` value.
+    name: Symbol name.
+    line: Line number (starts from 1).
+    column: Column index (starts from 0).
+    container: Dotted name of the parent class (``'Foo.Bar'``) or ``''``.
+"""
+
+
+def _target_names(target):
+    if isinstance(target, ast.Name):
+        return [target]
+    if isinstance(target, (ast.Tuple, ast.List)):
+        return [n for t in target.elts for n in _target_names(t)]
+    return []
+
+
+def _assignment_symbols(node):
+    if isinstance(node, ast.Assign):
+        targets = node.targets
+    elif isinstance(node, ast.AnnAssign):
+        targets = [node.target]
+    else:
+        return []
+
+    return [
+        Symbol(SymbolKind.variable, name.id, name.lineno, name.col_offset, '')
+        for target in targets
+        for name in _target_names(target)
+    ]
+
+
+def _symbols(parent, container, symbols):
+    in_class = isinstance(parent, ast.ClassDef)
+
+    for node in parent.body:
+        if isinstance(node, ast.ClassDef):
+            symbols.append(Symbol(SymbolKind.cls, node.name, node.lineno, node.col_offset, container))
+            _symbols(node, '{}.{}'.format(container, node.name) if container else node.name, symbols)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            kind = SymbolKind.method if in_class else SymbolKind.function
+            symbols.append(Symbol(kind, node.name, node.lineno, node.col_offset, container))
+        elif not container:
+            symbols.extend(_assignment_symbols(node))
+
+
+def parse_symbols(text):
+    """Return list of module symbols.
+
+    Args:
+        text: Python source code.
+
+    Returns:
+        List of `Symbol` in the source order.
+
+    Raises:
+        SyntaxError: Source code is not valid.
+    """
+    symbols = []
+    _symbols(ast.parse(text), '', symbols)
+    return symbols
+
+
+def _parse_file(data):
+    # Runs in the worker, deeply nested source can exhaust the parser stack
+    try:
+        return parse_symbols(data.decode('utf-8', errors='replace'))
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return []
+
+
+class SymbolIndex(IncrementalIndex):
+    """Symbol index of Python files.
+
+    Args:
+        cache_path: Path of the file where the index is persisted, `None` to disable persistence.
+        executor: `concurrent.futures.Executor` used to index files. Thread pool
+            is used if not provided (Pythonista doesn't support `multiprocessing`).
+    """
+    def __init__(self, cache_path=None, executor=None):
+        super().__init__(_parse_file, executor)
+        self._cache_path = cache_path
+
+    def load(self):
+        """Load persisted index.
+
+        Returns:
+            `True` if index was loaded, `False` otherwise.
+        """
+        if not self._cache_path or not os.path.isfile(self._cache_path):
+            return False
+
+        try:
+            with open(self._cache_path, 'rt') as input:
+                content = json.load(input)
+        except Exception as e:
+            error('Failed to load symbol index: {}'.format(e))
+            return False
+
+        if content.get('version') != _VERSION:
+            return False
+
+        self.entries = {
+            path: IndexEntry(mtime, size, digest, [Symbol(*s) for s in symbols])
+            for path, (mtime, size, digest, symbols) in content.get('files', {}).items()
+        }
+        return True
+
+    def save(self):
+        """Persist index to the cache file."""
+        if not self._cache_path:
+            return
+
+        content = {
+            'version': _VERSION,
+            'files': {
+                path: [entry.mtime, entry.size, entry.digest, entry.value]
+                for path, entry in self.entries.items()
+            }
+        }
+
+        tmp_path = '{}.tmp'.format(self._cache_path)
+        try:
+            with open(tmp_path, 'wt') as output:
+                json.dump(content, output, separators=(',', ':'))
+            os.replace(tmp_path, self._cache_path)
+        except Exception as e:
+            error('Failed to save symbol index: {}'.format(e))
+
+    def symbols(self):
+        """Return iterator over all symbols.
+
+        Yields:
+            Tuple (file path, `Symbol`).
+        """
+        for path, entry in sorted(self.entries.items()):
+            for symbol in entry.value:
+                yield path, symbol
+
+
+_index = None
+
+
+def get_symbol_index():
+    """Return shared symbol index instance."""
+    global _index
+
+    if _index is None:
+        from blackmamba.util.path import get_cache_path
+        _index = SymbolIndex(get_cache_path('symbol_index.json'))
+        _index.load()
+
+    return _index
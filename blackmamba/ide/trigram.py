@@ -0,0 +1,430 @@
+#!python3
+
+"""Trigram index of text files.
+
+Every indexed file is split into lower cased trigrams (three character
+substrings). Index keeps posting list (sorted array of document ids) for every
+trigram. Query is converted to the set of trigrams every matching file must
+contain, posting lists are intersected and only candidate files are read
+and searched.
+
+Index is maintained incrementally, only files with changed modification time
+or size are read again. Files larger than `MAX_FILE_SIZE` are not indexed,
+they're candidates of every query.
+"""
+
+import os
+import re
+import pickle
+import threading
+from array import array
+from blackmamba.log import error
+
+try:
+    import re._parser as sre_parse
+    from re._constants import BRANCH, LITERAL, SUBPATTERN
+except ImportError:
+    import sre_parse
+    from sre_constants import BRANCH, LITERAL, SUBPATTERN
+
+_VERSION = 2
+
+# Larger files are not indexed, they're always searched
+MAX_FILE_SIZE = 1024 * 1024
+
+
+def trigrams(text):
+    """Return set of lower cased trigrams of the text."""
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _literal_runs(parsed, runs, run):
+    # Collects literal runs of the parsed regular expression, which must
+    # be matched. Returns current (unfinished) run.
+    for op, av in parsed:
+        if op is LITERAL:
+            run.append(chr(av))
+        elif op is SUBPATTERN:
+            # (group, add flags, del flags, pattern) or (group, pattern)
+            run = _literal_runs(av[-1], runs, run)
+        else:
+            runs.append(''.join(run))
+            run = []
+    return run
+
+
+def regex_literals(pattern):
+    """Return literals every regular expression match must contain.
+
+    Only top level (and group) sequences of literal characters are collected,
+    alternatives, repetitions, ... are skipped.
+
+    Args:
+        pattern: Regular expression pattern.
+
+    Returns:
+        List of literals.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return []
+
+    if any(op is BRANCH for op, _ in parsed):
+        return []
+
+    runs = []
+    runs.append(''.join(_literal_runs(parsed, runs, [])))
+    return [r for r in runs if r]
+
+
+class Query:
+    """Search query.
+
+    Args:
+        text: Literal text or regular expression pattern.
+        regex: `True` if the text is a regular expression.
+        ignore_case: `True` for case insensitive search.
+
+    Attributes:
+        regex: Compiled regular expression.
+        trigrams: Set of trigrams every matching file must contain.
+
+    Raises:
+        ValueError: Text (or literal of the regular expression) contains a line break,
+            files are searched line by line and it can't be matched.
+    """
+    def __init__(self, text, regex=False, ignore_case=True):
+        flags = re.IGNORECASE if ignore_case else 0
+
+        if regex:
+            literals = regex_literals(text)
+            self.regex = re.compile(text, flags)
+        else:
+            literals = [text]
+            self.regex = re.compile(re.escape(text), flags)
+
+        if any('\n' in literal for literal in literals):
+            raise ValueError('Line breaks can not be matched, files are searched line by line')
+
+        self.trigrams = set()
+        for literal in literals:
+            self.trigrams.update(trigrams(literal))
+
+
+def _is_binary(data):
+    return b'\0' in data[:1024]
+
+
+def _read_text(path):
+    with open(path, 'rb') as input:
+        data = input.read()
+
+    if _is_binary(data):
+        return None
+
+    return data.decode('utf-8', errors='replace')
+
+
+def _read_unsearched_text(path, searched):
+    # None if the file is binary or was already searched
+    stat = os.stat(path)
+    if searched is not None:
+        if searched.get(path) == (stat.st_mtime, stat.st_size):
+            return None
+        searched[path] = (stat.st_mtime, stat.st_size)
+
+    return _read_text(path)
+
+
+class TrigramIndex:
+    """Trigram index of files.
+
+    Index is persisted with `pickle`, posting lists are too large for JSON.
+
+    Args:
+        cache_path: Path of the file where the index is persisted, `None` to disable persistence.
+    """
+    def __init__(self, cache_path=None):
+        self._cache_path = cache_path
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        # Document id -> path, None for removed documents
+        self._documents = []
+        # Path -> (document id, mtime, size)
+        self._paths = {}
+        # Trigram -> array of document ids
+        self._postings = {}
+        # Ids of documents, which are too large to be indexed
+        self._large = set()
+        self._removed = 0
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __contains__(self, path):
+        return path in self._paths
+
+    def load(self):
+        """Load persisted index.
+
+        Returns:
+            `True` if index was loaded, `False` otherwise.
+        """
+        if not self._cache_path or not os.path.isfile(self._cache_path):
+            return False
+
+        try:
+            with open(self._cache_path, 'rb') as input:
+                content = pickle.load(input)
+        except Exception as e:
+            error('Failed to load trigram index: {}'.format(e))
+            return False
+
+        if not isinstance(content, dict) or content.get('version') != _VERSION:
+            return False
+
+        with self._lock:
+            self._documents = content['documents']
+            self._paths = content['paths']
+            self._postings = content['postings']
+            self._large = content['large']
+            self._removed = content['removed']
+        return True
+
+    def save(self):
+        """Persist index to the cache file."""
+        if not self._cache_path:
+            return
+
+        with self._lock:
+            content = {
+                'version': _VERSION,
+                'documents': self._documents,
+                'paths': self._paths,
+                'postings': self._postings,
+                'large': self._large,
+                'removed': self._removed
+            }
+
+            tmp_path = '{}.tmp'.format(self._cache_path)
+            try:
+                with open(tmp_path, 'wb') as output:
+                    pickle.dump(content, output, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self._cache_path)
+            except Exception as e:
+                error('Failed to save trigram index: {}'.format(e))
+
+    def _remove(self, path):
+        document = self._paths.pop(path)[0]
+        self._documents[document] = None
+        self._large.discard(document)
+        self._removed += 1
+
+    def _add(self, path, mtime, size):
+        document = len(self._documents)
+        self._documents.append(path)
+        self._paths[path] = (document, mtime, size)
+
+        if size > MAX_FILE_SIZE:
+            self._large.add(document)
+            return
+
+        try:
+            text = _read_text(path)
+        except OSError:
+            return
+
+        if not text:
+            return
+
+        postings = self._postings
+        for trigram in trigrams(text):
+            posting = postings.get(trigram)
+            if posting is None:
+                postings[trigram] = array('l', [document])
+            else:
+                posting.append(document)
+
+    def _compact(self):
+        # Renumber documents, remove ids of removed documents from posting lists
+        ids = {}
+        documents = []
+        for document, path in enumerate(self._documents):
+            if path is not None:
+                ids[document] = len(documents)
+                documents.append(path)
+
+        postings = {}
+        for trigram, posting in self._postings.items():
+            posting = array('l', [ids[d] for d in posting if d in ids])
+            if posting:
+                postings[trigram] = posting
+
+        self._documents = documents
+        self._paths = {path: (ids[d], mtime, size) for path, (d, mtime, size) in self._paths.items()}
+        self._postings = postings
+        self._large = {ids[d] for d in self._large}
+        self._removed = 0
+
+    def update(self, paths, check=None, remove=True):
+        """Update index.
+
+        New and modified (mtime or size) files are indexed, files not in paths are removed.
+
+        Args:
+            paths: Iterable of file paths.
+            check: Function called periodically, can raise to cancel update. Index
+                remains consistent, but it's not complete.
+            remove: `False` to keep files not in paths (index is updated in chunks, ...),
+                see `retain`.
+
+        Returns:
+            `True` if index was changed, `False` otherwise.
+        """
+        changed = False
+
+        with self._lock:
+            seen = set()
+
+            for path in paths:
+                if check:
+                    check()
+
+                seen.add(path)
+
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+
+                entry = self._paths.get(path)
+                if entry and entry[1] == stat.st_mtime and entry[2] == stat.st_size:
+                    continue
+
+                if entry:
+                    self._remove(path)
+                self._add(path, stat.st_mtime, stat.st_size)
+                changed = True
+
+            if remove:
+                changed = self._retain(seen) or changed
+
+        return changed
+
+    def _retain(self, paths):
+        # Lock must be held
+        removed = [p for p in self._paths if p not in paths]
+        for path in removed:
+            self._remove(path)
+
+        if self._removed > len(self._paths):
+            self._compact()
+
+        return bool(removed)
+
+    def retain(self, paths):
+        """Remove files not in paths.
+
+        Args:
+            paths: Set of file paths.
+
+        Returns:
+            `True` if index was changed, `False` otherwise.
+        """
+        with self._lock:
+            return self._retain(paths)
+
+    def _indexed_candidates(self, trigrams):
+        # Lock must be held, returns set of document ids
+        postings = []
+        for trigram in trigrams:
+            posting = self._postings.get(trigram)
+            if not posting:
+                return set()
+            postings.append(posting)
+
+        postings.sort(key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result.intersection_update(posting)
+            if not result:
+                break
+
+        return result
+
+    def candidates(self, query):
+        """Return candidate files of the query.
+
+        Files larger than `MAX_FILE_SIZE` are not indexed and they're always candidates.
+
+        Args:
+            query: `Query` instance.
+
+        Returns:
+            Sorted list of file paths, which can match the query.
+        """
+        with self._lock:
+            documents = self._documents
+
+            if not query.trigrams:
+                return sorted(p for p in documents if p is not None)
+
+            result = self._indexed_candidates(query.trigrams) | self._large
+            return sorted(documents[d] for d in result if documents[d] is not None)
+
+    def search(self, query, check=None, paths=None, searched=None):
+        """Search files.
+
+        Candidate files (see `candidates`) are read and searched line by line.
+        Lines are split by ``\n`` only (like editor lines), line breaks are never
+        matched.
+
+        Args:
+            query: `Query` instance.
+            check: Function called periodically, can raise to cancel search.
+            paths: Set of file paths, search only these candidates.
+            searched: Dictionary of file path and tuple (mtime, size), which is
+                updated with searched files. Files with unchanged modification time
+                & size are not searched again.
+
+        Yields:
+            Tuple (file path, line number starting from 1, line).
+        """
+        for path in self.candidates(query):
+            if check:
+                check()
+
+            if paths is not None and path not in paths:
+                continue
+
+            try:
+                text = _read_unsearched_text(path, searched)
+            except OSError:
+                continue
+
+            if not text or not query.regex.search(text):
+                continue
+
+            # str.splitlines splits on form feeds, \u2028, ... as well
+            for number, line in enumerate(text.split('\n'), 1):
+                if query.regex.search(line):
+                    yield path, number, line
+
+
+_index = None
+
+
+def get_trigram_index():
+    """Return shared trigram index instance."""
+    global _index
+
+    if _index is None:
+        from blackmamba.util.path import get_cache_path
+        _index = TrigramIndex(get_cache_path('trigram_index.pickle'))
+        _index.load()
+
+    return _index
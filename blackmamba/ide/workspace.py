@@ -0,0 +1,196 @@
+#!python3
+
+"""Shared workspace file index.
+
+Open Quickly, Run Quickly, Drag & Drop, ... do not walk the file system
+on their own. They query the shared `Workspace` for a `WorkspaceView` with
+their own filters. All views share the same `FileIndex` data.
+"""
+
+import os
+import threading
+from blackmamba.ide.file_index import FileIndex, cache_file_name
+from blackmamba.ide.ignore import IgnoreFilter, ignore_patterns
+
+DOCUMENTS = os.path.expanduser('~/Documents')
+
+
+class WorkspaceView:
+    """Filtered view over the shared file index.
+
+    Args:
+        index: `FileIndex` instance.
+        allow_file: Function accepting folder path & file name, returns `True` if file should be included.
+        ignore_folders: Folders & files to ignore, same format as ``file_picker.ignore_folders``.
+        ignore_hidden: Ignore folders starting with ``'.'``.
+        gitignore: Ignore folders & files ignored by ``.gitignore`` files.
+    """
+    def __init__(self, index, allow_file=None, ignore_folders=None, ignore_hidden=False, gitignore=False):
+        self.index = index
+        self._allow_file = allow_file
+
+        if ignore_folders or ignore_hidden or gitignore:
+            self._folder_filter = IgnoreFilter(index.root, ignore_folders, ignore_hidden,
+                                               index.gitignore_rules if gitignore else None)
+        else:
+            self._folder_filter = None
+
+    def _filter_files(self, folder, files):
+        if self._folder_filter:
+            files = self._folder_filter.files(folder, files)
+        if self._allow_file:
+            files = [f for f in files if self._allow_file(folder, f)]
+        return files
+
+    @property
+    def root(self):
+        return self.index.root
+
+    def folders(self):
+        """Return iterator over folders.
+
+        Yields:
+            Tuple (folder path, list of allowed file names).
+        """
+        for folder, files in self.index.folders(self._folder_filter):
+            yield folder, self._filter_files(folder, files)
+
+    def files(self):
+        """Return iterator over allowed files.
+
+        Yields:
+            Tuple (folder path, file name).
+        """
+        for folder, files in self.folders():
+            for name in files:
+                yield folder, name
+
+    def walk(self):
+        """Revalidate index and return iterator over folders as they're revalidated.
+
+        See `blackmamba.ide.file_index.FileIndex.walk`.
+
+        Yields:
+            Tuple (folder path, list of allowed file names).
+        """
+        for folder, files in self.index.walk(self._folder_filter):
+            yield folder, self._filter_files(folder, files)
+
+    def subfolders(self, folder):
+        """Return list of subfolder paths."""
+        return self.index.subfolders(folder, self._folder_filter)
+
+    def refresh(self, folder=None):
+        """Revalidate folder subtree (or whole index) against the file system."""
+        return self.index.refresh(folder)
+
+
+class Workspace:
+    """File indexes for workspace roots.
+
+    Args:
+        ignore_folders: Folders the index never walks, same format as ``file_picker.ignore_folders``.
+        cache_folder: Folder where indexes are persisted, `None` to disable persistence.
+        gitignore: `True` if the index never walks folders ignored by ``.gitignore`` files.
+    """
+    def __init__(self, ignore_folders=None, cache_folder=None, gitignore=False):
+        self._ignore_folders = ignore_folders
+        self._cache_folder = cache_folder
+        self._gitignore = gitignore
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def index(self, root):
+        """Return file index of the root folder.
+
+        Index is loaded from the cache and it can be stale or even empty if there's
+        no cache. Use `update` or `WorkspaceView.walk` to revalidate it.
+        """
+        root = os.path.normpath(root)
+
+        with self._lock:
+            index = self._indexes.get(root)
+            if index:
+                return index
+
+            cache_path = os.path.join(self._cache_folder, cache_file_name(root)) if self._cache_folder else None
+            index = FileIndex(root, self._ignore_folders, cache_path, self._gitignore)
+            index.load()
+            self._indexes[root] = index
+            return index
+
+    def view(self, root, allow_file=None, ignore_folders=None, ignore_hidden=False, gitignore=False):
+        """Return filtered view over the root folder index, see `WorkspaceView`."""
+        return WorkspaceView(self.index(root), allow_file, ignore_folders, ignore_hidden, gitignore)
+
+    def update(self, roots=None):
+        """Revalidate indexes against the file system.
+
+        Args:
+            roots: Roots to revalidate, all loaded indexes if `None`.
+
+        Returns:
+            `True` if any index was changed, `False` otherwise.
+        """
+        with self._lock:
+            if roots is None:
+                roots = list(self._indexes.keys())
+            roots = [os.path.normpath(r) for r in roots]
+            indexes = [self._indexes[r] for r in roots if r in self._indexes]
+
+        changed = False
+        for index in indexes:
+            changed = index.update() or changed
+        return changed
+
+    def update_in_background(self, roots=None, did_change=None):
+        """Revalidate indexes in the background thread.
+
+        Args:
+            roots: Roots to revalidate, all loaded indexes if `None`.
+            did_change: Function called (from the background thread) if any index was changed.
+
+        Returns:
+            Background `threading.Thread`.
+        """
+        def update():
+            if self.update(roots) and did_change:
+                did_change()
+
+        thread = threading.Thread(target=update, daemon=True)
+        thread.start()
+        return thread
+
+
+def _walk_ignore_folders():
+    from blackmamba.config import get_config_value
+
+    # Walk ignores patterns of all consumers only, views apply their own rules
+    file_picker = ignore_patterns(get_config_value('file_picker.ignore_folders', None))
+    drag_and_drop = ignore_patterns(get_config_value('drag_and_drop.ignore_folders', None))
+
+    # The last matching pattern wins, common subset of lists with negations can't be used
+    if any(p.startswith('!') for p in file_picker + drag_and_drop):
+        return []
+
+    return [p for p in file_picker if p in drag_and_drop]
+
+
+def _walk_gitignore():
+    from blackmamba.config import get_config_value
+
+    return bool(get_config_value('file_picker.gitignore', False) and get_config_value('drag_and_drop.gitignore', False))
+
+
+_workspace = None
+
+
+def get_workspace():
+    """Return shared workspace instance."""
+    global _workspace
+
+    if _workspace is None:
+        from blackmamba.util.path import get_cache_folder
+        _workspace = Workspace(_walk_ignore_folders(), get_cache_folder(), _walk_gitignore())
+
+    return _workspace
@@ -1,9 +1,7 @@
 #!python3
 
 import os
-from ui import TableViewCell
 from blackmamba.uikit.picker import PickerView, PickerItem, PickerDataSource
-from blackmamba.uikit.table import UITableViewCellStyle
 from blackmamba.ide.action import ActionInfo, get_actions
 
 
@@ -30,15 +28,6 @@ class ActionPickerDataSource(PickerDataSource):
         super().__init__()
         self.items = sorted([ActionPickerItem(ai) for ai in get_actions()])
 
-    def tableview_cell_for_row(self, tv, section, row):
-        item = self.filtered_items[row]
-        cell = TableViewCell(UITableViewCellStyle.subtitle.value)
-        cell.text_label.number_of_lines = 1
-        cell.text_label.text = item.title
-        cell.detail_text_label.text = item.subtitle
-        cell.detail_text_label.text_color = (0, 0, 0, 0.5)
-        return cell
-
 
 def main():
     def run_wrench_item(item, shift_enter):
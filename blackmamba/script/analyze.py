@@ -1,16 +1,18 @@
 #!python3
 
-import io
 import re
 from enum import Enum
 import editor
 import console
-from blackmamba.ide.annotation import Annotation, Style
+from blackmamba.ide.annotation import Annotation, AnnotationBatch, Style
+from blackmamba.ide.edits import apply_text
 from itertools import groupby
 from blackmamba.config import get_config_value
 import blackmamba.ide.tab as tab
 import os
+from objc_util import on_main_thread
 import blackmamba.log as log
+from blackmamba.util.worker import Cancelled
 
 
 def _hud_alert_delay():
@@ -29,6 +31,10 @@ def _remove_whitespaces():
     return get_config_value('analyzer.remove_whitespaces', True)
 
 
+def _continuous_delay():
+    return get_config_value('analyzer.continuous_delay', 1.0)
+
+
 _REMOVE_TRAILING_WHITESPACES_REGEX = re.compile(r'[ \t]+$', re.MULTILINE)
 _REMOVE_TRAILING_LINES_REGEX = re.compile(r'\s+\Z', re.MULTILINE)
 
@@ -61,195 +67,159 @@ class _AnalyzerAnnotation(Annotation):
         return False
 
 
-#
-# pep8
-#
-
-def _pep8_annotations(text, ignore=None, max_line_length=None):
-    import pep8
+_continuous_cache = None
 
-    class _Pep8AnnotationReport(pep8.BaseReport):
-        def __init__(self, options):
-            super().__init__(options)
-            self.annotations = []
 
-        def error(self, line_number, offset, text, check):
-            # If super doesn't return code, this one is ignored
-            if not super().error(line_number, offset, text, check):
-                return
+def _continuous_result_cache():
+    # Small in-memory cache of throwaway snapshots analyzed in the background,
+    # they must not evict results of saved files from the shared cache
+    global _continuous_cache
 
-            annotation = _AnalyzerAnnotation(self.line_offset + line_number, text, _Source.pep8, Style.warning)
-            self.annotations.append(annotation)
+    if _continuous_cache is None:
+        from blackmamba.ide.result_cache import ResultCache
+        _continuous_cache = ResultCache(capacity=16)
 
-    # pep8 requires you to include \n at the end of lines
-    lines = text.splitlines(True)
+    return _continuous_cache
 
-    style_guide = pep8.StyleGuide(reporter=_Pep8AnnotationReport, )
-    options = style_guide.options
 
-    if ignore:
-        options.ignore = tuple(ignore)
-    else:
-        options.ignore = tuple()
+def _cached_annotations(text, config, analyze, persist=True):
+    # Annotations are replayed if the same text was analyzed with the same config,
+    # continuous analysis (persist=False) reads the shared cache, but doesn't modify it
+    from blackmamba.ide.result_cache import get_result_cache, result_key
 
-    if max_line_length:
-        options.max_line_length = max_line_length
+    caches = [get_result_cache()]
+    if not persist:
+        caches.append(_continuous_result_cache())
 
-    checker = pep8.Checker(None, lines, options, None)
-    checker.check_all()
+    key = result_key(text, config)
 
-    return checker.report.annotations
+    for cache in caches:
+        cached = cache.get(key)
+        if cached is not None:
+            return [
+                _AnalyzerAnnotation(line, message, _Source(source), Style(style))
+                for line, message, source, style in cached
+            ]
 
+    annotations = analyze()
+    caches[-1].set(key, [[a.line, a.text, a.source.value, a.style.value] for a in annotations])
+    if persist:
+        caches[-1].save()
+    return annotations
 
 #
-# pyflakes
+# pep8 & pyflakes
 #
 
-_LINE_COL_MESSAGE_REGEX = re.compile(r'^(\d+):(\d+): (.*)$')
-_LINE_MESSAGE_REGEX = re.compile(r'^(\d+): (.*)$')
 
+def _pep8_pyflakes_annotations(path, text, ignore=None, max_line_length=None, check=None, persist=True):
+    from blackmamba.ide.analyzer import pep8_pyflakes_config
 
-def _get_annotations(path, stream, style):
-    path_len = len(path)
+    config = pep8_pyflakes_config(ignore, max_line_length)
+    return _cached_annotations(
+        text, config,
+        lambda: _analyze_pep8_pyflakes(path, text, ignore, max_line_length, check),
+        persist
+    )
 
-    annotations = []
-    for line in stream.getvalue().splitlines():
-        if not line.startswith(path):
-            continue
 
-        line = line[(path_len + 1):]  # Strip 'filename:'
-        match = _LINE_COL_MESSAGE_REGEX.fullmatch(line)
+def _analyze_pep8_pyflakes(path, text, ignore, max_line_length, check):
+    from blackmamba.ide.analyzer import get_analyzer
 
-        if not match:
-            match = _LINE_MESSAGE_REGEX.fullmatch(line)
+    pep8_violations, pyflakes_violations = get_analyzer().pep8_pyflakes(
+        text, path, ignore=ignore, max_line_length=max_line_length, check=check
+    )
 
-        if not match:
-            continue
+    annotations = [
+        _AnalyzerAnnotation(v.line, '{} {}'.format(v.code, v.text), _Source.pep8, Style.warning)
+        for v in pep8_violations
+    ]
 
-        line = int(match.group(1))
-
-        if match.lastindex == 3:
-            annotation = _AnalyzerAnnotation(
-                line, 'Col {}: {}'.format(match.group(2), match.group(3)),
-                _Source.pyflakes, style
-            )
+    for v in pyflakes_violations:
+        if v.code == 'E999':
+            text = 'Col {}: {}'.format(v.column, v.text) if v.column else v.text
+            annotations.append(_AnalyzerAnnotation(v.line, text, _Source.pyflakes, Style.error))
         else:
-            annotation = _AnalyzerAnnotation(
-                line, match.group(2),
-                _Source.pyflakes, style
-            )
-
-        annotations.append(annotation)
+            annotations.append(_AnalyzerAnnotation(v.line, v.text, _Source.pyflakes, Style.warning))
 
     return annotations
 
-
-def _pyflakes_annotations(path, text):
-    import pyflakes.api as pyflakes
-
-    warning_stream = io.StringIO()
-    error_stream = io.StringIO()
-    reporter = pyflakes.modReporter.Reporter(warning_stream, error_stream)
-
-    pyflakes.check(text, path, reporter)
-
-    warnings = _get_annotations(path, warning_stream, Style.warning)
-    errors = _get_annotations(path, error_stream, Style.error)
-
-    return warnings + errors
-
 #
 # flake8
 #
 
 
-def _parse_flake8_output(path, output_path):
-    path_len = len(path)
-
-    annotations = []
-
-    with open(output_path, 'r') as output:
-        report = output.read()
-        for line in report.splitlines():
-            if not line.startswith(path):
-                continue
+def _flake8_annotations(path, text, options, check=None, persist=True):
+    from blackmamba.ide.analyzer import flake8_config
 
-            line = line[(path_len + 1):]  # Strip 'filename:'
-            match = _LINE_COL_MESSAGE_REGEX.fullmatch(line)
+    try:
+        config = flake8_config(path, options)
+        return _cached_annotations(text, config, lambda: _analyze_flake8(path, text, options, check), persist)
+    except Cancelled:
+        raise
+    except Exception as e:
+        log.error('flake8 failed: {}'.format(str(e)))
+        return []
 
-            if not match:
-                match = _LINE_MESSAGE_REGEX.fullmatch(line)
 
-            if not match:
-                continue
+def _analyze_flake8(path, text, options, check):
+    from blackmamba.ide.analyzer import get_analyzer
 
-            line = int(match.group(1))
+    def get_style(code):
+        return Style.warning if code.startswith('W') else Style.error
 
-            def get_style(message):
-                return Style.warning if message.startswith('W') else Style.error
+    # All passes share tokens & AST
+    violations = get_analyzer().flake8(text, path, options, check)
 
-            if match.lastindex == 3:
-                annotation = _AnalyzerAnnotation(
-                    line, 'Col {}: {}'.format(match.group(2), match.group(3)),
-                    _Source.flake8, get_style(match.group(3))
-                )
-            else:
-                annotation = _AnalyzerAnnotation(
-                    line, match.group(2),
-                    _Source.flake8, get_style(match.group(2))
-                )
-
-            annotations.append(annotation)
-
-    return annotations
-
-
-def _flake8_annotations(path, options):
-    import os
-
-    _tmp = os.environ.get('TMPDIR', os.environ.get('TMP'))
-    _output_file = os.path.join(_tmp, 'blackmamba.flake8.txt')
+    return [
+        _AnalyzerAnnotation(
+            v.line, 'Col {}: {} {}'.format(v.column, v.code, v.text),
+            _Source.flake8, get_style(v.code)
+        )
+        for v in violations
+    ]
 
-    annotations = []
+#
+# main
+#
 
-    for o in options:
-        try:
-            from flake8.main import application
 
-            if os.path.exists(_output_file):
-                os.remove(_output_file)
+_batch = AnnotationBatch()
 
-            o = list(o)
-            o.insert(0, path)
-            o.extend([
-                '-j', '0',  # Disable subprocess
-                '--output-file={}'.format(_output_file)
-            ])
-            app = application.Application()
-            app.run(o)
-            del app
 
-            annotations.extend(_parse_flake8_output(path, _output_file))
-        except Exception as e:
-            log.error('flake8 failed: {}'.format(str(e)))
+def _cursor_line():
+    from blackmamba.ide.line_index import get_line_index
 
-    if os.path.exists(_output_file):
-        os.remove(_output_file)
+    text = editor.get_text()
+    selection = editor.get_selection()
+    if not text or not selection:
+        return None
+    return get_line_index(text).line_number(selection[0])
 
-    return annotations
 
-#
-# main
-#
+def _annotate_lines(annotations, scroll=True):
+    # Messages of the same line are ordered by priority, annotations nearest
+    # to the cursor are rendered first
+    by_line = sorted(annotations, key=lambda x: x.line)
+    for _, line_annotations in groupby(by_line, lambda x: x.line):
+        _batch.extend(sorted(line_annotations, reverse=True))
+    _batch.flush(editor, _cursor_line(), scroll)
 
 
-def _annotate(line, annotations, scroll):
-    by_priority = sorted(annotations, reverse=True)
+def _annotations(path, text, check=None, persist=True):
+    flake8_options = get_config_value('analyzer.flake8', None)
 
-    style = by_priority[0].style.value
-    text = ',\n'.join([a.text for a in by_priority])
+    if flake8_options:
+        return _flake8_annotations(os.path.abspath(path), text, flake8_options, check, persist)
 
-    editor.annotate_line(line, text, style, True, scroll=scroll)
+    return _pep8_pyflakes_annotations(
+        path,
+        text,
+        ignore=_ignore_codes(),
+        max_line_length=_max_line_length(),
+        check=check,
+        persist=persist
+    )
 
 
 def _remove_trailing_whitespaces(text):
@@ -263,12 +233,10 @@ def _remove_trailing_lines(text):
 def _editor_text():
     text = editor.get_text()
 
-    range_end = len(text)
-
     if _remove_whitespaces():
         text = _remove_trailing_whitespaces(text)
         text = _remove_trailing_lines(text)
-        editor.replace_text(0, range_end, text)
+        apply_text(editor, text)
         tab.save()
         # Pythonista is adding '\n' automatically, so, if we removed them
         # all we have to simulate Pythonista behavior by adding '\n'
@@ -289,25 +257,12 @@ def main():
         return
 
     editor.clear_annotations()
-
-    flake8_options = get_config_value('analyzer.flake8', None)
+    _batch.cancel()
 
     selection = editor.get_selection()
     text = _editor_text()
 
-    if flake8_options:
-        annotations = _flake8_annotations(
-            os.path.abspath(path),
-            flake8_options
-        )
-    else:
-        annotations = _pep8_annotations(
-            text,
-            ignore=_ignore_codes(),
-            max_line_length=_max_line_length()
-        )
-
-        annotations += _pyflakes_annotations(path, text)
+    annotations = _annotations(path, text)
 
     if not annotations:
         if selection:
@@ -315,11 +270,54 @@ def main():
         console.hud_alert('No Issues Found', 'iob:checkmark_32', _hud_alert_delay())
         return None
 
-    scroll = True
-    by_line = sorted(annotations, key=lambda x: x.line)
-    for l, a in groupby(by_line, lambda x: x.line):
-        _annotate(l, a, scroll)
-        scroll = False
+    _annotate_lines(annotations)
+
+#
+# Continuous analysis
+#
+
+
+@on_main_thread
+def _publish_annotations(path, annotations):
+    if editor.get_path() != path:
+        return
+
+    editor.clear_annotations()
+    _batch.cancel()
+    _annotate_lines(annotations, scroll=False)
+
+
+def _analyze_in_background(path, text, token):
+    # Editor text is analyzed as it is, trailing whitespaces are not removed
+    # and the file is not saved
+    return _annotations(path, text, token.check, persist=False)
+
+
+_continuous_analysis = None
+
+
+def start_continuous_analysis():
+    """Start continuous analysis of the current file.
+
+    Current file is analyzed and annotated in the background whenever it's
+    changed or saved. Started on Black Mamba initialization if the
+    ``analyzer.continuous`` option is enabled.
+    """
+    from blackmamba.ide.continuous_analysis import ContinuousAnalysis
+    global _continuous_analysis
+
+    if _continuous_analysis is None:
+        _continuous_analysis = ContinuousAnalysis(
+            editor, _analyze_in_background, _publish_annotations, delay=_continuous_delay()
+        )
+
+    _continuous_analysis.start()
+
+
+def stop_continuous_analysis():
+    """Stop continuous analysis."""
+    if _continuous_analysis:
+        _continuous_analysis.stop()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,134 @@
+#!python3
+
+import os
+import editor
+import console
+from blackmamba.uikit.picker import PickerView, PickerItem, PickerDataSource
+from blackmamba.config import get_config_value
+from blackmamba.ide.workspace import get_workspace
+from blackmamba.ide.project_analysis import analyze_files, get_project_result_cache
+import blackmamba.ide.tab as tab
+import blackmamba.util.path as path_util
+
+
+class ViolationPickerItem(PickerItem):
+    __slots__ = ('path', 'line', '_column')
+
+    def __init__(self, path, violation, display_folder):
+        super().__init__(
+            '{} {}'.format(violation.code, violation.text),
+            '{}, line {}'.format(display_folder, violation.line)
+        )
+        self.path = path
+        self.line = violation.line
+        self._column = violation.column
+
+    @property
+    def sort_value(self):
+        # Grouped by file
+        return self.path, self.line, self._column
+
+    @property
+    def match_value(self):
+        return '{} {}'.format(self.subtitle, self.title).lower()
+
+
+def _flake8_analysis(passes):
+    from blackmamba.ide.analyzer import flake8_config, flake8_violations
+
+    def config(path):
+        return flake8_config(path, passes)
+
+    def analyze(text, path):
+        return flake8_violations(text, path, passes)
+
+    return analyze, config
+
+
+def _pep8_pyflakes_analysis(ignore, max_line_length):
+    from blackmamba.ide.analyzer import pep8_pyflakes_config, pep8_pyflakes_violations
+
+    def config(path):
+        return pep8_pyflakes_config(ignore, max_line_length)
+
+    def analyze(text, path):
+        pep8, pyflakes = pep8_pyflakes_violations(text, path, ignore, max_line_length)
+        return pep8 + pyflakes
+
+    return analyze, config
+
+
+class AnalyzeProjectDataSource(PickerDataSource):
+    def __init__(self, root, ignore_folders=None, gitignore=False):
+        super().__init__()
+
+        def allow_file(folder, name):
+            return path_util.is_python_file(name) and not name.startswith('.')
+
+        self._root = root
+        self._view = get_workspace().view(root, allow_file, ignore_folders, gitignore=gitignore)
+        self.items = self._analyze()
+
+    def _analyze(self):
+        flake8_options = get_config_value('analyzer.flake8', None)
+        if flake8_options:
+            analyze, config = _flake8_analysis(flake8_options)
+        else:
+            analyze, config = _pep8_pyflakes_analysis(
+                get_config_value('analyzer.ignore_codes', ['W391', 'W293']),
+                get_config_value('analyzer.max_line_length', 79)
+            )
+
+        paths = (
+            os.path.join(folder, name)
+            for folder, names in self._view.walk()
+            for name in names
+        )
+        home_folder = os.path.dirname(self._root)
+        cache = get_project_result_cache()
+
+        try:
+            for file_path, violations in analyze_files(paths, analyze, config, cache, check=self.check_loading):
+                display_folder = ' • '.join(os.path.relpath(file_path, home_folder).split(os.sep))
+                for violation in violations:
+                    yield ViolationPickerItem(file_path, violation, display_folder)
+        finally:
+            cache.save()
+
+
+def main():
+    path = editor.get_path()
+
+    if not path:
+        console.hud_alert('No file opened', 'error')
+        return
+
+    tab.save()
+    root = path_util.find_project_root(path)
+
+    def open_location(item, shift_enter):
+        tab.open_file(item.path, new_tab=not shift_enter, line=item.line)
+
+    v = PickerView()
+    v.name = 'Analyze Project: {}'.format(os.path.basename(root))
+    v.datasource = AnalyzeProjectDataSource(
+        root,
+        ignore_folders=get_config_value('file_picker.ignore_folders', None),
+        gitignore=get_config_value('file_picker.gitignore', False)
+    )
+    v.shift_enter_enabled = True
+    v.help_label.text = (
+        '⇅ - select • Enter - open file in new tab and scroll to line • Shift + Enter - open in current tab'
+        '\n'
+        'Esc - close • Cmd . - close with Apple smart keyboard'
+    )
+    v.textfield.placeholder = 'Start typing to filter issues...'
+    v.did_select_item_action = open_location
+    v.present('sheet')
+    v.wait_modal()
+
+
+if __name__ == '__main__':
+    from blackmamba.bundle import bundle
+    with bundle('analyze'):
+        main()
@@ -17,6 +17,7 @@ import console
 import io
 import shutil
 from blackmamba.config import get_config_value
+from blackmamba.ide.workspace import get_workspace, DOCUMENTS
 
 _TMP_DIR = os.environ.get('TMPDIR', os.environ.get('TMP'))
 
@@ -295,46 +296,34 @@ def tableView_performDropWithCoordinator_(_self, _cmd, tv_ptr, coordinator_ptr):
 
 
 class FileNode:
-    def __init__(self, path, parent=None, ignore=None):
+    def __init__(self, path, view, parent=None):
         assert(parent is None or isinstance(parent, FileNode))
 
         self.path = os.path.normpath(path)
         self.parent = parent
         self.level = parent.level + 1 if parent else 0
         self.name = os.path.basename(path)
-        self._ignore = ignore
+        self._view = view
         self._children = None
 
-    def _include_file(self, file):
-        if not os.path.isdir(os.path.join(self.path, file)):
-            return False
-
-        if self._ignore and self._ignore(self.path, file):
-            return False
-
-        return True
-
     @property
     def children_exists(self):
-        for file in os.listdir(self.path):
-            if not self._include_file(file):
-                continue
-            return True
-
-        return False
+        if self._children is not None:
+            return len(self._children) > 0
+        return len(self._view.subfolders(self.path)) > 0
 
     def invalidate_children(self):
+        self._view.refresh(self.path)
+        self.reset_children()
+
+    def reset_children(self):
         self._children = None
 
     def _load_children(self):
-        children = []
-
-        for file in os.listdir(self.path):
-            if not self._include_file(file):
-                continue
-            children.append(FileNode(os.path.join(self.path, file), self, self._ignore))
-
-        return children
+        return [
+            FileNode(path, self._view, self)
+            for path in self._view.subfolders(self.path)
+        ]
 
     @property
     def children(self):
@@ -355,25 +344,8 @@ class FileNode:
             child.dump(autoload)
 
 
-def ignore(folder, file):
-    if file.startswith('.'):
-        return True
-
-    ignore_folders = get_config_value('drag_and_drop.ignore_folders', None)
-    if not ignore_folders:
-        return False
-
-    for parent, folders in ignore_folders.items():
-        if not parent and file in folders:
-            return True
-
-        if parent == '.' and folder == os.path.expanduser('~/Documents') and file in folders:
-            return True
-
-        if parent == os.path.basename(folder) and file in folders:
-            return True
-
-    return False
+def _ignore_folders():
+    return get_config_value('drag_and_drop.ignore_folders', None)
 
 
 class FolderPickerDataSource:
@@ -480,6 +452,16 @@ class FolderPickerDataSource:
             index_paths.append(NSIndexPath.indexPathForRow_inSection_(index, self._folder_section))
             tv_objc.reloadRowsAtIndexPaths_withRowAnimation_(ns(index_paths), 0)
 
+    @on_main_thread
+    def reload(self):
+        # Index was revalidated, children of all nodes are loaded again
+        self._root_node.reset_children()
+        self._items = None
+        self._update_path_items()
+
+        if self.tableview:
+            self.tableview.reload_data()
+
     @property
     def items(self):
         if self._items is not None:
@@ -627,8 +609,13 @@ class DragAndDropView(ui.View):
             expanded_folder = None
             files = None
 
-        root_node = FileNode(os.path.expanduser('~/Documents'), ignore=ignore)
+        ws = get_workspace()
+        view = ws.view(DOCUMENTS, ignore_folders=_ignore_folders(), ignore_hidden=True,
+                       gitignore=get_config_value('drag_and_drop.gitignore', False))
+        root_node = FileNode(DOCUMENTS, view)
         _datasource = FolderPickerDataSource(root_node, expanded_folder, files)
+        # Cached tree is displayed immediately and reloaded if the index was changed
+        ws.update_in_background([DOCUMENTS], did_change=_datasource.reload)
 
         tv = ui.TableView(frame=self.bounds, flex='WH')
         tv.delegate = _datasource
@@ -0,0 +1,154 @@
+#!python3
+
+import os
+import re
+import sys
+import console
+import editor
+from blackmamba.uikit.picker import PickerView, PickerItem, PickerDataSource
+from blackmamba.config import get_config_value
+from blackmamba.ide.trigram import Query, get_trigram_index
+from blackmamba.ide.workspace import get_workspace, DOCUMENTS
+import blackmamba.ide.tab as tab
+
+_MAX_TITLE_LENGTH = 200
+# Number of files indexed before they're searched
+_CHUNK_SIZE = 256
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class FindPickerItem(PickerItem):
+    __slots__ = ('path', 'line')
+
+    def __init__(self, path, line, text, display_folder):
+        super().__init__(text.strip()[:_MAX_TITLE_LENGTH], '{}, line {}'.format(display_folder, line))
+        self.path = path
+        self.line = line
+
+    @property
+    def sort_value(self):
+        return self.path, self.line
+
+    @property
+    def match_value(self):
+        # Title is the suffix, matched characters are highlighted
+        return '{} {}'.format(self.subtitle, self.title).lower()
+
+
+class FindDataSource(PickerDataSource):
+    def __init__(self, query, ignore_folders=None, gitignore=False):
+        super().__init__()
+
+        def allow_file(folder, name):
+            return not name.startswith('.')
+
+        self._view = get_workspace().view(DOCUMENTS, allow_file, ignore_folders, gitignore=gitignore)
+        self.items = self._find(query)
+
+    def _find(self, query):
+        index = get_trigram_index()
+        searched = {}
+
+        # Persisted index is searched first, results are displayed immediately. Only
+        # files of the cached view, index can contain files ignored by current rules.
+        cached = {os.path.join(folder, name) for folder, name in self._view.files()}
+        yield from self._items(index.search(query, self.check_loading, cached, searched))
+
+        # Then the index is updated & searched in chunks, results of new & modified
+        # files (and files missing in the cached view) are displayed as they're indexed
+        paths = (
+            os.path.join(folder, name)
+            for folder, names in self._view.walk()
+            for name in names
+        )
+        indexed = set()
+        changed = False
+
+        for chunk in _chunks(paths, _CHUNK_SIZE):
+            indexed.update(chunk)
+            if index.update(chunk, self.check_loading, remove=False):
+                changed = True
+            elif all(path in cached for path in chunk):
+                continue
+
+            yield from self._items(index.search(query, self.check_loading, set(chunk), searched))
+
+        if index.retain(indexed) or changed:
+            index.save()
+
+    def _items(self, results):
+        for path, line, text in results:
+            display_folder = ' • '.join(os.path.relpath(path, os.path.dirname(DOCUMENTS)).split(os.sep))
+            yield FindPickerItem(sys.intern(path), line, text, display_folder)
+
+
+def _default_query():
+    text = editor.get_text()
+    selection = editor.get_selection()
+
+    if not text or not selection or selection[0] == selection[1]:
+        return ''
+
+    selected = text[selection[0]:selection[1]]
+    return selected if '\n' not in selected else ''
+
+
+def _parse_query(text):
+    # /pattern/ is a regular expression
+    if len(text) > 2 and text.startswith('/') and text.endswith('/'):
+        return Query(text[1:-1], regex=True)
+    return Query(text)
+
+
+def main():
+    try:
+        text = console.input_alert('Find in Files', 'Text or /regular expression/', _default_query(), 'Find')
+    except KeyboardInterrupt:
+        return
+
+    if not text:
+        return
+
+    try:
+        query = _parse_query(text)
+    except re.error as e:
+        console.hud_alert('Invalid regular expression: {}'.format(e), 'error')
+        return
+    except ValueError as e:
+        console.hud_alert(str(e), 'error')
+        return
+
+    def open_location(item, shift_enter):
+        tab.open_file(item.path, new_tab=not shift_enter, line=item.line)
+
+    v = PickerView()
+    v.name = 'Find in Files: {}'.format(text)
+    v.datasource = FindDataSource(
+        query,
+        ignore_folders=get_config_value('file_picker.ignore_folders', None),
+        gitignore=get_config_value('file_picker.gitignore', False)
+    )
+    v.shift_enter_enabled = True
+    v.help_label.text = (
+        '⇅ - select • Enter - open file in new tab and scroll to line • Shift + Enter - open in current tab'
+        '\n'
+        'Esc - close • Cmd . - close with Apple smart keyboard'
+    )
+    v.textfield.placeholder = 'Start typing to filter results...'
+    v.did_select_item_action = open_location
+    v.present('sheet')
+    v.wait_modal()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,12 @@
 #!python3
 
 import os
+import sys
 from blackmamba.uikit.picker import PickerView, PickerItem, PickerDataSource
 from blackmamba.config import get_config_value
 import blackmamba.ide.tab as tab
 import blackmamba.ide.bookmark as bookmark
+from blackmamba.ide.workspace import get_workspace, DOCUMENTS
 
 
 _IGNORE_FOLDERS = {
@@ -19,77 +21,71 @@ def _ignore_folders():
 
 
 class FilePickerItem(PickerItem):
+    __slots__ = ('_folder', '_root_folder')
+
     def __init__(self, folder, name, display_folder, root_folder=None):
-        super().__init__(name, display_folder)
-        self._folder = folder
-        self._root_folder = root_folder
-        self._match_value = None
-        self._file_path = None
+        super().__init__(name, sys.intern(display_folder))
+        self._folder = sys.intern(folder)
+        self._root_folder = sys.intern(root_folder) if root_folder else None
 
     @property
     def file_path(self):
-        if not self._file_path:
-            self._file_path = os.path.join(self._folder, self.title)
-        return self._file_path
+        return os.path.join(self._folder, self.title)
 
     @property
     def match_value(self):
-        if not self._match_value:
-            path = self.file_path
-            if self._root_folder:
-                path = path[len(self._root_folder)+1:]
-            self._match_value = path.lower()
-
-        return self._match_value
+        # Not cached, read once by the picker items store
+        path = self.file_path
+        if self._root_folder:
+            path = path[len(self._root_folder)+1:]
+        return path.lower()
 
 
 class FilePickerDataSource(PickerDataSource):
-    def __init__(self, allow_file=None, ignore_folders=None):
+    def __init__(self, allow_file=None, ignore_folders=None, gitignore=False):
         super().__init__()
-
-        items = self._load_items('Documents', os.path.expanduser('~/Documents'), allow_file, ignore_folders)
+        self._roots = [('Documents', DOCUMENTS, False)]
 
         bookmarks = bookmark.get_bookmark_paths()
         if bookmarks:
-            for path in bookmarks:
-                items.extend(self._load_items('Bookmark', path, allow_file, ignore_folders, True))
+            self._roots.extend(('Bookmark', path, True) for path in bookmarks)
+
+        ws = get_workspace()
+        self._views = {
+            path: ws.view(path, allow_file, ignore_folders, gitignore=gitignore)
+            for _, path, _ in self._roots
+            if os.path.isdir(path)
+        }
+        self._allow_file = allow_file
+
+        # Items are streamed while the workspace index is revalidated
+        self.items = self._load_all_items()
 
-        self.items = sorted(items)
+    def _load_all_items(self):
+        for title, path, is_bookmark in self._roots:
+            yield from self._load_items(title, path, is_bookmark)
 
-    def _load_items(self, title, path, allow_file=None, ignore_folders=None, bookmark=False):
+    def _load_items(self, title, path, bookmark=False):
         dirname = os.path.dirname(path)
         basename = os.path.basename(path)
 
         if os.path.isfile(path):
-            if allow_file and allow_file(dirname, basename):
-                return [FilePickerItem(dirname, basename, '{} • {}'.format(title, basename), dirname)]
+            if self._allow_file and self._allow_file(dirname, basename):
+                yield FilePickerItem(dirname, basename, '{} • {}'.format(title, basename), dirname)
+            return
 
-        if not os.path.isdir(path):
-            return []
+        view = self._views.get(path)
+        if not view:
+            return
 
-        global_ignore_folders = ignore_folders.get('', [])
-
-        items = []
-        for root, subdirs, files in os.walk(path, topdown=True, followlinks=True):
-            if ignore_folders:
-                ignore_list = global_ignore_folders[:]
-                ignore_list.extend(ignore_folders.get(os.path.basename(root), []))
-                if root == path:
-                    ignore_list.extend(ignore_folders.get('.', []))
-                subdirs[:] = [d for d in subdirs if d not in ignore_list]
-
-            display_folder_items = [x for x in root[len(path) + 1:].split(os.sep) if x]
+        for root, files in view.walk():
+            display_folder_items = [x for x in root[len(view.root) + 1:].split(os.sep) if x]
             display_folder_items.insert(0, title)
             if bookmark:
                 display_folder_items.insert(1, basename)
             display_folder = ' • '.join(display_folder_items)
 
-            if allow_file:
-                files = [f for f in files if allow_file(root, f)]
-
-            items.extend([FilePickerItem(root, f, display_folder, path) for f in files])
-
-        return items
+            yield from (FilePickerItem(root, f, display_folder, view.root) for f in files)
 
 
 def main():
@@ -102,6 +98,7 @@ def main():
 
     kwargs = {
         'ignore_folders': _ignore_folders(),
+        'gitignore': get_config_value('file_picker.gitignore', False),
         'allow_file': allow_file
     }
 
@@ -0,0 +1,117 @@
+#!python3
+
+import os
+from ui import Image
+from blackmamba.uikit.picker import PickerView, PickerItem, PickerDataSource
+from blackmamba.config import get_config_value
+from blackmamba.ide.symbol import SymbolKind, get_symbol_index
+from blackmamba.ide.workspace import get_workspace, DOCUMENTS
+import blackmamba.ide.tab as tab
+import blackmamba.util.path as path
+
+_IMAGE_NAMES = {
+    SymbolKind.cls: 'class',
+    SymbolKind.function: 'function',
+    SymbolKind.method: 'function'
+}
+
+_images = {}
+
+
+def _image(kind):
+    name = _IMAGE_NAMES.get(kind)
+    if not name:
+        return None
+
+    image = _images.get(name)
+    if image is None:
+        image = Image(name)
+        _images[name] = image
+    return image
+
+
+class SymbolPickerItem(PickerItem):
+    __slots__ = ('path', 'line', '_kind', '_qualified_name')
+
+    def __init__(self, file_path, symbol, display_folder):
+        module, _ = os.path.splitext(os.path.basename(file_path))
+        subtitle = '{}, line {}'.format(display_folder, symbol.line)
+        super().__init__(symbol.name, subtitle)
+
+        self.path = file_path
+        self.line = symbol.line
+        self._kind = symbol.kind
+        self._qualified_name = '.'.join(x for x in (module, symbol.container, symbol.name) if x)
+
+    @property
+    def image(self):
+        # Shared by all items of the same kind, created for visible rows only
+        return _image(self._kind)
+
+    @image.setter
+    def image(self, image):
+        # Image is derived from the symbol kind
+        pass
+
+    @property
+    def match_value(self):
+        return self._qualified_name.lower()
+
+
+class SymbolDataSource(PickerDataSource):
+    def __init__(self, ignore_folders=None, gitignore=False):
+        super().__init__()
+
+        def allow_file(folder, name):
+            return path.is_python_file(name) and not name.startswith('.')
+
+        self._view = get_workspace().view(DOCUMENTS, allow_file, ignore_folders, gitignore=gitignore)
+        self.items = self._load_items()
+
+    def _load_items(self):
+        index = get_symbol_index()
+
+        paths = (
+            os.path.join(folder, name)
+            for folder, names in self._view.walk()
+            for name in names
+        )
+        if index.update(paths, self.check_loading):
+            index.save()
+
+        home_folder = os.path.dirname(DOCUMENTS)
+        display_folders = {}
+
+        for file_path, symbol in index.symbols():
+            display_folder = display_folders.get(file_path)
+            if display_folder is None:
+                display_folder = ' • '.join(os.path.relpath(file_path, home_folder).split(os.sep))
+                display_folders[file_path] = display_folder
+
+            yield SymbolPickerItem(file_path, symbol, display_folder)
+
+
+def main():
+    def open_symbol(item, shift_enter):
+        tab.open_file(item.path, new_tab=not shift_enter, line=item.line)
+
+    v = PickerView()
+    v.name = 'Open Symbol Quickly...'
+    v.datasource = SymbolDataSource(
+        ignore_folders=get_config_value('file_picker.ignore_folders', None),
+        gitignore=get_config_value('file_picker.gitignore', False)
+    )
+    v.shift_enter_enabled = True
+    v.help_label.text = (
+        '⇅ - select • Enter - open file in new tab and scroll to symbol • Shift + Enter - open in current tab'
+        '\n'
+        'Esc - close • Cmd . - close with Apple smart keyboard'
+    )
+    v.textfield.placeholder = 'Start typing to filter symbols...'
+    v.did_select_item_action = open_symbol
+    v.present('sheet')
+    v.wait_modal()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,12 @@
 #!python3
 
 import editor
-import ast
 import os
 from enum import Enum
 from blackmamba.uikit.picker import PickerView, PickerItem, PickerDataSource
+from blackmamba.ide.outline import NodeKind, get_outline_cache
 from ui import Image
 import blackmamba.ide.source as source
-import re
-
-
-_TODO_RE = re.compile(r'\A.*#\s*\[?(?i:TODO)\]?[ :]*(?P<text>.*?)\s*\Z')
-_FIXME_RE = re.compile(r'\A.*#\s*\[?(?i:FIXME)\]?[ :]*(?P<text>.*?)\s*\Z')
 
 
 class OutlineNodeItem(PickerItem):
@@ -30,56 +25,40 @@ class OutlineNodeItem(PickerItem):
         self.column = column
         self.level = level
         self.breadcrumb = breadcrumb
-        self.image = Image(style)
+
+    @property
+    def image(self):
+        # Created lazily, for visible rows only
+        if self._image is None:
+            self._image = Image(self.style)
+        return self._image
+
+    @image.setter
+    def image(self, image):
+        self._image = image
 
 
 class OutlineDataSource(PickerDataSource):
+    _STYLES = {
+        NodeKind.cls: OutlineNodeItem.Style.cls,
+        NodeKind.function: OutlineNodeItem.Style.fn,
+        NodeKind.todo: OutlineNodeItem.Style.todo,
+        NodeKind.fixme: OutlineNodeItem.Style.fixme
+    }
+
     def __init__(self, text, filename):
         super().__init__()
 
-        r = ast.parse(text)
-        ast_nodes = OutlineDataSource._generate_nodes(r, breadcrumb=filename)
-
-        comment_nodes = []
-        for i, line in enumerate(text.splitlines()):
-            match = _TODO_RE.fullmatch(line)
-            if match:
-                comment_nodes.append(OutlineNodeItem(
-                    OutlineNodeItem.Style.todo, match.group('text') or 'TODO', i + 1, 0, 0, filename
-                ))
-
-            match = _FIXME_RE.fullmatch(line)
-            if match:
-                comment_nodes.append(OutlineNodeItem(
-                    OutlineNodeItem.Style.fixme, match.group('text') or 'FIXME', i + 1, 0, 0, filename
-                ))
-
-        self.items = sorted(ast_nodes + comment_nodes, key=lambda x: x.line)
-
-    @staticmethod
-    def _generate_nodes(parent, level=0, breadcrumb=''):
-        nodes = []
-
-        for child in parent.body:
-            if isinstance(child, ast.ClassDef):
-                style = OutlineNodeItem.Style.cls
-            elif isinstance(child, ast.FunctionDef) or isinstance(child, ast.AsyncFunctionDef):
-                style = OutlineNodeItem.Style.fn
-            else:
-                style = None
-
-            if style:
-                node = OutlineNodeItem(style, child.name, child.lineno, child.col_offset, level, breadcrumb)
-                nodes.append(node)
-                if breadcrumb:
-                    bc = '{} • {}'.format(breadcrumb, child.name)
-                else:
-                    bc = child.name
-                child_nodes = OutlineDataSource._generate_nodes(child, level + 1, bc)
-                if child_nodes:
-                    nodes.extend(child_nodes)
-
-        return nodes
+        # Cached by the text hash, only changed top level blocks are parsed again
+        nodes = get_outline_cache().outline(text, filename)
+
+        self.items = [
+            OutlineNodeItem(
+                self._STYLES[node.kind], node.name, node.line, node.column, node.level,
+                ' • '.join(x for x in (filename,) + node.parents if x)
+            )
+            for node in nodes
+        ]
 
     def tableview_cell_for_row(self, tv, section, row):
         cell = super().tableview_cell_for_row(tv, section, row)
@@ -1,9 +1,9 @@
 #!python3
 
 import console
-import os
 
 import blackmamba.ide.refactoring as refactoring
+from blackmamba.ide.rope_projects import get_project_registry
 import blackmamba.ide.tab as tab
 import editor
 
@@ -26,7 +26,6 @@ def _ask_for_new_name(old_name):
 
 
 def main():
-    from rope.base.project import Project
     from rope.base import libutils
     from rope.refactor.importutils import ImportOrganizer
     from rope.base.exceptions import RopeError
@@ -40,23 +39,22 @@ def main():
 
     tab.save()
 
-    project = None
     try:
-        project = Project(os.path.dirname(path), ropefolder=None)
-        resource = libutils.path_to_resource(project, path)
-        if not libutils.is_python_file(project, resource):
-            console.hud_alert('Not a Python file', 'error')
-            return
-
-        organizer = ImportOrganizer(project)
-        change_set = organizer.expand_star_imports(resource)
-        if not change_set:
-            console.hud_alert('No changes required')
-            return
-
-        if refactoring.ask_if_apply_change_set(change_set):
-            refactoring.apply_change_set(change_set, path, selection)
-            console.hud_alert('Imports expanded')
+        with get_project_registry().open(path) as project:
+            resource = libutils.path_to_resource(project, path)
+            if not libutils.is_python_file(project, resource):
+                console.hud_alert('Not a Python file', 'error')
+                return
+
+            organizer = ImportOrganizer(project)
+            change_set = organizer.expand_star_imports(resource)
+            if not change_set:
+                console.hud_alert('No changes required')
+                return
+
+            if refactoring.ask_if_apply_change_set(change_set):
+                refactoring.apply_change_set(change_set, path, selection)
+                console.hud_alert('Imports expanded')
 
     except RopeError as e:
         console.hud_alert(str(e), 'error')
@@ -64,10 +62,6 @@ def main():
     except KeyboardInterrupt:
         pass
 
-    finally:
-        if project:
-            project.close()
-
 
 if __name__ == '__main__':
     from blackmamba.bundle import bundle
@@ -6,6 +6,7 @@ import unittest.mock as mock
 
 import blackmamba.ide.source as source
 import blackmamba.ide.tab as tab
+from blackmamba.ide.edits import apply_text
 import editor
 
 
@@ -28,7 +29,7 @@ def _replace_file_content(path):
         return False
 
     new_content = open(futurized_path, 'r').read()
-    editor.replace_text(0, len(content) - 1, new_content)
+    apply_text(editor, new_content, 0, len(content) - 1)
     source.scroll_to_line(line_number)
     os.remove(futurized_path)
     return True
@@ -4,7 +4,12 @@ import console
 import os
 
 import blackmamba.ide.refactoring as refactoring
+from blackmamba.ide.rope_projects import get_project_registry
+from blackmamba.ide.identifier_index import get_identifier_index
+from blackmamba.ide.workspace import get_workspace
+from blackmamba.config import get_config_value
 import blackmamba.ide.tab as tab
+import blackmamba.util.path as path_util
 import editor
 
 
@@ -26,8 +31,65 @@ def _ask_for_new_name(old_name):
     return new_name
 
 
-def main():
-    from rope.base.project import Project
+def _candidate_resources(project, resource, name):
+    # Project files, which contain the identifier at all, and the current file
+    from rope.base import libutils
+
+    def allow_file(folder, file_name):
+        return path_util.is_python_file(file_name) and not file_name.startswith('.')
+
+    view = get_workspace().view(
+        project.address, allow_file,
+        get_config_value('file_picker.ignore_folders', None),
+        gitignore=get_config_value('file_picker.gitignore', False)
+    )
+    paths = [
+        os.path.join(folder, file_name)
+        for folder, file_names in view.walk()
+        for file_name in file_names
+    ]
+
+    index = get_identifier_index(project.address)
+    index.update(paths)
+
+    resources = [libutils.path_to_resource(project, path) for path in index.files(name)]
+    if resource not in resources:
+        resources.append(resource)
+    return resources
+
+
+def _close_other_tabs(paths):
+    # Files opened in other tabs can't be written, Pythonista would overwrite them
+    console.alert(
+        'Rename identifier',
+        'Files opened in other tabs must be closed:\n\n{}'.format('\n'.join(os.path.basename(p) for p in paths)),
+        'Close Other Tabs'
+    )
+    tab.close_tabs_except_current()
+
+
+def _apply_change_set(change_set, path, selection, project_wide):
+    if project_wide:
+        opened = refactoring.get_paths_opened_in_other_tabs(change_set, path)
+        if opened:
+            _close_other_tabs(opened)
+
+    if not refactoring.ask_if_apply_change_set(change_set):
+        return
+
+    skipped = refactoring.apply_change_set(change_set, path, selection, write_other_files=project_wide)
+    if skipped:
+        console.hud_alert('Not renamed in {} file(s) opened in other tabs'.format(len(skipped)), 'error')
+    else:
+        console.hud_alert('Identifier renamed')
+
+
+def main(project_wide=False):
+    """Rename identifier at the cursor.
+
+    Args:
+        project_wide: Rename identifier in all project files, current file only otherwise.
+    """
     from rope.base import libutils
     from rope.refactor.rename import Rename
     from rope.base.exceptions import RopeError
@@ -39,33 +101,31 @@ def main():
         console.hud_alert('Not a Python file', 'error')
         return
 
-    tab.save()
+    tab.save(all=project_wide)
 
-    project = None
     try:
-        project = Project(os.path.dirname(path), ropefolder=None)
-        resource = libutils.path_to_resource(project, path)
-        if not libutils.is_python_file(project, resource):
-            console.hud_alert('Not a Python file', 'error')
-            return
+        with get_project_registry().open(path) as project:
+            resource = libutils.path_to_resource(project, path)
+            if not libutils.is_python_file(project, resource):
+                console.hud_alert('Not a Python file', 'error')
+                return
 
-        renamer = Rename(project, resource, selection[0])
-        old_name = renamer.get_old_name()
+            renamer = Rename(project, resource, selection[0])
+            old_name = renamer.get_old_name()
 
-        if not old_name:
-            console.hud_alert('Unable to get identifier name', 'error')
-            return
+            if not old_name:
+                console.hud_alert('Unable to get identifier name', 'error')
+                return
 
-        new_name = _ask_for_new_name(old_name)
+            new_name = _ask_for_new_name(old_name)
 
-        change_set = renamer.get_changes(new_name, docs=True, resources=[resource])
-        if not change_set:
-            console.hud_alert('No changes required')
-            return
+            resources = _candidate_resources(project, resource, old_name) if project_wide else [resource]
+            change_set = renamer.get_changes(new_name, docs=True, resources=resources)
+            if not change_set:
+                console.hud_alert('No changes required')
+                return
 
-        if refactoring.ask_if_apply_change_set(change_set):
-            refactoring.apply_change_set(change_set, path, selection)
-            console.hud_alert('Identifier renamed')
+            _apply_change_set(change_set, path, selection, project_wide)
 
     except RopeError as e:
         console.hud_alert(str(e), 'error')
@@ -73,10 +133,6 @@ def main():
     except KeyboardInterrupt:
         pass
 
-    finally:
-        if project:
-            project.close()
-
 
 if __name__ == '__main__':
     from blackmamba.bundle import bundle
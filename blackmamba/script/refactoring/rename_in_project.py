@@ -0,0 +1,9 @@
+#!python3
+
+from blackmamba.script.refactoring.rename import main
+
+
+if __name__ == '__main__':
+    from blackmamba.bundle import bundle
+    with bundle('refactoring'):
+        main(project_wide=True)
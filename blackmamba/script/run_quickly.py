@@ -1,10 +1,12 @@
 #!python3
 
 import os
+import sys
 from blackmamba.uikit.picker import PickerView, PickerItem, PickerDataSource
 import blackmamba.ide.script as script
 from blackmamba.config import get_config_value
 import blackmamba.util.path as path
+from blackmamba.ide.workspace import get_workspace, DOCUMENTS
 
 
 _IGNORE_FOLDERS = {
@@ -19,9 +21,11 @@ def _ignore_folders():
 
 
 class FilePickerItem(PickerItem):
+    __slots__ = ('_folder',)
+
     def __init__(self, folder, name, display_folder):
-        super().__init__(name, display_folder)
-        self._folder = folder
+        super().__init__(name, sys.intern(display_folder))
+        self._folder = sys.intern(folder)
 
     @property
     def file_path(self):
@@ -33,32 +37,20 @@ class FilePickerItem(PickerItem):
 
 
 class FilePickerDataSource(PickerDataSource):
-    def __init__(self, allow_file=None, ignore_folders=None):
+    def __init__(self, allow_file=None, ignore_folders=None, gitignore=False):
         super().__init__()
-        self._root_folder = os.path.expanduser('~/Documents')
-
-        def expand_folder(f):
-            if not f:
-                return f
 
-            return os.path.normpath(os.path.join(self._root_folder, f))
+        ws = get_workspace()
+        self._view = ws.view(DOCUMENTS, allow_file, ignore_folders, gitignore=gitignore)
 
-        ignore_folders = {expand_folder(k): v for k, v in ignore_folders.items()}
-        global_ignore_folders = ignore_folders.get('', [])
+        # Items are streamed while the workspace index is revalidated
+        self.items = self._load_items()
 
+    def _load_items(self):
         home_folder = os.path.expanduser('~')
-        items = []
-        for root, subdirs, files in os.walk(self._root_folder, topdown=True, followlinks=True):
-            if ignore_folders:
-                ignore_list = global_ignore_folders[:]
-                ignore_list.extend(ignore_folders.get(root, []))
-                subdirs[:] = [d for d in subdirs if d not in ignore_list]
+        for root, files in self._view.walk():
             display_folder = ' • '.join(root[len(home_folder) + 1:].split(os.sep))
-            if allow_file:
-                files = [f for f in files if allow_file(root, f)]
-            items.extend([FilePickerItem(root, f, display_folder) for f in files])
-
-        self.items = sorted(items)
+            yield from (FilePickerItem(root, f, display_folder) for f in files)
 
 
 def main():
@@ -70,6 +62,7 @@ def main():
 
     kwargs = {
         'ignore_folders': _ignore_folders(),
+        'gitignore': get_config_value('file_picker.gitignore', False),
         'allow_file': allow_file
     }
 
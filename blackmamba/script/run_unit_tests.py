@@ -5,7 +5,7 @@ import editor
 import os
 import xml.etree.ElementTree as ET
 import console
-from blackmamba.ide.annotation import Annotation, Style
+from blackmamba.ide.annotation import Annotation, AnnotationBatch, Style
 from blackmamba.config import get_config_value
 from blackmamba.ide.tab import save
 import re
@@ -106,10 +106,9 @@ def _run_unit_tests(path):
 
     _show_results(attrib, not annotations)
 
-    scroll = True
-    for a in annotations:
-        editor.annotate_line(a.line, a.text, a.style.value, True, filename=a.filename, scroll=scroll)
-        scroll = False
+    batch = AnnotationBatch(separator='\n')
+    batch.extend(annotations)
+    batch.flush(editor)
 
     if _hide_console():
         console.hide_output()
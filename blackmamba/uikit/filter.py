@@ -0,0 +1,225 @@
+#!python3
+
+"""Picker items filtering.
+
+.. warning:: This module must not introduce dependency on the ``ui`` module.
+    Filtering is used by the `blackmamba.uikit.picker` and must be testable
+    on any platform.
+"""
+
+import threading
+from blackmamba.uikit.fuzzy import FuzzyMatcher, top
+from blackmamba.uikit.store import ItemStore
+from blackmamba.uikit.stream import merge_sorted
+
+_CHUNK_SIZE = 4096
+
+
+def search_terms(query):
+    """Split query into lower cased search terms.
+
+    Args:
+        query: Query string, terms are separated by spaces.
+
+    Returns:
+        Tuple of search terms.
+    """
+    if not query:
+        return ()
+
+    return tuple(
+        x.strip().lower()
+        for x in query.split(' ')
+        if x.strip()
+    )
+
+
+def narrows(terms, previous_terms):
+    """Check if terms narrow previous terms.
+
+    Terms narrow previous terms if every value matching terms matches
+    previous terms as well. It's true when user only appended characters
+    to the query.
+
+    Args:
+        terms: Current search terms.
+        previous_terms: Previous search terms.
+
+    Returns:
+        `True` if terms narrow previous terms.
+    """
+    count = len(previous_terms)
+
+    if not count or len(terms) < count:
+        return False
+
+    if terms[:count - 1] != previous_terms[:count - 1]:
+        return False
+
+    return terms[count - 1].startswith(previous_terms[count - 1])
+
+
+def matches(value, terms):
+    start = 0
+    for t in terms:
+        start = value.find(t, start)
+
+        if start == -1:
+            return False
+
+        start += len(t)
+
+    return True
+
+
+class FilterResult:
+    """Filter result.
+
+    Attributes:
+        query: Query string.
+        source: Source items.
+        items: Matching items ordered by score.
+    """
+    __slots__ = ('query', 'source', 'items', '_indexes', '_matcher', '_store')
+
+    def __init__(self, query, source, items, indexes=None, matcher=None, store=None):
+        self.query = query
+        self.source = source
+        self.items = items
+        self._indexes = indexes
+        self._matcher = matcher
+        self._store = store
+
+    def __len__(self):
+        return len(self.items)
+
+    def match_positions(self, row):
+        """Return matched positions in the ``match_value`` of the filtered item.
+
+        Args:
+            row: Filtered item row.
+
+        Returns:
+            List of positions or `None` if there's no query.
+        """
+        if not self._matcher or row >= len(self._indexes):
+            return None
+
+        index = self._indexes[row]
+        match = self._matcher.match(self._store.value(index), self._store.table(index))
+        return match[1] if match else None
+
+
+class ItemFilter:
+    """Incremental items filter.
+
+    Items are fuzzy matched (see `blackmamba.uikit.fuzzy`) and only the best
+    ``limit`` items are returned, ordered by score. Items with the same score
+    are ordered by items order (``sort_value`` of picker items), not by the
+    order in which they were added.
+
+    Keeps stack of previous filter results. If the query narrows the previous one,
+    only the last result is scanned again. Backspace pops back to the cached result.
+
+    Match values are packed into the `blackmamba.uikit.store.ItemStore`,
+    ``match_value`` property of every item is read just once.
+
+    `filter` can be called from the background thread. Items can be replaced
+    or extended in the meantime, running `filter` finishes with the previous items.
+
+    Args:
+        items: List of items with ``match_value`` property.
+        limit: Maximum number of returned items, `None` for no limit.
+    """
+    def __init__(self, items=None, limit=None):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self.items = items or []
+
+    @property
+    def items(self):
+        return self._state[0]
+
+    @items.setter
+    def items(self, items):
+        store = ItemStore(i.match_value for i in items)
+        with self._lock:
+            # (displayed items, items in the store order, store, stack)
+            self._state = (items, list(items), store, [])
+
+    def extend(self, items, sort=False):
+        """Append items.
+
+        Items are appended to the store and cached filter results are extended
+        by matching new items only.
+
+        Args:
+            items: List of items to append.
+            sort: `True` to merge items into sorted displayed items, `False` to append them.
+        """
+        if not items:
+            return
+
+        with self._lock:
+            displayed, source, store, stack = self._state
+            start = len(source)
+
+            # Source must be extended first, indexes in the store & stack point to it
+            source.extend(items)
+            store.extend(i.match_value for i in items)
+
+            candidates = range(start, len(source))
+            for terms, indexes in stack:
+                candidates = store.search(FuzzyMatcher(terms).regex, candidates)
+                indexes.extend(candidates)
+
+            displayed = merge_sorted(displayed, items) if sort else displayed + items
+            self._state = (displayed, source, store, stack)
+
+    def _filter_indexes(self, terms, matcher, store, stack, check):
+        while stack and not narrows(terms, stack[-1][0]):
+            stack.pop()
+
+        if stack and stack[-1][0] == terms:
+            return stack[-1][1]
+
+        candidates = stack[-1][1] if stack else None
+        indexes = store.search(matcher.regex, candidates, check)
+        stack.append((terms, indexes))
+        return indexes
+
+    def _rank(self, indexes, matcher, store, source, check):
+        value = store.value
+        table = store.table
+        score = matcher.score
+
+        scored = []
+        for chunk in range(0, len(indexes), _CHUNK_SIZE):
+            if check:
+                check()
+            scored.extend([(score(value(i), table(i)), i) for i in indexes[chunk:chunk + _CHUNK_SIZE]])
+
+        return top(scored, self.limit, source.__getitem__)
+
+    def filter(self, query, check=None):
+        """Filter items.
+
+        Args:
+            query: Query string, see `search_terms`.
+            check: Function called periodically, can raise to cancel filtering.
+
+        Returns:
+            `FilterResult`.
+        """
+        items, source, store, stack = self._state
+        terms = search_terms(query)
+
+        if not terms:
+            return FilterResult(query, items, items)
+
+        matcher = FuzzyMatcher(terms)
+        with self._lock:
+            indexes = self._filter_indexes(terms, matcher, store, stack, check)
+        indexes = self._rank(indexes, matcher, store, source, check)
+
+        return FilterResult(query, items, [source[i] for i in indexes], indexes, matcher, store)
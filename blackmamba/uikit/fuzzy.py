@@ -0,0 +1,195 @@
+#!python3
+
+"""Fuzzy matching & scoring.
+
+Query characters must appear in the value in the same order, but not
+necessarily consecutively. Matches are scored, bonus is given for:
+
+* characters at the start of the value or after path separator,
+* characters at the word boundary (after space, ``_``, ``-``, ``.``, ...),
+* consecutive characters,
+* match inside the base name (part after the last path separator).
+
+.. warning:: This module must not introduce dependency on the ``ui`` module.
+"""
+
+import heapq
+import re
+
+SEPARATOR_BONUS = 3
+WORD_BONUS = 2
+CONSECUTIVE_BONUS = 2
+GAP_PENALTY = 1
+BASENAME_BONUS = 6
+
+_SEPARATOR_BOUNDARY_RE = re.compile(r'(?:^|[/\\])([^/\\])')
+_WORD_BOUNDARY_RE = re.compile(r'[\s_\-.:•]([^\s_\-.:•/\\])')
+
+
+class BoundaryTable:
+    """Precomputed value boundaries.
+
+    Attributes:
+        bonuses: Bonus for every value character.
+        boundaries: Dictionary, key is a character and value is the first boundary position of this character.
+        basename: Start of the base name.
+    """
+    __slots__ = ('bonuses', 'boundaries', 'basename')
+
+    def __init__(self, value):
+        bonuses = bytearray(len(value))
+
+        words = [m.start(1) for m in _WORD_BOUNDARY_RE.finditer(value)]
+        for p in words:
+            bonuses[p] = WORD_BONUS
+
+        separators = [m.start(1) for m in _SEPARATOR_BOUNDARY_RE.finditer(value)]
+        for p in separators:
+            bonuses[p] = SEPARATOR_BONUS
+
+        boundaries = {}
+        for p in sorted(words + separators):
+            boundaries.setdefault(value[p], p)
+
+        self.bonuses = bonuses
+        self.boundaries = boundaries
+        self.basename = max(value.rfind('/'), value.rfind('\\')) + 1
+
+
+def _align(value, chars, start):
+    positions = []
+    pos = start
+    for c in chars:
+        pos = value.find(c, pos)
+        if pos == -1:
+            return None
+        positions.append(pos)
+        pos += 1
+    return positions
+
+
+def _score(positions, table):
+    bonuses = table.bonuses
+    score = 0
+    run = 0
+    prev = None
+
+    for p in positions:
+        score += 1 + bonuses[p]
+
+        if prev is not None:
+            if p == prev + 1:
+                run += 1
+                score += run * CONSECUTIVE_BONUS
+            else:
+                run = 0
+                score -= GAP_PENALTY
+
+        prev = p
+
+    if positions[0] >= table.basename:
+        score += BASENAME_BONUS
+
+    return score
+
+
+class FuzzyMatcher:
+    """Fuzzy matcher.
+
+    Args:
+        terms: Search terms, see `blackmamba.uikit.filter.search_terms`.
+    """
+    def __init__(self, terms):
+        self.chars = ''.join(terms)
+        # a[^b\n]*b[^c\n]*c, never matches across lines
+        self.regex = re.compile(''.join(
+            '{}{}'.format('[^{}\\n]*'.format(re.escape(c)) if i else '', re.escape(c))
+            for i, c in enumerate(self.chars)
+        ))
+
+    def matches(self, value):
+        """Check if the value matches.
+
+        Returns:
+            `True` if all characters appear in the value in the same order.
+        """
+        return self.regex.search(value) is not None
+
+    def _starts(self, value, table):
+        first = self.chars[0]
+        starts = [value.find(first)]
+
+        if starts[0] == -1:
+            return []
+
+        start = table.boundaries.get(first)
+        if start is not None and start != starts[0]:
+            starts.append(start)
+
+        if table.basename:
+            start = value.find(first, table.basename)
+            if start != -1 and start not in starts:
+                starts.append(start)
+
+        return starts
+
+    def match(self, value, table):
+        """Score the value.
+
+        Args:
+            value: Value to score.
+            table: Value `BoundaryTable`.
+
+        Returns:
+            Tuple (score, list of matched positions) or `None` if value doesn't match.
+        """
+        if not self.chars:
+            return 0, []
+
+        best = None
+        for start in self._starts(value, table):
+            positions = _align(value, self.chars, start)
+            if positions is None:
+                continue
+
+            score = _score(positions, table)
+            if best is None or score > best[0]:
+                best = (score, positions)
+
+        return best
+
+    def score(self, value, table):
+        """Score the value, see `match`.
+
+        Returns:
+            Score or `None` if value doesn't match.
+        """
+        result = self.match(value, table)
+        return result[0] if result else None
+
+
+def top(scored, k, tie_key=None):
+    """Select the best k items.
+
+    Args:
+        scored: Iterable of (score, index) tuples.
+        k: Number of items to keep, all items if `None`.
+        tie_key: Function accepting index, returns value used to order items
+            with the same score. Index is used if not provided.
+
+    Returns:
+        List of indexes, ordered by score (desc) and tie key (asc).
+    """
+    if tie_key:
+        def key(x):
+            return -x[0], tie_key(x[1])
+    else:
+        key = _top_key
+
+    if k is None:
+        return [i for _, i in sorted(scored, key=key)]
+    return [i for _, i in heapq.nsmallest(k, scored, key=key)]
+
+
+def _top_key(x):
+    return -x[0], x[1]
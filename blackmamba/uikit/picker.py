@@ -1,16 +1,35 @@
 #!python3
 
 import ui
-from blackmamba.uikit.table import UITableViewCellStyle
+import threading
+import traceback
+from collections.abc import Iterator
+from objc_util import ObjCClass, ObjCInstance, NSRange, on_main_thread
+from blackmamba.uikit.table import UITableViewCellStyle, CellPool
 from blackmamba.uikit.keyboard import (
     UIKeyModifier, UIEventKeyCode,
     register_key_event_handler, unregister_key_event_handlers,
     is_in_hardware_keyboard_mode
 )
 from blackmamba.uikit.autolayout import LayoutProxy
+from blackmamba.uikit.filter import ItemFilter, matches, search_terms
+from blackmamba.uikit.stream import batches
+from blackmamba.util.worker import Worker, Cancelled
+from blackmamba.log import error
+
+_FILTER_LIMIT = 500
+# Debounce interval for background filtering (seconds)
+_FILTER_DELAY = 0.1
+# Smaller pickers are filtered synchronously
+_SYNC_FILTER_COUNT = 2000
+
+NSMutableAttributedString = ObjCClass('NSMutableAttributedString')
+UIColor = ObjCClass('UIColor')
 
 
 class PickerItem:
+    __slots__ = ('_title', '_normalized_title', 'subtitle', 'image')
+
     def __init__(self, title, subtitle=None, image=None):
         self._title = title
         self._normalized_title = title.lower()
@@ -40,16 +59,7 @@ class PickerItem:
         if not search_terms:
             return True
 
-        start = 0
-        for t in search_terms:
-            start = self.match_value.find(t, start)
-
-            if start == -1:
-                return False
-
-            start += len(t)
-
-        return True
+        return matches(self.match_value, search_terms)
 
     def __lt__(self, other):
         return self.sort_value < other.sort_value
@@ -58,29 +68,86 @@ class PickerItem:
         return self.title
 
 
+def _title_positions(item, positions):
+    # Positions are in the match_value, title is usually the suffix of it
+    match_value = item.match_value
+    title = item.title
+    offset = len(match_value) - len(title)
+
+    if offset < 0 or not match_value.endswith(title.lower()):
+        return []
+
+    return [p - offset for p in positions if p >= offset]
+
+
+def _position_ranges(positions):
+    ranges = []
+    for p in positions:
+        if ranges and ranges[-1][0] + ranges[-1][1] == p:
+            ranges[-1][1] += 1
+        else:
+            ranges.append([p, 1])
+    return ranges
+
+
+def _highlight_label_text(label, text, positions):
+    attributed_text = NSMutableAttributedString.alloc().initWithString_(text)
+    color = UIColor.yellowColor().colorWithAlphaComponent_(0.4)
+
+    for location, length in _position_ranges(positions):
+        attributed_text.addAttribute_value_range_('NSBackgroundColor', color, NSRange(location, length))
+
+    ObjCInstance(label).setAttributedText_(attributed_text)
+
+
+def _create_cell(style):
+    cell = ui.TableViewCell(style)
+    cell.text_label.number_of_lines = 1
+    cell.detail_text_label.text_color = (0, 0, 0, 0.5)
+    return cell
+
+
 class PickerDataSource(object):
     def __init__(self):
         self.tableview = None
         self.action = None
+        self.did_change_loading = None
         self._filter_by = None
         self._selected_row = -1
         self._items = None
         self._filtered_items = []
         self._filter = None
+        self._item_filter = ItemFilter(limit=_FILTER_LIMIT)
+        self._filter_result = None
+        self._filter_worker = Worker(_FILTER_DELAY)
+        self._cell_pool = CellPool(_create_cell)
+        self._stream = None
+        self._stream_lock = threading.Lock()
 
     def _filter_items(self):
-        if self._filter:
-            search_terms = [
-                x.strip().lower()
-                for x in self._filter.split(' ')
-                if x.strip()
-            ]
-
-            self._filtered_items = [
-                i for i in self._items if i.matches(search_terms)
-            ]
-        else:
-            self._filtered_items = self._items
+        query = self._filter
+        item_filter = self._item_filter
+
+        if not search_terms(query) or len(item_filter.items) <= _SYNC_FILTER_COUNT:
+            self._filter_worker.cancel()
+            self._set_filter_result(item_filter.filter(query))
+            return
+
+        self._filter_worker.submit(
+            lambda token: item_filter.filter(query, token.check),
+            self._publish_filter_result
+        )
+
+    @on_main_thread
+    def _publish_filter_result(self, result):
+        # Newer query or items can be set in the meantime
+        if result.query != self._filter or result.source is not self._item_filter.items:
+            return
+        self._set_filter_result(result)
+
+    def _set_filter_result(self, result):
+        self._filter_result = result
+        self._filtered_items = result.items
         self._selected_row = -1
         self.reload()
 
@@ -88,6 +155,65 @@ class PickerDataSource(object):
         self._filter = filter
         self._filter_items()
 
+    def cancel_filtering(self):
+        self._filter_worker.cancel()
+        with self._stream_lock:
+            self._stream = None
+
+    @property
+    def loading(self):
+        return self._stream is not None
+
+    def check_loading(self):
+        """Raise `blackmamba.util.worker.Cancelled` if items are not loaded anymore.
+
+        Can be called periodically by slow items iterators.
+        """
+        if not self.loading:
+            raise Cancelled()
+
+    def _set_stream(self, stream):
+        was_loading = self.loading
+        self._stream = stream
+
+        if self.did_change_loading and was_loading != self.loading:
+            self.did_change_loading(self)
+
+    def _stream_items(self, iterator):
+        stream = object()
+        item_filter = self._item_filter
+
+        def load():
+            try:
+                for batch in batches(iterator):
+                    # Items can be replaced on the main thread in the meantime
+                    with self._stream_lock:
+                        if self._stream is not stream:
+                            return
+                        item_filter.extend(batch, sort=True)
+                    self._did_load_batch(stream)
+            except Cancelled:
+                pass
+            except Exception:
+                error(traceback.format_exc())
+            finally:
+                self._did_finish_stream(stream)
+
+        self._set_stream(stream)
+        threading.Thread(target=load, daemon=True).start()
+
+    @on_main_thread
+    def _did_load_batch(self, stream):
+        if self._stream is not stream:
+            return
+        self._items = self._item_filter.items
+        self._filter_items()
+
+    @on_main_thread
+    def _did_finish_stream(self, stream):
+        if self._stream is stream:
+            self._set_stream(None)
+
     @property
     def filtered_items(self):
         return self._filtered_items
@@ -98,9 +224,21 @@ class PickerDataSource(object):
 
     @items.setter
     def items(self, value):
-        self._items = value
+        # Iterator (generator, ...) is consumed in the background thread
+        # and items are displayed in batches, sorted
+        iterator = value if isinstance(value, Iterator) else None
+        if iterator:
+            value = []
+
+        with self._stream_lock:
+            self._set_stream(None)
+            self._items = value
+            self._item_filter.items = value or []
         self._filter_items()
 
+        if iterator:
+            self._stream_items(iterator)
+
     @property
     def selected_row(self):
         return self._selected_row
@@ -162,13 +300,16 @@ class PickerDataSource(object):
 
     def tableview_cell_for_row(self, tv, section, row):
         item = self._filtered_items[row]
-        cell = ui.TableViewCell(UITableViewCellStyle.subtitle.value)
-        cell.text_label.number_of_lines = 1
+        # Cell can be reused, every property must be set
+        cell = self._cell_pool.cell(UITableViewCellStyle.subtitle.value, row)
         cell.text_label.text = item.title
+        positions = self._filter_result.match_positions(row) if self._filter_result else None
+        if positions:
+            positions = _title_positions(item, positions)
+            if positions:
+                _highlight_label_text(cell.text_label, item.title, positions)
         cell.detail_text_label.text = item.subtitle
-        cell.detail_text_label.text_color = (0, 0, 0, 0.5)
-        if item.image:
-            cell.image_view.image = item.image
+        cell.image_view.image = item.image
         return cell
 
 
@@ -186,6 +327,7 @@ class PickerView(ui.View):
         self._tableview = ui.TableView()
         self._textfield = ui.TextField()
         self._help_label = ui.Label()
+        self._activity_indicator = ui.ActivityIndicator()
         self._datasource = None
         self._handlers = None
         self.shift_enter_enabled = True
@@ -199,6 +341,13 @@ class PickerView(ui.View):
         tf.layout.height.equal = 31
         tf.delegate = self
 
+        ai = LayoutProxy(self._activity_indicator)
+        self.add_subview(ai)
+        ai.layout.align_right_to(tf).equal = -8
+        ai.layout.align_center_y_to(tf).equal = 0
+        ai.style = ui.ACTIVITY_INDICATOR_STYLE_GRAY
+        ai.hides_when_stopped = True
+
         tv = LayoutProxy(self._tableview)
         self.add_subview(tv)
         tv.layout.align_left_to(tf).equal = 0
@@ -261,6 +410,8 @@ class PickerView(ui.View):
     def will_close(self):
         if self._handlers:
             unregister_key_event_handlers(self._handlers)
+        if self._datasource:
+            self._datasource.cancel_filtering()
 
     @property
     def datasource(self):
@@ -274,9 +425,17 @@ class PickerView(ui.View):
             self._did_select_item()
 
         self._datasource.action = did_select_item
+        self._datasource.did_change_loading = self._did_change_loading
+        self._did_change_loading(self._datasource)
         self._tableview.data_source = self._datasource
         self._tableview.delegate = self._datasource
 
+    def _did_change_loading(self, ds):
+        if ds.loading:
+            self._activity_indicator.start()
+        else:
+            self._activity_indicator.stop()
+
     @property
     def help_label(self):
         return self._help_label
@@ -0,0 +1,114 @@
+#!python3
+
+"""Packed picker item store.
+
+Match values of all items are joined into one buffer (separated by ``'\\n'``)
+with an offset array. Items are scanned by regular expressions over the
+whole buffer, not by per item method calls.
+
+.. warning:: This module must not introduce dependency on the ``ui`` module.
+"""
+
+from array import array
+from bisect import bisect_right
+from blackmamba.uikit.fuzzy import BoundaryTable
+
+_CHUNK_SIZE = 4096
+
+
+class ItemStore:
+    """Columnar store of match values.
+
+    Args:
+        values: Iterable of match values.
+    """
+    __slots__ = ('_buffer', '_offsets', '_tables')
+
+    def __init__(self, values=None):
+        self._buffer = ''
+        self._offsets = array('l', [0])
+        self._tables = []
+        self.extend(values or [])
+
+    def extend(self, values):
+        """Append match values.
+
+        Can be called while the store is searched in the background thread.
+        Running search doesn't see new values, returned indexes remain valid.
+
+        Args:
+            values: Iterable of match values.
+        """
+        values = [v.replace('\n', ' ') for v in values]
+        if not values:
+            return
+
+        offsets = array('l')
+        offset = self._offsets[-1]
+        for v in values:
+            offset += len(v) + 1
+            offsets.append(offset)
+
+        # Offsets must be extended before the buffer, search maps positions
+        # in the buffer to indexes via offsets
+        self._tables.extend([None] * len(values))
+        self._offsets.extend(offsets)
+        self._buffer += '\n'.join(values) + '\n'
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def value(self, index):
+        """Return match value of the item."""
+        return self._buffer[self._offsets[index]:self._offsets[index + 1] - 1]
+
+    def table(self, index):
+        """Return `blackmamba.uikit.fuzzy.BoundaryTable` of the item value."""
+        table = self._tables[index]
+        if table is None:
+            table = BoundaryTable(self.value(index))
+            self._tables[index] = table
+        return table
+
+    def search(self, regex, candidates=None, check=None):
+        """Search items matching regular expression.
+
+        Regular expression must not match ``'\\n'``.
+
+        Args:
+            regex: Compiled regular expression.
+            candidates: Indexes of items to search, all items if `None`.
+            check: Function called periodically, can raise to cancel search.
+
+        Returns:
+            List of indexes of matching items.
+        """
+        buffer = self._buffer
+        offsets = self._offsets
+        search = regex.search
+
+        if candidates is not None:
+            result = []
+            for chunk in range(0, len(candidates), _CHUNK_SIZE):
+                if check:
+                    check()
+                result.extend([
+                    i for i in candidates[chunk:chunk + _CHUNK_SIZE]
+                    if search(buffer, offsets[i], offsets[i + 1] - 1)
+                ])
+            return result
+
+        result = []
+        pos = 0
+        while True:
+            if check and not len(result) % _CHUNK_SIZE:
+                check()
+
+            m = search(buffer, pos)
+            if not m:
+                break
+            index = bisect_right(offsets, m.start()) - 1
+            result.append(index)
+            pos = offsets[index + 1]
+
+        return result
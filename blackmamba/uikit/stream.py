@@ -0,0 +1,69 @@
+#!python3
+
+"""Streaming picker items.
+
+Items can be produced by a slow iterator (file system walk, ...). Picker
+doesn't wait for all of them, items are consumed in batches and every batch
+is merged into already displayed items.
+
+.. warning:: This module must not introduce dependency on the ``ui`` module.
+"""
+
+import time
+
+BATCH_SIZE = 100
+MAX_BATCH_SIZE = 10000
+BATCH_INTERVAL = 0.05
+
+
+def batches(iterable, size=BATCH_SIZE, max_size=MAX_BATCH_SIZE, interval=BATCH_INTERVAL, clock=time.monotonic):
+    """Split iterable into batches.
+
+    Batch is yielded when it contains ``size`` items or when ``interval``
+    elapsed since the previous batch. Batch size doubles (up to ``max_size``)
+    after every batch, thus the first items are available quickly and
+    the number of batches (merges) is logarithmic.
+
+    Args:
+        iterable: Iterable of items.
+        size: Initial batch size.
+        max_size: Maximum batch size.
+        interval: Maximum time (seconds) between batches, checked when an item arrives.
+        clock: Function returning current time.
+
+    Yields:
+        Non empty lists of items.
+    """
+    batch = []
+    due = clock() + interval
+
+    for item in iterable:
+        batch.append(item)
+
+        if len(batch) >= size or clock() >= due:
+            yield batch
+            batch = []
+            size = min(size * 2, max_size)
+            due = clock() + interval
+
+    if batch:
+        yield batch
+
+
+def merge_sorted(items, batch, key=None):
+    """Merge batch into sorted items.
+
+    Batch is sorted and appended, timsort detects both sorted runs and just
+    merges them.
+
+    Args:
+        items: Sorted list of items, not modified.
+        batch: List of items to merge.
+        key: Sort key function.
+
+    Returns:
+        New sorted list of items.
+    """
+    result = items + sorted(batch, key=key)
+    result.sort(key=key)
+    return result
@@ -1,5 +1,6 @@
 #!python3
 
+from collections import OrderedDict
 from enum import Enum
 
 
@@ -8,3 +9,52 @@ class UITableViewCellStyle(str, Enum):
     subtitle = 'subtitle'
     value1 = 'value1'
     value2 = 'value2'
+
+
+class CellPool:
+    """Reuse pool of table view cells.
+
+    Pythonista ``ui.TableView`` doesn't expose cells dequeuing. Pool keeps at most
+    ``capacity`` cells per style, every cell is bound to the row it was used for.
+    Cell bound to the requested row is returned if it exists, otherwise the least
+    recently used cell is rebound. Capacity must be larger than the number of
+    visible rows.
+
+    .. note:: This class must not introduce dependency on the ``ui`` module.
+
+    Args:
+        factory: Function accepting cell style, returns new cell.
+        capacity: Maximum number of cells per style.
+    """
+    def __init__(self, factory, capacity=64):
+        self._factory = factory
+        self._capacity = capacity
+        self._pools = {}
+
+    def cell(self, style, row):
+        """Return cell for the row.
+
+        Returned cell can be reused and must be configured from scratch.
+
+        Args:
+            style: Cell style.
+            row: Row index.
+
+        Returns:
+            Table view cell.
+        """
+        pool = self._pools.setdefault(style, OrderedDict())
+
+        cell = pool.pop(row, None)
+        if cell is None:
+            if len(pool) >= self._capacity:
+                _, cell = pool.popitem(last=False)
+            else:
+                cell = self._factory(style)
+
+        pool[row] = cell
+        return cell
+
+    def clear(self):
+        """Remove all cells from the pool."""
+        self._pools = {}
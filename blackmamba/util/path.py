@@ -20,3 +20,48 @@ def strip_documents_folder(path):
 def is_python_file(path):
     _, ext = os.path.splitext(path)
     return ext.lower() == '.py'
+
+
+_CACHES = os.path.expanduser('~/Library/Caches/blackmamba')
+
+
+def get_cache_folder():
+    """
+    Return path of the Black Mamba caches folder.
+
+    Folder is created if it doesn't exist.
+    """
+    os.makedirs(_CACHES, exist_ok=True)
+    return _CACHES
+
+
+def get_cache_path(name):
+    """
+    Return path of the file named name in the Black Mamba caches folder.
+    """
+    return os.path.join(get_cache_folder(), name)
+
+
+_PROJECT_MARKERS = ('.git', 'setup.py', 'setup.cfg', 'tox.ini', '.flake8')
+
+
+def find_project_root(path, top=_DOCUMENTS):
+    """
+    Return project root folder of the file.
+
+    The nearest folder with .git, setup.py, setup.cfg, tox.ini or .flake8
+    between the file folder and top folder. File folder if there's no such
+    folder.
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    top = os.path.abspath(top)
+
+    current = folder
+    while True:
+        if any(os.path.exists(os.path.join(current, marker)) for marker in _PROJECT_MARKERS):
+            return current
+
+        parent = os.path.dirname(current)
+        if current == top or parent == current or not current.startswith(top):
+            return folder
+        current = parent
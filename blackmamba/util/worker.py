@@ -0,0 +1,149 @@
+#!python3
+
+"""Debounced background worker.
+
+Only the latest submitted job matters. Every `Worker.submit` call increments
+generation counter, which cancels pending and running jobs. Running job must
+cooperate and call `Token.check` periodically.
+
+.. warning:: This module must not introduce dependency on any Pythonista module.
+"""
+
+import threading
+import time
+import traceback
+from blackmamba.log import error
+
+
+class Cancelled(Exception):
+    """Raised by `Token.check` if the job was cancelled."""
+    pass
+
+
+class Token:
+    """Job cancellation token.
+
+    Args:
+        worker: `Worker` which runs the job.
+        generation: Job generation.
+    """
+    __slots__ = ('_worker', 'generation')
+
+    def __init__(self, worker, generation):
+        self._worker = worker
+        self.generation = generation
+
+    @property
+    def cancelled(self):
+        """`True` if newer job was submitted or the worker was cancelled."""
+        return not self._worker.is_current(self.generation)
+
+    def check(self):
+        """Raise `Cancelled` if the job was cancelled."""
+        if self.cancelled:
+            raise Cancelled()
+
+
+class Worker:
+    """Runs the latest submitted job in the background thread.
+
+    Thread is started when a job is submitted and it exits when there's
+    nothing to do.
+
+    Args:
+        delay: Debounce interval (seconds). Job is started if no other job was
+            submitted in this interval.
+    """
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self._condition = threading.Condition()
+        self._generation = 0
+        self._pending = None
+        self._thread = None
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def is_current(self, generation):
+        """Check if the generation is the latest one."""
+        return generation == self._generation
+
+    def submit(self, job, done=None):
+        """Submit job, cancel all the previous ones.
+
+        Args:
+            job: Function accepting `Token`, returns result.
+            done: Function accepting job result. Called from the background thread
+                and only if the job wasn't cancelled.
+
+        Returns:
+            Job generation.
+        """
+        with self._condition:
+            self._generation += 1
+            self._pending = (self._generation, time.monotonic() + self.delay, job, done)
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            else:
+                self._condition.notify_all()
+
+            return self._generation
+
+    def cancel(self):
+        """Cancel pending and running jobs."""
+        with self._condition:
+            self._generation += 1
+            self._pending = None
+            self._condition.notify_all()
+
+    def wait(self, timeout=None):
+        """Wait until all jobs are finished.
+
+        Returns:
+            `True` if there's nothing to do, `False` if timed out.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._thread is None, timeout)
+
+    def _next_job(self):
+        with self._condition:
+            while True:
+                if not self._pending:
+                    self._thread = None
+                    self._condition.notify_all()
+                    return None
+
+                generation, due, job, done = self._pending
+                delay = due - time.monotonic()
+
+                if delay <= 0:
+                    self._pending = None
+                    return generation, job, done
+
+                self._condition.wait(delay)
+
+    def _run(self):
+        while True:
+            next_job = self._next_job()
+            if not next_job:
+                return
+
+            generation, job, done = next_job
+            token = Token(self, generation)
+
+            try:
+                result = job(token)
+            except Cancelled:
+                continue
+            except Exception:
+                error(traceback.format_exc())
+                continue
+
+            if done and not token.cancelled:
+                try:
+                    done(result)
+                except Exception:
+                    error(traceback.format_exc())
@@ -0,0 +1,35 @@
+#!python3
+
+import os
+import pytest
+
+
+@pytest.fixture
+def write_file(tmpdir):
+    """Return function writing a file into the temporary folder.
+
+    Function accepts path (relative to the temporary folder or absolute) and
+    text, returns absolute path. Parent folders are created.
+    """
+    def write(path, text=''):
+        path = os.path.join(str(tmpdir), str(path))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as output:
+            output.write(text)
+        return path
+
+    return write
+
+
+@pytest.fixture
+def make_tree(write_file):
+    """Return function creating empty files.
+
+    Function accepts list of file paths and optional root folder (temporary folder
+    if not provided).
+    """
+    def make(paths, root=''):
+        for path in paths:
+            write_file(os.path.join(str(root), path))
+
+    return make
@@ -0,0 +1,274 @@
+#!python3
+
+import os
+import pytest
+from blackmamba.ide.analyzer import (
+    Analyzer, Violation, flake8_violations, pep8_pyflakes_violations, pep8_pyflakes_config,
+    _SharedSource, _LineDiff
+)
+import blackmamba.ide.analyzer as analyzer
+from blackmamba.util.path import find_project_root
+
+
+_PATH = '/tmp/blackmamba/module.py'
+
+_SOURCE = '''\
+import os
+import sys  # noqa
+x=1
+'''
+
+
+@pytest.fixture
+def flake8():
+    # Analyzers target bundled versions, which do not run on every Python version
+    try:
+        flake8_violations('', _PATH)
+    except Exception as e:
+        pytest.skip('flake8 is not available: {}'.format(e))
+    return flake8_violations
+
+
+def test_flake8_violations(flake8):
+    assert flake8(_SOURCE, _PATH) == [
+        Violation('F401', 1, 1, "'os' imported but unused"),
+        Violation('E225', 3, 2, 'missing whitespace around operator')
+    ]
+
+
+def test_flake8_passes(flake8):
+    assert flake8(_SOURCE, _PATH, [['--select=E'], ['--select=F', '--ignore=E']]) == [
+        Violation('E225', 3, 2, 'missing whitespace around operator'),
+        Violation('F401', 1, 1, "'os' imported but unused")
+    ]
+
+
+def test_flake8_project_config(flake8, write_file):
+    path = write_file('module.py', _SOURCE)
+    write_file('.flake8', '[flake8]\nignore = E225\n')
+
+    assert flake8(_SOURCE, path) == [
+        Violation('F401', 1, 1, "'os' imported but unused")
+    ]
+
+
+def test_flake8_modified_project_config(flake8, write_file):
+    path = write_file('module.py', _SOURCE)
+    config = write_file('.flake8', '[flake8]\nignore = E225\n')
+    assert [v.code for v in flake8(_SOURCE, path)] == ['F401']
+
+    write_file('.flake8', '[flake8]\nignore = F401\n')
+    mtime = os.stat(config).st_mtime + 10
+    os.utime(config, (mtime, mtime))
+    assert [v.code for v in flake8(_SOURCE, path)] == ['E225']
+
+
+def test_analyzer_modified_project_config(flake8, write_file):
+    analyzer = Analyzer()
+    path = write_file('module.py', _SOURCE)
+    config = write_file('.flake8', '[flake8]\nignore = E225\n')
+    assert [v.code for v in analyzer.flake8(_SOURCE, path)] == ['F401']
+
+    write_file('.flake8', '[flake8]\nignore = F401\n')
+    mtime = os.stat(config).st_mtime + 10
+    os.utime(config, (mtime, mtime))
+    assert [v.code for v in analyzer.flake8(_SOURCE, path)] == ['E225']
+    assert [v.code for v in analyzer.flake8(_SOURCE.replace('x=1', 'y=1'), path)] == ['E225']
+
+
+def test_shared_source_tokens():
+    source = _SharedSource(['\ufeffx = """\n', 'a\n', '"""\n'])
+    tokens, error = source.tokens()
+
+    assert source.lines[0] == 'x = """\n'
+    assert error is None
+    # Multiline string is returned after the third line was read
+    assert [(token.string, read) for token, read in tokens[:3]] == [('x', 1), ('=', 1), ('"""\na\n"""', 3)]
+    assert source.tokens()[0] is tokens
+
+
+def test_shared_source_token_error():
+    tokens, error = _SharedSource(['x = (\n']).tokens()
+
+    assert [token.string for token, _ in tokens][:3] == ['x', '=', '(']
+    assert error is not None
+
+
+def test_shared_source_tree():
+    source = _SharedSource(['x = 1\n'])
+    assert source.tree() is source.tree()
+
+    source = _SharedSource(['x = (\n'])
+    with pytest.raises(SyntaxError):
+        source.tree()
+    with pytest.raises(SyntaxError):
+        source.tree()
+
+
+def test_pep8_pyflakes_violations():
+    pep8, pyflakes = pep8_pyflakes_violations(_SOURCE, _PATH)
+
+    assert pep8 == [Violation('E225', 3, 2, 'missing whitespace around operator')]
+    # pyflakes doesn't support noqa comments
+    assert pyflakes == [
+        Violation('UnusedImport', 1, 1, "'os' imported but unused"),
+        Violation('UnusedImport', 2, 1, "'sys' imported but unused")
+    ]
+
+
+def test_pep8_pyflakes_options():
+    text = 'x=1\ny = "{}"\n'.format('a' * 80)
+
+    assert pep8_pyflakes_violations(text, _PATH) == ([
+        Violation('E225', 1, 2, 'missing whitespace around operator'),
+        Violation('E501', 2, 80, 'line too long (86 > 79 characters)')
+    ], [])
+    assert pep8_pyflakes_violations(text, _PATH, ignore=['E225'], max_line_length=100) == ([], [])
+
+
+def test_pep8_pyflakes_syntax_error():
+    pep8, pyflakes = pep8_pyflakes_violations('x = (\n', _PATH)
+
+    assert [v.code for v in pep8] == ['E901']
+    assert [(v.code, v.line) for v in pyflakes] == [('E999', 1)]
+
+
+def test_pep8_pyflakes_config():
+    config = pep8_pyflakes_config(['E501', 'E225'])
+
+    assert config['ignore'] == ['E225', 'E501']
+    assert config['max_line_length'] == 79
+    assert pep8_pyflakes_config(max_line_length=100)['max_line_length'] == 100
+
+
+_MODULE = '''\
+import os
+
+
+def foo(a):
+    x=1
+    return a
+
+
+def bar():
+    if True:
+        y = os.path
+    return y
+'''
+
+
+def _count_pyflakes(monkeypatch):
+    calls = []
+    check = analyzer._check_pyflakes
+
+    def counting_check(*args, **kwargs):
+        calls.append(args)
+        return check(*args, **kwargs)
+
+    monkeypatch.setattr(analyzer, '_check_pyflakes', counting_check)
+    return calls
+
+
+def test_line_diff():
+    diff = _LineDiff(['a\n', 'b\n', 'c\n', 'd\n'], ['a\n', 'x\n', 'y\n', 'c\n', 'd\n'])
+
+    assert diff.changes == [(1, 3)]
+    assert [diff.map_line(line) for line in range(1, 5)] == [1, None, 4, 5]
+
+
+@pytest.mark.parametrize('text', [
+    _MODULE.replace('x=1', 'x = 1'),
+    _MODULE.replace('import os\n', 'import os\nimport sys\n'),
+    _MODULE.replace('        y = os.path\n', '      y=os.path\n'),
+    _MODULE.replace('def bar', 'z=2\ndef bar'),
+    _MODULE.replace('    return y\n', ''),
+    _MODULE + 'import re\n',
+    'import os\n',
+    _MODULE.replace('return a', 'return (a'),
+    # Logical lines crossing the changed statement
+    _MODULE.replace('    x=1\n', '    x=1 + \\\n'),
+    _MODULE.replace('import os', 'import os)').replace('    return y', '    return (y'),
+])
+def test_analyzer_equals_full_check(text):
+    analyzer = Analyzer()
+    analyzer.pep8_pyflakes(_MODULE, _PATH)
+
+    assert analyzer.pep8_pyflakes(text, _PATH) == pep8_pyflakes_violations(text, _PATH)
+
+
+def test_analyzer_stateful_checks():
+    analyzer = Analyzer()
+    analyzer.pep8_pyflakes(_MODULE, _PATH)
+
+    # E402 depends on statements above the changed one
+    text = _MODULE + 'import re\nprint(re)\n'
+    pep8, _ = analyzer.pep8_pyflakes(text, _PATH)
+    assert 'E402' in [v.code for v in pep8]
+    assert (pep8, _) == pep8_pyflakes_violations(text, _PATH)
+
+
+def test_analyzer_same_text(monkeypatch):
+    analyzer = Analyzer()
+    results = analyzer.pep8_pyflakes(_MODULE, _PATH)
+
+    calls = _count_pyflakes(monkeypatch)
+    assert analyzer.pep8_pyflakes(_MODULE, _PATH) is results
+    assert not calls
+
+
+def test_analyzer_skips_pyflakes_for_insignificant_changes(monkeypatch):
+    analyzer = Analyzer()
+    analyzer.pep8_pyflakes(_MODULE, _PATH)
+
+    calls = _count_pyflakes(monkeypatch)
+    text = _MODULE.replace('return a', 'return a  # comment\n\n')
+    pep8, pyflakes = analyzer.pep8_pyflakes(text, _PATH)
+
+    assert not calls
+    assert (pep8, pyflakes) == pep8_pyflakes_violations(text, _PATH)
+
+    del calls[:]
+    analyzer.pep8_pyflakes(text.replace('x=1', 'z=1'), _PATH)
+    assert len(calls) == 1
+
+
+def test_analyzer_options_are_separated():
+    analyzer = Analyzer()
+    analyzer.pep8_pyflakes(_MODULE, _PATH)
+
+    pep8, _ = analyzer.pep8_pyflakes(_MODULE, _PATH, ignore=['E225'])
+    assert 'E225' not in [v.code for v in pep8]
+
+
+def test_flake8_pass_is_shared_by_project(monkeypatch, tmpdir):
+    monkeypatch.setattr(analyzer, '_Flake8', lambda arguments, root: (tuple(arguments), root))
+    monkeypatch.setattr(analyzer, '_flake8_passes', analyzer.OrderedDict())
+    monkeypatch.setattr(analyzer, 'find_project_root', lambda path: find_project_root(path, str(tmpdir)))
+
+    root = tmpdir.mkdir('project')
+    root.mkdir('.git')
+    root.mkdir('package')
+    config = root.join('setup.cfg')
+    config.write('[flake8]\n')
+
+    a = str(root.join('a.py'))
+    b = str(root.join('package', 'b.py'))
+
+    flake8 = analyzer._flake8(['--select=E'], a)
+    assert flake8 == (('--select=E',), str(root))
+    assert analyzer._flake8(['--select=E'], b) is flake8
+
+    # Modified configuration is loaded again
+    config.setmtime(config.mtime() - 10)
+    assert analyzer._flake8(['--select=E'], b) is not flake8
+
+
+def test_flake8_passes_are_limited(monkeypatch, tmpdir):
+    monkeypatch.setattr(analyzer, '_Flake8', lambda arguments, root: object())
+    monkeypatch.setattr(analyzer, '_flake8_passes', analyzer.OrderedDict())
+
+    path = str(tmpdir.join('a.py'))
+    for index in range(analyzer._FLAKE8_CAPACITY + 2):
+        analyzer._flake8(['--max-line-length={}'.format(index)], path)
+
+    assert len(analyzer._flake8_passes) == analyzer._FLAKE8_CAPACITY
@@ -0,0 +1,116 @@
+#!python3
+
+from blackmamba.ide.annotation import Annotation, AnnotationBatch, Style
+
+
+class StubEditor:
+    def __init__(self, path='/tmp/a.py'):
+        self.path = path
+        self.annotations = []
+
+    def get_path(self):
+        return self.path
+
+    def annotate_line(self, line, text, style, expanded, filename=None, scroll=False):
+        self.annotations.append((line, text, style, filename, scroll))
+
+
+class Deferred:
+    def __init__(self):
+        self.functions = []
+
+    def __call__(self, function):
+        self.functions.append(function)
+
+    def run(self):
+        while self.functions:
+            self.functions.pop(0)()
+
+
+def test_messages_are_merged():
+    editor = StubEditor()
+    batch = AnnotationBatch()
+    batch.extend([
+        Annotation(3, 'E225', Style.warning),
+        Annotation(1, 'E501', Style.warning),
+        Annotation(3, 'F821', Style.error),
+        Annotation(3, 'other file', Style.warning, 'b.py')
+    ])
+
+    assert len(batch) == 3
+    assert batch.flush(editor) == 0
+    assert editor.annotations == [
+        (1, 'E501', 'warning', None, True),
+        (3, 'E225,\nF821', 'error', None, False),
+        (3, 'other file', 'warning', 'b.py', False)
+    ]
+    assert len(batch) == 0
+
+
+def test_nearest_annotations_are_rendered_first():
+    editor = StubEditor()
+    deferred = Deferred()
+    batch = AnnotationBatch(limit=2, defer=deferred)
+    batch.extend(Annotation(line, str(line), Style.warning) for line in range(1, 8))
+
+    assert batch.flush(editor, line=4, scroll=False) == 5
+    assert [a[0] for a in editor.annotations] == [4, 3]
+
+    deferred.run()
+    assert [a[0] for a in editor.annotations] == [4, 3, 5, 2, 6, 1, 7]
+    assert not any(a[4] for a in editor.annotations)
+
+
+def test_deferred_annotations_are_cancelled():
+    editor = StubEditor()
+    deferred = Deferred()
+    batch = AnnotationBatch(limit=1, defer=deferred)
+    batch.extend(Annotation(line, str(line), Style.warning) for line in range(1, 4))
+
+    batch.flush(editor)
+    batch.cancel()
+    deferred.run()
+    assert [a[0] for a in editor.annotations] == [1]
+
+
+def test_newer_flush_cancels_deferred_annotations():
+    editor = StubEditor()
+    deferred = Deferred()
+    batch = AnnotationBatch(limit=1, defer=deferred)
+    batch.extend(Annotation(line, str(line), Style.warning) for line in range(1, 4))
+    batch.flush(editor)
+
+    batch.add(Annotation(10, '10', Style.warning))
+    batch.flush(editor)
+    deferred.run()
+    assert [a[0] for a in editor.annotations] == [1, 10]
+
+
+def test_deferred_annotations_of_closed_file_are_not_rendered():
+    editor = StubEditor()
+    deferred = Deferred()
+    batch = AnnotationBatch(limit=1, defer=deferred)
+    batch.extend(Annotation(line, str(line), Style.warning) for line in range(1, 4))
+    batch.flush(editor)
+
+    editor.path = '/tmp/b.py'
+    deferred.run()
+    assert [a[0] for a in editor.annotations] == [1]
+
+
+def test_generation_is_checked_before_every_deferred_annotation():
+    class CancellingEditor(StubEditor):
+        def annotate_line(self, *args, **kwargs):
+            super().annotate_line(*args, **kwargs)
+            if len(self.annotations) == 3:
+                # Annotations cleared while the deferred chunk is rendered
+                batch.cancel()
+
+    editor = CancellingEditor()
+    deferred = Deferred()
+    batch = AnnotationBatch(limit=2, defer=deferred)
+    batch.extend(Annotation(line, str(line), Style.warning) for line in range(1, 6))
+    batch.flush(editor)
+
+    deferred.run()
+    assert [a[0] for a in editor.annotations] == [1, 2, 3]
@@ -0,0 +1,146 @@
+#!python3
+
+import os
+import threading
+import time
+from blackmamba.ide.continuous_analysis import ContinuousAnalysis
+
+
+class FakeEditor:
+    def __init__(self, path, text):
+        self.path = path
+        self.text = text
+
+    def get_path(self):
+        return self.path
+
+    def get_text(self):
+        return self.text
+
+
+class Recorder:
+    def __init__(self):
+        self.analyzed = []
+        self.published = []
+
+    def analyze(self, path, text, token):
+        self.analyzed.append((path, text))
+        return text.upper()
+
+    def publish(self, path, results):
+        self.published.append((path, results))
+
+
+def _analysis(editor, recorder, delay=0.0):
+    return ContinuousAnalysis(editor, recorder.analyze, recorder.publish, delay=delay, interval=0.01)
+
+
+def test_changed_text_is_analyzed():
+    editor = FakeEditor('/tmp/a.py', 'x = 1')
+    recorder = Recorder()
+    analysis = _analysis(editor, recorder)
+
+    assert analysis.poll()
+    assert analysis.wait(5)
+    assert recorder.published == [('/tmp/a.py', 'X = 1')]
+
+    # Nothing was changed
+    assert not analysis.poll()
+
+    editor.text = 'x = 2'
+    assert analysis.poll()
+    assert analysis.wait(5)
+    assert recorder.published[-1] == ('/tmp/a.py', 'X = 2')
+
+
+def test_not_python_file_is_ignored():
+    recorder = Recorder()
+
+    assert not _analysis(FakeEditor('/tmp/a.txt', 'x'), recorder).poll()
+    assert not _analysis(FakeEditor(None, None), recorder).poll()
+    assert recorder.analyzed == []
+
+
+def test_saved_file_is_analyzed(tmpdir):
+    path = os.path.join(str(tmpdir), 'a.py')
+    with open(path, 'wt') as output:
+        output.write('x = 1')
+
+    editor = FakeEditor(path, 'x = 1')
+    recorder = Recorder()
+    analysis = _analysis(editor, recorder)
+
+    assert analysis.poll()
+    os.utime(path, (0, 0))
+    assert analysis.poll()
+
+
+def test_debounce_analyzes_latest_text_only():
+    editor = FakeEditor('/tmp/a.py', '')
+    recorder = Recorder()
+    analysis = _analysis(editor, recorder, delay=0.2)
+
+    for text in ('x', 'x =', 'x = 1'):
+        editor.text = text
+        analysis.poll()
+
+    assert analysis.wait(5)
+    assert recorder.analyzed == [('/tmp/a.py', 'x = 1')]
+    assert recorder.published == [('/tmp/a.py', 'X = 1')]
+
+
+def test_change_cancels_running_analysis():
+    editor = FakeEditor('/tmp/a.py', 'slow')
+    started = threading.Event()
+    published = []
+
+    def analyze(path, text, token):
+        if text == 'slow':
+            started.set()
+            while True:
+                token.check()
+                time.sleep(0.01)
+        return text
+
+    analysis = ContinuousAnalysis(editor, analyze, lambda path, results: published.append(results), delay=0.0)
+
+    analysis.poll()
+    assert started.wait(5)
+
+    editor.text = 'fast'
+    analysis.poll()
+    assert analysis.wait(5)
+    assert published == ['fast']
+
+
+def test_outdated_results_are_not_published():
+    editor = FakeEditor('/tmp/a.py', 'x = 1')
+    recorder = Recorder()
+
+    def analyze(path, text, token):
+        # Changed before the next poll
+        editor.text = 'x = 2'
+        return text
+
+    analysis = ContinuousAnalysis(editor, analyze, recorder.publish, delay=0.0)
+    analysis.poll()
+
+    assert analysis.wait(5)
+    assert recorder.published == []
+
+
+def test_start_stop():
+    editor = FakeEditor('/tmp/a.py', 'x = 1')
+    recorder = Recorder()
+    analysis = _analysis(editor, recorder)
+
+    analysis.start()
+    assert analysis.running
+
+    deadline = time.monotonic() + 5
+    while not recorder.published and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    analysis.stop()
+    assert not analysis.running
+    assert recorder.published == [('/tmp/a.py', 'X = 1')]
@@ -0,0 +1,99 @@
+#!python3
+
+import random
+import pytest
+from blackmamba.ide.edits import TextEdit, text_edits, apply_text
+
+
+class FakeEditor:
+    def __init__(self, text):
+        self.text = text
+        self.replacements = []
+
+    def get_text(self):
+        return self.text
+
+    def replace_text(self, start, end, replacement):
+        self.replacements.append((start, end, replacement))
+        self.text = self.text[:start] + replacement + self.text[end:]
+
+
+def _apply(old, edits):
+    for edit in reversed(edits):
+        old = old[:edit.start] + edit.text + old[edit.end:]
+    return old
+
+
+@pytest.mark.parametrize('old,new', [
+    ('', ''),
+    ('', 'a\n'),
+    ('a\n', ''),
+    ('a\nb\nc\n', 'a\nb\nc\n'),
+    ('a\nb\nc\n', 'a\nx\nc\n'),
+    ('a\nb\nc\n', 'a\nc\n'),
+    ('a\nb\nc\n', 'x\na\nb\nc\ny\n'),
+    ('a  \nb\t\nc\n', 'a\nb\nc\n'),
+    ('a\nb', 'a\nb\n'),
+    ('a\r\nb\r\n', 'a\nb\n'),
+])
+def test_text_edits(old, new):
+    edits = text_edits(old, new)
+
+    assert _apply(old, edits) == new
+    assert edits == sorted(edits)
+
+
+def test_text_edits_are_minimal():
+    assert text_edits('x = 1  \ny = 2\nz = 3 \n', 'x = 1\ny = 2\nz = 3\n') == [
+        TextEdit(5, 7, ''),
+        TextEdit(19, 20, '')
+    ]
+    assert text_edits('def foo():\n    pass\n', 'def bar():\n    pass\n') == [TextEdit(4, 7, 'bar')]
+
+
+def test_random_text_edits():
+    rnd = random.Random(0)
+    lines = ['import os\n', 'x = 1\n', '\n', 'def foo():\n', '    pass  \n', '# comment\n']
+
+    for _ in range(200):
+        old = ''.join(rnd.choice(lines) for _ in range(rnd.randint(0, 20)))
+        new = ''.join(rnd.choice(lines) for _ in range(rnd.randint(0, 20)))
+        assert _apply(old, text_edits(old, new)) == new
+
+
+def test_apply_text():
+    editor = FakeEditor('x = 1  \ny = 2\nz = 3 \n')
+
+    assert apply_text(editor, 'x = 1\ny = 2\nz = 3\n') == 2
+    assert editor.text == 'x = 1\ny = 2\nz = 3\n'
+    # Reverse offset order
+    assert editor.replacements == [(19, 20, ''), (5, 7, '')]
+
+
+def test_apply_text_range():
+    editor = FakeEditor('a\nb\nc\n')
+
+    assert apply_text(editor, 'a\nx\n', 0, len(editor.text) - 1) == 1
+    assert editor.text == 'a\nx\n\n'
+    assert editor.replacements == [(2, 5, 'x\n')]
+
+
+def test_apply_same_text():
+    editor = FakeEditor('a\nb\n')
+
+    assert apply_text(editor, 'a\nb\n') == 0
+    assert editor.replacements == []
+
+
+def test_apply_text_without_editor_text():
+    assert apply_text(FakeEditor(None), 'a') is None
+
+
+def test_apply_text_merges_edits():
+    old = ''.join('line {}  \n'.format(i) for i in range(10))
+    new = old.replace('  \n', '\n')
+    editor = FakeEditor(old)
+
+    assert apply_text(editor, new, max_edits=5) == 1
+    assert editor.text == new
+    assert editor.replacements == [(6, len(old) - 1, new[6:-1])]
@@ -0,0 +1,140 @@
+#!python3
+
+import os
+from blackmamba.ide.file_index import FileIndex
+
+
+_IGNORE_FOLDERS = {
+    '': ['.git'],
+    '.': ['Examples'],
+    'a': ['ignored']
+}
+
+
+_TREE = ['x.py', 'a/y.py', 'a/b/z.py', 'a/ignored/i.py', '.git/config',
+                 'Examples/e.py', 'c/Examples/ce.py']
+
+
+def _relative_files(index):
+    return sorted(
+        os.path.relpath(os.path.join(folder, name), index.root)
+        for folder, name in index.files()
+    )
+
+
+def _bump_mtime(path):
+    mtime = os.stat(path).st_mtime + 10
+    os.utime(path, (mtime, mtime))
+
+
+def test_refresh_respects_ignore_folders(tmpdir, make_tree):
+    make_tree(_TREE)
+
+    index = FileIndex(str(tmpdir), _IGNORE_FOLDERS)
+    assert index.refresh()
+    assert _relative_files(index) == ['a/b/z.py', 'a/y.py', 'c/Examples/ce.py', 'x.py']
+
+
+def test_refresh_without_changes(tmpdir, make_tree):
+    make_tree(_TREE)
+
+    index = FileIndex(str(tmpdir), _IGNORE_FOLDERS)
+    index.refresh()
+    assert not index.refresh()
+
+
+def test_refresh_rescans_changed_folders_only(tmpdir, write_file, make_tree):
+    make_tree(_TREE)
+
+    index = FileIndex(str(tmpdir), _IGNORE_FOLDERS)
+    index.refresh()
+
+    # Added behind index back, folder mtime reverted -> not visible
+    folder = os.path.join(str(tmpdir), 'a', 'b')
+    mtime = os.stat(folder).st_mtime
+    write_file(os.path.join(folder, 'hidden.py'))
+    os.utime(folder, (mtime, mtime))
+    assert not index.refresh()
+    assert 'a/b/hidden.py' not in _relative_files(index)
+
+    _bump_mtime(folder)
+    assert index.refresh()
+    assert 'a/b/hidden.py' in _relative_files(index)
+
+
+def test_refresh_removed_folder(tmpdir, make_tree):
+    make_tree(_TREE)
+
+    index = FileIndex(str(tmpdir), _IGNORE_FOLDERS)
+    index.refresh()
+
+    os.remove(os.path.join(str(tmpdir), 'a', 'b', 'z.py'))
+    os.rmdir(os.path.join(str(tmpdir), 'a', 'b'))
+    _bump_mtime(os.path.join(str(tmpdir), 'a'))
+
+    assert index.refresh()
+    assert _relative_files(index) == ['a/y.py', 'c/Examples/ce.py', 'x.py']
+
+
+def test_persistence(tmpdir, make_tree):
+    make_tree(_TREE, 'root')
+    root = os.path.join(str(tmpdir), 'root')
+    cache_path = os.path.join(str(tmpdir), 'index.json')
+
+    index = FileIndex(root, _IGNORE_FOLDERS, cache_path)
+    assert index.update()
+    assert not index.update()
+
+    loaded = FileIndex(root, _IGNORE_FOLDERS, cache_path)
+    assert loaded.load()
+    assert _relative_files(loaded) == _relative_files(index)
+
+    other = FileIndex(str(tmpdir), _IGNORE_FOLDERS, cache_path)
+    assert not other.load()
+
+
+def test_load_missing_cache(tmpdir):
+    index = FileIndex(str(tmpdir), cache_path=os.path.join(str(tmpdir), 'missing.json'))
+    assert not index.load()
+    assert index.is_empty
+
+
+def test_refresh_respects_patterns(tmpdir, write_file, make_tree):
+    make_tree(_TREE)
+
+    index = FileIndex(str(tmpdir), ['.git/', '/Examples/', 'ignored/', '*.md'])
+    write_file('a/readme.md')
+    assert index.refresh()
+    assert _relative_files(index) == ['a/b/z.py', 'a/y.py', 'c/Examples/ce.py', 'x.py']
+
+
+def test_refresh_respects_gitignore(tmpdir, make_tree):
+    make_tree(_TREE)
+    root = str(tmpdir)
+    tmpdir.join('.gitignore').write('b/\n')
+
+    index = FileIndex(root, _IGNORE_FOLDERS, gitignore=True)
+    index.refresh()
+    assert 'a/b/z.py' not in _relative_files(index)
+
+    # .gitignore modification doesn't change folder mtime
+    tmpdir.join('.gitignore').write('c/\n')
+    mtime = os.stat(os.path.join(root, '.gitignore')).st_mtime + 10
+    os.utime(os.path.join(root, '.gitignore'), (mtime, mtime))
+
+    assert index.refresh()
+    files = _relative_files(index)
+    assert 'a/b/z.py' in files
+    assert 'c/Examples/ce.py' not in files
+
+
+def test_gitignore_is_indexed(tmpdir, make_tree):
+    make_tree(_TREE)
+    tmpdir.join('.gitignore').write('b/\n')
+
+    index = FileIndex(str(tmpdir), _IGNORE_FOLDERS)
+    index.refresh()
+
+    assert 'a/b/z.py' in _relative_files(index)
+    assert index.gitignore_rules(str(tmpdir)).match('b', True)
+    assert index.gitignore_rules(os.path.join(str(tmpdir), 'a')) is None
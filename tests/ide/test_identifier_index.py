@@ -0,0 +1,84 @@
+#!python3
+
+import os
+import pytest
+from blackmamba.ide.identifier_index import IdentifierIndex, identifiers, get_identifier_index
+
+
+@pytest.fixture
+def files(write_file):
+    return [
+        write_file('a.py', 'def foo():\n    return bar_2\n'),
+        write_file('b.py', 'from a import foo\nfoo()\n'),
+        write_file('c.py', '# foobar\nx = "foo"\n'),
+        write_file('d.py', 'x = 1\n')
+    ]
+
+
+def test_identifiers():
+    assert identifiers('a.b_c(1, d2) # ěšč 3x\n') == {'a', 'b_c', 'd2', 'ěšč', 'x'}
+
+
+def test_files(files):
+    index = IdentifierIndex()
+
+    assert index.update(files)
+    assert index.files('foo') == files[:3]
+    assert index.files('bar_2') == files[:1]
+    assert index.files('fo') == []
+
+
+def test_update(files, write_file):
+    index = IdentifierIndex()
+    index.update(files)
+
+    assert not index.update(files)
+
+    write_file('d.py', 'foo = 1\n')
+    os.utime(files[3], (0, 0))
+    assert index.update(files)
+    assert index.files('foo') == files
+
+    assert index.update(files[1:])
+    assert len(index) == 3
+    assert index.files('bar_2') == []
+
+
+def test_get_identifier_index():
+    index = get_identifier_index('/tmp/project')
+
+    assert get_identifier_index('/tmp/project') is index
+    assert get_identifier_index('/tmp/other') is not index
+
+
+def test_candidates_rename_equals_project_rename(tmpdir, write_file):
+    pytest.importorskip('rope.base.project')
+    from rope.base.project import Project
+    from rope.base import libutils
+    from rope.refactor.rename import Rename
+
+    files = [
+        write_file('a.py', 'def foo():\n    return 1\n'),
+        write_file('b.py', 'from a import foo\n\n\nprint(foo())\n'),
+        write_file('c.py', 'import a\n\na.foo()\n'),
+        write_file('d.py', 'def bar():\n    pass\n')
+    ]
+    index = IdentifierIndex()
+    index.update(files)
+
+    project = Project(str(tmpdir), ropefolder=None)
+    try:
+        resource = libutils.path_to_resource(project, files[0])
+        renamer = Rename(project, resource, 4)
+        candidates = [libutils.path_to_resource(project, path) for path in index.files(renamer.get_old_name())]
+
+        def changes(change_set):
+            return {change.resource.path: change.new_contents for change in change_set.changes}
+
+        assert len(candidates) == 3
+        assert (
+            changes(renamer.get_changes('baz', docs=True, resources=candidates)) ==
+            changes(renamer.get_changes('baz', docs=True))
+        )
+    finally:
+        project.close()
@@ -0,0 +1,98 @@
+#!python3
+
+import os
+import pytest
+from blackmamba.ide.ignore import IgnoreRules, IgnoreFilter, ignore_patterns
+
+
+@pytest.mark.parametrize('pattern,path,is_folder,expected', [
+    ('node_modules/', 'node_modules', True, True),
+    ('node_modules/', 'a/b/node_modules', True, True),
+    ('node_modules/', 'node_modules', False, None),
+    ('*.pyc', 'a/x.pyc', False, True),
+    ('*.pyc', 'a/x.py', False, None),
+    ('/build', 'build', True, True),
+    ('/build', 'a/build', True, None),
+    ('doc/*.md', 'doc/a.md', False, True),
+    ('doc/*.md', 'doc/x/a.md', False, None),
+    ('doc/*.md', 'x/doc/a.md', False, None),
+    ('**/doc/*.md', 'x/doc/a.md', False, True),
+    ('a/**/b', 'a/b', True, True),
+    ('a/**/b', 'a/x/y/b', True, True),
+    ('a/**', 'a/x/y', False, True),
+    ('a/**', 'a', True, None),
+    ('x?.txt', 'x1.txt', False, True),
+    ('x?.txt', 'x/.txt', False, None),
+    ('[ab].txt', 'b.txt', False, True),
+    ('[!ab].txt', 'b.txt', False, None),
+    ('[!ab].txt', 'c.txt', False, True),
+    ('\\#x', '#x', False, True),
+    ('# comment', '# comment', False, None),
+])
+def test_match(pattern, path, is_folder, expected):
+    assert IgnoreRules([pattern]).match(path, is_folder) is expected
+
+
+def test_last_pattern_wins():
+    rules = IgnoreRules(['*.log', '!keep.log', 'x/keep.log'])
+
+    assert rules.match('a.log') is True
+    assert rules.match('keep.log') is False
+    assert rules.match('x/keep.log') is True
+
+
+def test_empty_rules():
+    rules = IgnoreRules(['', '  ', '# comment'])
+
+    assert not rules
+    assert rules.folders_only
+    assert rules.match('x') is None
+
+
+def test_legacy_patterns():
+    patterns = ignore_patterns({'': ['.git'], '.': ['Examples'], 'a': ['stash'], 'root': ['x']}, '/tmp/root')
+
+    assert sorted(patterns) == sorted([
+        '.git/', '/Examples/', '**/a/stash/', '/x/', '**/root/x/'
+    ])
+    assert ignore_patterns(['*.pyc']) == ['*.pyc']
+    assert ignore_patterns(None) == []
+
+
+def test_legacy_patterns_are_escaped():
+    rules = IgnoreRules(ignore_patterns({'': ['a*[1]']}))
+
+    assert rules.match('a*[1]', True)
+    assert rules.match('ab1', True) is None
+
+
+def test_filter():
+    root = os.path.join(os.sep, 'root')
+    ignore_filter = IgnoreFilter(root, {'': ['.git'], '.': ['Examples'], 'a': ['stash']}, ignore_hidden=True)
+
+    assert ignore_filter(root, ['.git', '.hidden', 'Examples', 'a', 'stash']) == ['a', 'stash']
+    assert ignore_filter.folders(os.path.join(root, 'a'), ['Examples', 'stash', 'b']) == ['Examples', 'b']
+    assert ignore_filter.files(root, ['.git', 'Examples']) == ['.git', 'Examples']
+
+
+def test_filter_files():
+    root = os.path.join(os.sep, 'root')
+    ignore_filter = IgnoreFilter(root, ['*.pyc', '/a/*.txt'])
+
+    assert ignore_filter.files(root, ['x.py', 'x.pyc', 'x.txt']) == ['x.py', 'x.txt']
+    assert ignore_filter.files(os.path.join(root, 'a'), ['x.py', 'x.pyc', 'x.txt']) == ['x.py']
+
+
+def test_filter_gitignore():
+    root = os.path.join(os.sep, 'root')
+    a = os.path.join(root, 'a')
+    rules = {
+        root: IgnoreRules(['build/', '*.log']),
+        a: IgnoreRules(['!keep.log', '/local/'])
+    }
+    ignore_filter = IgnoreFilter(root, gitignore=rules.get)
+
+    assert ignore_filter(root, ['build', 'local', 'a']) == ['local', 'a']
+    assert ignore_filter(a, ['build', 'local', 'b']) == ['b']
+    assert ignore_filter.files(a, ['x.log', 'keep.log']) == ['keep.log']
+    assert ignore_filter.files(os.path.join(a, 'b'), ['x.log', 'keep.log']) == ['keep.log']
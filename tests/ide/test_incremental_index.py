@@ -0,0 +1,49 @@
+#!python3
+
+import os
+from blackmamba.ide.incremental_index import IncrementalIndex
+
+
+class Parser:
+    def __init__(self):
+        self.parsed = []
+
+    def __call__(self, data):
+        self.parsed.append(data)
+        return data.decode('utf-8').upper()
+
+
+def _bump_mtime(path):
+    mtime = os.stat(path).st_mtime + 10
+    os.utime(path, (mtime, mtime))
+
+
+def test_update(tmpdir):
+    a = tmpdir.join('a.txt')
+    a.write('a')
+    b = tmpdir.join('b.txt')
+    b.write('b')
+    paths = [str(a), str(b)]
+
+    parse = Parser()
+    index = IncrementalIndex(parse)
+
+    assert index.update(paths)
+    assert {path: entry.value for path, entry in index.entries.items()} == {str(a): 'A', str(b): 'B'}
+    assert not index.update(paths)
+    assert len(parse.parsed) == 2
+
+    # Modification time changed, content not
+    _bump_mtime(str(a))
+    assert index.update(paths)
+    assert len(parse.parsed) == 2
+    assert index.entries[str(a)].value == 'A'
+
+    b.write('bb')
+    _bump_mtime(str(b))
+    assert index.update(paths)
+    assert parse.parsed[2:] == [b'bb']
+    assert index.entries[str(b)].value == 'BB'
+
+    assert index.update(paths[:1] + [str(tmpdir.join('missing.txt'))])
+    assert list(index.entries) == [str(a)]
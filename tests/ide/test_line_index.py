@@ -0,0 +1,47 @@
+#!python3
+
+import pytest
+from blackmamba.ide.line_index import LineIndex, get_line_index
+
+
+_TEXTS = ['', '\n', 'a', 'a\n', 'abc\ndef', 'abc\n\ndef\n', '\n\nabc\n  def\n\n']
+
+
+def _line_offset(text, line_number):
+    # Previous implementation of the source.scroll_to_line
+    start = 0
+    for index, line in enumerate(text.splitlines(True)):
+        if index == line_number - 1:
+            return start
+        start += len(line)
+    return start
+
+
+@pytest.mark.parametrize('text', _TEXTS)
+def test_line_count(text):
+    assert LineIndex(text).line_count == len(text.splitlines())
+
+
+@pytest.mark.parametrize('text', _TEXTS)
+def test_line_number_and_column(text):
+    index = LineIndex(text)
+
+    for offset in range(len(text) + 1):
+        line_start = text.rfind('\n', 0, offset) + 1
+        assert index.line_number(offset) == text.count('\n', 0, offset) + 1
+        assert index.column_index(offset) == offset - line_start
+
+
+@pytest.mark.parametrize('text', _TEXTS)
+def test_line_offset(text):
+    index = LineIndex(text)
+
+    for line_number in range(-1, len(text.splitlines()) + 3):
+        assert index.line_offset(line_number) == _line_offset(text, line_number)
+
+
+def test_get_line_index_reuses_index():
+    index = get_line_index('abc\ndef')
+
+    assert get_line_index('abc\n' + 'def') is index
+    assert get_line_index('abc\ndef\n') is not index
@@ -0,0 +1,123 @@
+#!python3
+
+import ast
+import pytest
+from blackmamba.ide.outline import OutlineCache, NodeKind, Node, comment_nodes, split_blocks
+import blackmamba.ide.outline as outline
+
+
+_SOURCE = '''\
+import os
+
+# TODO: module todo
+
+
+def main():
+    def nested():
+        pass
+
+
+@decorator
+@decorator(1)
+class Foo:
+    # [FIXME] fix me
+    def method(self):
+        pass
+
+    class Bar:
+        async def run(self):
+            pass
+
+
+if __name__ == '__main__':
+    main()
+'''
+
+
+def _full_outline(text):
+    return sorted(outline._ast_nodes(ast.parse(text)) + comment_nodes(text.splitlines()), key=lambda x: x.line)
+
+
+def _count_parses(monkeypatch):
+    calls = []
+    parse = ast.parse
+
+    def counting_parse(source, *args, **kwargs):
+        calls.append(source)
+        return parse(source, *args, **kwargs)
+
+    monkeypatch.setattr(outline.ast, 'parse', counting_parse)
+    return calls
+
+
+def test_split_blocks():
+    blocks = split_blocks(_SOURCE)
+
+    assert [line for line, _ in blocks] == [0, 5, 10]
+    assert blocks[2][1].startswith('@decorator\n@decorator(1)\nclass Foo:')
+    assert ''.join(block for _, block in blocks) == _SOURCE
+
+
+def test_outline():
+    nodes = OutlineCache().outline(_SOURCE)
+
+    assert nodes == _full_outline(_SOURCE)
+    assert nodes[0] == Node(NodeKind.todo, 'module todo', 3, 0, 0, ())
+    assert Node(NodeKind.cls, 'Foo', 13, 0, 0, ()) in nodes
+    assert Node(NodeKind.function, 'run', 19, 8, 2, ('Foo', 'Bar')) in nodes
+    assert [n.name for n in nodes] == ['module todo', 'main', 'nested', 'Foo', 'fix me', 'method', 'Bar', 'run']
+
+
+def test_comment_nodes():
+    lines = ['# todo', 'x = 1  # FIXME: later', 'TODO = 1', '#[todo]: later']
+
+    assert comment_nodes(lines) == [
+        Node(NodeKind.todo, 'TODO', 1, 0, 0, ()),
+        Node(NodeKind.fixme, 'later', 2, 0, 0, ()),
+        Node(NodeKind.todo, 'later', 4, 0, 0, ())
+    ]
+
+
+def test_same_text_is_not_parsed_again(monkeypatch):
+    cache = OutlineCache()
+    nodes = cache.outline(_SOURCE, 'a.py')
+
+    calls = _count_parses(monkeypatch)
+    assert cache.outline(_SOURCE, 'a.py') is nodes
+    assert not calls
+
+
+def test_changed_block_is_parsed_only(monkeypatch):
+    cache = OutlineCache()
+    cache.outline(_SOURCE, 'a.py')
+
+    text = _SOURCE.replace('    def nested():\n        pass\n', '    x = 1\n\n    def nested():\n        pass\n')
+    calls = _count_parses(monkeypatch)
+    nodes = cache.outline(text, 'a.py')
+
+    assert len(calls) == 1
+    assert calls[0].startswith('def main():')
+    assert nodes == _full_outline(text)
+    assert Node(NodeKind.cls, 'Foo', 15, 0, 0, ()) in nodes
+
+
+def test_def_in_multiline_string_fallback():
+    text = 'TEXT = """\ndef foo():\n"""\n\n\ndef bar():\n    pass\n'
+    nodes = OutlineCache().outline(text)
+
+    assert nodes == [Node(NodeKind.function, 'bar', 6, 0, 0, ())]
+
+
+def test_syntax_error():
+    with pytest.raises(SyntaxError):
+        OutlineCache().outline('def foo(:\n    pass\n')
+
+
+def test_capacity():
+    cache = OutlineCache(capacity=2)
+    cache.outline(_SOURCE, 'a.py')
+    cache.outline(_SOURCE, 'b.py')
+    cache.outline(_SOURCE, 'a.py')
+    cache.outline(_SOURCE, 'c.py')
+
+    assert list(cache._files) == ['a.py', 'c.py']
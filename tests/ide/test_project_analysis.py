@@ -0,0 +1,108 @@
+#!python3
+
+import os
+import pytest
+from blackmamba.ide.analyzer import Violation
+from blackmamba.ide.project_analysis import analyze_files
+from blackmamba.ide.result_cache import ResultCache
+
+
+@pytest.fixture
+def files(write_file):
+    return [
+        write_file('a.py', 'x=1\n'),
+        write_file('b.py', 'x = 1\n'),
+        write_file('c.py', 'y=2\n')
+    ]
+
+
+class Analyzer:
+    def __init__(self):
+        self.analyzed = []
+
+    def __call__(self, text, path):
+        self.analyzed.append(path)
+        if '=' in text and ' = ' not in text:
+            return [Violation('E225', 1, 2, 'missing whitespace around operator')]
+        return []
+
+
+def _config(path):
+    return {'max_line_length': 79}
+
+
+def test_analyze_files(files):
+    analyzer = Analyzer()
+    results = dict(analyze_files(files, analyzer, _config))
+
+    assert sorted(analyzer.analyzed) == files
+    assert results == {
+        files[0]: [Violation('E225', 1, 2, 'missing whitespace around operator')],
+        files[1]: [],
+        files[2]: [Violation('E225', 1, 2, 'missing whitespace around operator')]
+    }
+
+
+def test_unchanged_files_are_cached(files, write_file):
+    cache = ResultCache()
+    analyzer = Analyzer()
+    expected = dict(analyze_files(files, analyzer, _config, cache))
+
+    write_file('a.py', 'z = 3\n')
+    expected[files[0]] = []
+
+    analyzer = Analyzer()
+    assert dict(analyze_files(files, analyzer, _config, cache)) == expected
+    assert analyzer.analyzed == [files[0]]
+
+
+def test_results_are_content_addressed(files, write_file):
+    cache = ResultCache()
+    list(analyze_files(files[:2], Analyzer(), _config, cache))
+
+    # Same content as b.py
+    path = write_file('d.py', 'x = 1\n')
+    analyzer = Analyzer()
+    assert list(analyze_files([path], analyzer, _config, cache)) == [(path, [])]
+    assert analyzer.analyzed == []
+
+
+def test_changed_config_is_not_cached(files):
+    cache = ResultCache()
+    list(analyze_files(files, Analyzer(), _config, cache))
+
+    analyzer = Analyzer()
+    list(analyze_files(files, analyzer, lambda path: {'max_line_length': 100}, cache))
+    assert sorted(analyzer.analyzed) == files
+
+
+def test_config_is_computed_once_per_project(files):
+    calls = []
+
+    def config(path):
+        calls.append(path)
+        return _config(path)
+
+    list(analyze_files(files, Analyzer(), config))
+    assert len(calls) == 1
+
+
+def test_failures_are_skipped(files):
+    def analyze(text, path):
+        if path == files[1]:
+            raise ValueError()
+        return []
+
+    paths = files + [os.path.join(os.path.dirname(files[0]), 'missing.py')]
+    assert sorted(path for path, _ in analyze_files(paths, analyze, _config)) == [files[0], files[2]]
+
+
+def test_cancel(files):
+    class Cancelled(Exception):
+        pass
+
+    def check():
+        raise Cancelled()
+
+    with pytest.raises(Cancelled):
+        list(analyze_files(files, Analyzer(), _config, check=check))
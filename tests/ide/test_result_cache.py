@@ -0,0 +1,78 @@
+#!python3
+
+import os
+from blackmamba.ide.result_cache import ResultCache, result_key
+
+
+def test_result_key():
+    key = result_key('x = 1\n', {'ignore': ['E501'], 'max_line_length': 79})
+
+    assert key == result_key('x = 1\n', {'max_line_length': 79, 'ignore': ['E501']})
+    assert key != result_key('x = 2\n', {'ignore': ['E501'], 'max_line_length': 79})
+    assert key != result_key('x = 1\n', {'ignore': ['E501'], 'max_line_length': 80})
+
+
+def test_get_set():
+    cache = ResultCache()
+
+    assert cache.get('a') is None
+    cache.set('a', [[1, 'E225 missing whitespace around operator', 'PEP8', 'warning']])
+    assert cache.get('a') == [[1, 'E225 missing whitespace around operator', 'PEP8', 'warning']]
+    cache.set('b', [])
+    assert cache.get('b') == []
+
+
+def test_capacity():
+    cache = ResultCache(capacity=2)
+    cache.set('a', [])
+    cache.set('b', [])
+    cache.get('a')
+    cache.set('c', [])
+
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert cache.get('a') == []
+    assert cache.get('c') == []
+
+
+def test_max_size():
+    cache = ResultCache(max_size=20)
+    cache.set('a', ['x' * 5])
+    cache.set('b', ['x' * 5])
+
+    assert len(cache) == 2
+    cache.set('c', ['x' * 5])
+    assert len(cache) == 2
+    assert cache.get('a') is None
+
+    cache.set('d', ['x' * 30])
+    assert len(cache) == 0
+
+
+def test_persistence(tmpdir):
+    cache_path = os.path.join(str(tmpdir), 'results.json')
+
+    cache = ResultCache(cache_path, capacity=2)
+    cache.set('a', [[1, 'text', 'PEP8', 'warning']])
+    cache.set('b', [])
+    cache.get('a')
+    cache.save()
+
+    cache = ResultCache(cache_path, capacity=2)
+    assert cache.load()
+    assert cache.get('a') == [[1, 'text', 'PEP8', 'warning']]
+    cache.set('c', [])
+    # b was the least recently used one
+    assert cache.get('b') is None
+
+
+def test_load_invalid(tmpdir):
+    cache_path = os.path.join(str(tmpdir), 'results.json')
+
+    assert not ResultCache(cache_path).load()
+    with open(cache_path, 'wt') as output:
+        output.write('{"version": 0, "results": []}')
+    assert not ResultCache(cache_path).load()
+    with open(cache_path, 'wt') as output:
+        output.write('{')
+    assert not ResultCache(cache_path).load()
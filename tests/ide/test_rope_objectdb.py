@@ -0,0 +1,257 @@
+#!python3
+
+import os
+import sqlite3
+import pytest
+
+pytest.importorskip('rope.base.oi.objectdb')
+
+from rope.base.oi.objectdb import ObjectDB  # noqa: E402
+from blackmamba.ide.rope_objectdb import FileInfo, ScopeInfo, SqliteDB, install_objectdb  # noqa: E402
+
+
+class Validation:
+    def is_value_valid(self, value):
+        return True
+
+    def is_more_valid(self, new, old):
+        return True
+
+    def is_file_valid(self, path):
+        return True
+
+    def is_scope_valid(self, path, key):
+        return True
+
+
+def _open(db_path, **kwargs):
+    db = SqliteDB(db_path, **kwargs)
+    return db, ObjectDB(db, Validation())
+
+
+@pytest.fixture
+def db_path(tmpdir):
+    return str(tmpdir.join('objectdb.sqlite'))
+
+
+def test_persisted(db_path):
+    db, object_db = _open(db_path)
+    object_db.add_callinfo('a.py', 'f', (('builtin', 'int'),), ('builtin', 'str'))
+    object_db.add_pername('a.py', 'f', 'x', ('defined', 'a.py', 'A'))
+    object_db.write()
+
+    db, object_db = _open(db_path)
+    assert list(object_db.get_files()) == ['a.py']
+    assert object_db.get_returned('a.py', 'f', (('builtin', 'int'),)) == ('builtin', 'str')
+    assert object_db.get_pername('a.py', 'f', 'x') == ('defined', 'a.py', 'A')
+    assert object_db.get_returned('a.py', 'g', ()) is None
+    assert object_db.get_returned('b.py', 'f', ()) is None
+
+
+def test_scopes_are_loaded_lazily(db_path):
+    db, object_db = _open(db_path)
+    for path in ('a.py', 'b.py'):
+        for key in ('f', 'g'):
+            object_db.add_pername(path, key, 'x', ('builtin', 'int'))
+    object_db.write()
+
+    db, object_db = _open(db_path)
+    assert 'a.py' in db
+    assert not db._files
+
+    object_db.get_pername('a.py', 'f', 'x')
+    assert list(db._files) == ['a.py']
+    assert isinstance(db['a.py']._scopes['g'], bytes)
+
+
+def test_only_changes_are_written(db_path):
+    db, object_db = _open(db_path)
+    object_db.add_pername('a.py', 'f', 'x', ('builtin', 'int'))
+    object_db.add_pername('a.py', 'g', 'x', ('builtin', 'int'))
+    object_db.write()
+
+    db, object_db = _open(db_path)
+    object_db.get_pername('a.py', 'f', 'x')
+    assert db['a.py'].changes() == []
+
+    object_db.add_pername('a.py', 'g', 'y', ('builtin', 'str'))
+    del db['a.py']['f']
+    changes = db['a.py'].changes()
+    assert sorted(key for key, _ in changes) == ['f', 'g']
+    assert dict(changes)['f'] is None
+
+    object_db.write()
+    assert db['a.py'].changes() == []
+
+    db, object_db = _open(db_path)
+    assert list(db['a.py']) == ['g']
+    assert object_db.get_pername('a.py', 'g', 'x') == ('builtin', 'int')
+    assert object_db.get_pername('a.py', 'g', 'y') == ('builtin', 'str')
+
+
+def test_set_items(db_path):
+    db, object_db = _open(db_path)
+    file_info = FileInfo()
+    file_info['f'] = ScopeInfo(per_name={'x': ('builtin', 'int')})
+    db['a.py'] = file_info
+    object_db.write()
+
+    db, object_db = _open(db_path)
+    assert object_db.get_pername('a.py', 'f', 'x') == ('builtin', 'int')
+
+
+def test_removed_and_renamed_files(db_path):
+    db, object_db = _open(db_path)
+    object_db.add_pername('a.py', 'f', 'x', ('builtin', 'int'))
+    object_db.add_pername('b.py', 'f', 'x', ('builtin', 'str'))
+    object_db.write()
+
+    db, object_db = _open(db_path)
+    object_db.file_moved('a.py', 'c.py')
+    del db['b.py']
+    object_db.add_pername('b.py', 'g', 'y', ('builtin', 'list'))
+    object_db.write()
+
+    db, object_db = _open(db_path)
+    assert sorted(object_db.get_files()) == ['b.py', 'c.py']
+    assert object_db.get_pername('c.py', 'f', 'x') == ('builtin', 'int')
+    assert list(db['b.py']) == ['g']
+
+
+def test_outdated_version_is_dropped(db_path):
+    db, object_db = _open(db_path)
+    object_db.add_pername('a.py', 'f', 'x', ('builtin', 'int'))
+    object_db.write()
+
+    connection = sqlite3.connect(db_path)
+    connection.execute('PRAGMA user_version = 0')
+    connection.close()
+
+    db, object_db = _open(db_path)
+    assert len(db) == 0
+
+
+def test_corrupted_database_is_replaced(db_path):
+    with open(db_path, 'wb') as output:
+        output.write(b'garbage' * 1000)
+
+    db, object_db = _open(db_path)
+    assert len(db) == 0
+    object_db.add_pername('a.py', 'f', 'x', ('builtin', 'int'))
+    object_db.write()
+
+    db, object_db = _open(db_path)
+    assert object_db.get_pername('a.py', 'f', 'x') == ('builtin', 'int')
+
+
+def test_compacted_in_background(db_path):
+    db, object_db = _open(db_path, compact_pages=16)
+    for index in range(200):
+        object_db.add_pername('{}.py'.format(index), 'f', 'x', ('defined', 'x' * 1000))
+    object_db.write()
+    db.wait()
+    size = os.path.getsize(db_path)
+
+    for index in range(190):
+        del db['{}.py'.format(index)]
+    object_db.write()
+
+    assert db.wait(10)
+    assert os.path.getsize(db_path) < size / 4
+    assert len(db) == 10
+
+
+def test_written_while_compacted(db_path):
+    db, object_db = _open(db_path, compact_pages=16)
+    for index in range(200):
+        object_db.add_pername('{}.py'.format(index), 'f', 'x', ('defined', 'x' * 1000))
+    object_db.write()
+    db.wait()
+
+    for index in range(190):
+        del db['{}.py'.format(index)]
+    object_db.write()
+
+    object_db.add_pername('a.py', 'f', 'x', ('builtin', 'int'))
+    object_db.write()
+    assert db.wait(10)
+
+    db, object_db = _open(db_path)
+    assert len(db) == 11
+    assert object_db.get_pername('a.py', 'f', 'x') == ('builtin', 'int')
+
+
+def test_project_starts_warm(tmpdir, db_path):
+    pytest.importorskip('rope.base.project')
+    from rope.base import libutils
+    from rope.base.project import Project
+
+    root = tmpdir.mkdir('project')
+    root.join('a.py').write('def f():\n    return 1\n\n\ndef g():\n    return f()\n')
+
+    project = Project(str(root), ropefolder=None)
+    install_objectdb(project, db_path)
+    libutils.analyze_module(project, project.get_resource('a.py'))
+    files = list(project.pycore.object_info.objectdb.get_files())
+    project.close()
+    assert files
+
+    project = Project(str(root), ropefolder=None)
+    db = install_objectdb(project, db_path)
+    try:
+        assert list(project.pycore.object_info.objectdb.get_files()) == files
+        assert not db._files
+    finally:
+        project.close()
+
+    root.join('a.py').remove()
+    project = Project(str(root), ropefolder=None)
+    db = install_objectdb(project, db_path)
+    try:
+        assert len(db) == 0
+    finally:
+        project.close()
+
+
+def test_modified_files_are_validated(tmpdir, db_path):
+    pytest.importorskip('rope.base.project')
+    from rope.base import libutils
+    from rope.base.project import Project
+
+    root = tmpdir.mkdir('project')
+    source = root.join('a.py')
+    source.write('def f():\n    return 1\n\n\ndef g():\n    return f()\n')
+
+    def analyze():
+        project = Project(str(root), ropefolder=None)
+        db = install_objectdb(project, db_path)
+        libutils.analyze_module(project, project.get_resource('a.py'))
+        assert list(db['a.py']) == ['f']
+        return project, db
+
+    def modify():
+        source.write('def h():\n    return 1\n')
+        mtime = os.path.getmtime(db_path) + 10
+        os.utime(str(source), (mtime, mtime))
+
+    # Modified between sessions
+    project, db = analyze()
+    project.close()
+    modify()
+
+    project = Project(str(root), ropefolder=None)
+    db = install_objectdb(project, db_path)
+    try:
+        assert list(db['a.py']) == []
+    finally:
+        project.close()
+
+    # Modified in the session
+    source.write('def f():\n    return 1\n\n\ndef g():\n    return f()\n')
+    project, db = analyze()
+    try:
+        modify()
+        project.validate()
+        assert list(db['a.py']) == []
+    finally:
+        project.close()
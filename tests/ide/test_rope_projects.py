@@ -0,0 +1,115 @@
+#!python3
+
+import os
+import pytest
+from blackmamba.ide.rope_projects import ProjectRegistry
+
+
+class FakeProject:
+    def __init__(self, root):
+        self.address = root
+        self.validated = 0
+        self.closed = False
+
+    def validate(self):
+        self.validated += 1
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def projects(tmpdir, write_file):
+    roots = []
+    for name in ('a', 'b', 'c'):
+        root = tmpdir.mkdir(name)
+        root.mkdir('.git')
+        roots.append(write_file(root.join('module.py'), 'x = 1\n'))
+    return roots
+
+
+def test_project_is_reused(projects):
+    registry = ProjectRegistry(project_factory=FakeProject)
+    project = registry.project(projects[0])
+
+    assert project.address == os.path.dirname(projects[0])
+    assert project.validated == 0
+    assert registry.project(projects[0]) is project
+    assert project.validated == 1
+
+
+def test_least_recently_used_project_is_closed(projects):
+    registry = ProjectRegistry(capacity=2, project_factory=FakeProject)
+    a = registry.project(projects[0])
+    b = registry.project(projects[1])
+    registry.project(projects[0])
+    registry.project(projects[2])
+
+    assert len(registry) == 2
+    assert b.closed
+    assert not a.closed
+    assert registry.project(projects[1]) is not b
+
+
+def test_discard(projects):
+    registry = ProjectRegistry(project_factory=FakeProject)
+    project = registry.project(projects[0])
+    registry.discard(project)
+
+    assert project.closed
+    assert len(registry) == 0
+
+
+def test_close(projects):
+    registry = ProjectRegistry(project_factory=FakeProject)
+    projects = [registry.project(path) for path in projects]
+    registry.close()
+
+    assert all(project.closed for project in projects)
+    assert len(registry) == 0
+
+
+def test_open_discards_project_on_failure(projects):
+    pytest.importorskip('rope.base.exceptions')
+    from rope.base.exceptions import RopeError
+
+    registry = ProjectRegistry(project_factory=FakeProject)
+
+    with pytest.raises(RopeError):
+        with registry.open(projects[0]):
+            raise RopeError()
+    assert len(registry) == 1
+
+    with pytest.raises(ValueError):
+        with registry.open(projects[0]) as project:
+            raise ValueError()
+    assert project.closed
+    assert len(registry) == 0
+
+
+def test_modified_module_is_analyzed_again(monkeypatch, tmpdir, write_file):
+    pytest.importorskip('rope.base.project')
+    from rope.base import libutils
+
+    # Object database is not written into the caches folder
+    monkeypatch.setattr('blackmamba.ide.rope_projects.get_cache_path', lambda name: str(tmpdir.join(name)))
+
+    root = tmpdir.mkdir('project')
+    root.mkdir('.git')
+    a = write_file(root.join('a.py'), 'x = 1\n')
+    b = write_file(root.join('b.py'), 'y = 2\n')
+
+    registry = ProjectRegistry()
+    try:
+        project = registry.project(a)
+        a_module = project.get_pymodule(libutils.path_to_resource(project, a))
+        b_module = project.get_pymodule(libutils.path_to_resource(project, b))
+
+        write_file(root.join('a.py'), 'x = 10\nz = 3\n')
+        os.utime(a, (0, 0))
+
+        assert registry.project(a) is project
+        assert project.get_pymodule(libutils.path_to_resource(project, a)) is not a_module
+        assert project.get_pymodule(libutils.path_to_resource(project, b)) is b_module
+    finally:
+        registry.close()
@@ -0,0 +1,156 @@
+#!python3
+
+import os
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from blackmamba.ide.symbol import SymbolIndex, Symbol, SymbolKind, parse_symbols
+import blackmamba.ide.symbol as symbol
+
+
+_SOURCE = '''\
+import os
+
+VERSION = '1.0'
+a, (b, c) = 1, (2, 3)
+x: int = 1
+
+
+def main():
+    local = 1
+
+    def nested():
+        pass
+
+
+class Foo:
+    attribute = 1
+
+    def method(self):
+        pass
+
+    class Bar:
+        async def run(self):
+            pass
+'''
+
+
+def _bump_mtime(path):
+    mtime = os.stat(path).st_mtime + 10
+    os.utime(path, (mtime, mtime))
+
+
+def _names(index):
+    return [(os.path.basename(path), s.name) for path, s in index.symbols()]
+
+
+def test_parse_symbols():
+    assert parse_symbols(_SOURCE) == [
+        Symbol(SymbolKind.variable, 'VERSION', 3, 0, ''),
+        Symbol(SymbolKind.variable, 'a', 4, 0, ''),
+        Symbol(SymbolKind.variable, 'b', 4, 4, ''),
+        Symbol(SymbolKind.variable, 'c', 4, 7, ''),
+        Symbol(SymbolKind.variable, 'x', 5, 0, ''),
+        Symbol(SymbolKind.function, 'main', 8, 0, ''),
+        Symbol(SymbolKind.cls, 'Foo', 15, 0, ''),
+        Symbol(SymbolKind.method, 'method', 18, 4, 'Foo'),
+        Symbol(SymbolKind.cls, 'Bar', 21, 4, 'Foo'),
+        Symbol(SymbolKind.method, 'run', 22, 8, 'Foo.Bar'),
+    ]
+
+
+def test_parse_symbols_syntax_error():
+    with pytest.raises(SyntaxError):
+        parse_symbols('def')
+
+
+def test_deeply_nested_source_is_skipped(monkeypatch):
+    assert symbol._parse_file(b'x = ' + b'-' * 200000 + b'1') == []
+
+    def parse(text):
+        raise RecursionError()
+
+    monkeypatch.setattr(symbol, 'parse_symbols', parse)
+    assert symbol._parse_file(b'x = 1') == []
+
+
+@pytest.fixture
+def files(write_file):
+    return [
+        write_file('a.py', 'def foo():\n    pass\n'),
+        write_file('b.py', 'class Bar:\n    pass\n'),
+        write_file('c.py', 'def')
+    ]
+
+
+def test_update(files):
+    index = SymbolIndex()
+
+    assert index.update(files)
+    assert len(index) == 3
+    assert _names(index) == [('a.py', 'foo'), ('b.py', 'Bar')]
+    assert not index.update(files)
+
+    assert index.update(files[:1])
+    assert _names(index) == [('a.py', 'foo')]
+
+
+def test_update_parses_changed_content_only(files, monkeypatch):
+    index = SymbolIndex()
+    index.update(files)
+
+    parsed = []
+
+    def counting_parse(text):
+        parsed.append(text)
+        return parse_symbols(text)
+
+    monkeypatch.setattr(symbol, 'parse_symbols', counting_parse)
+
+    # Modification time changed, content not
+    _bump_mtime(files[0])
+    assert index.update(files)
+    assert parsed == []
+
+    with open(files[1], 'w') as output:
+        output.write('class Baz:\n    pass\n')
+    _bump_mtime(files[1])
+
+    assert index.update(files)
+    assert len(parsed) == 1
+    assert _names(index) == [('a.py', 'foo'), ('b.py', 'Baz')]
+
+
+def test_update_with_executor(files):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        index = SymbolIndex(executor=executor)
+        index.update(files)
+
+    assert _names(index) == [('a.py', 'foo'), ('b.py', 'Bar')]
+
+
+def test_update_check_cancels_update(files):
+    class Cancelled(Exception):
+        pass
+
+    def check():
+        raise Cancelled()
+
+    index = SymbolIndex()
+    with pytest.raises(Cancelled):
+        index.update(files, check)
+
+    assert len(index) == 0
+
+
+def test_persistence(tmpdir, files):
+    cache_path = os.path.join(str(tmpdir), 'symbols.json')
+
+    index = SymbolIndex(cache_path)
+    index.update(files)
+    index.save()
+
+    index = SymbolIndex(cache_path)
+    assert index.load()
+    assert not index.update(files)
+    assert _names(index) == [('a.py', 'foo'), ('b.py', 'Bar')]
+    assert list(index.symbols())[0][1] == Symbol(SymbolKind.function, 'foo', 1, 0, '')
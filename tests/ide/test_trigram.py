@@ -0,0 +1,211 @@
+#!python3
+
+import os
+import pytest
+from blackmamba.ide.trigram import TrigramIndex, Query, trigrams, regex_literals
+
+
+def _bump_mtime(path):
+    mtime = os.stat(path).st_mtime + 10
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def files(write_file):
+    return [
+        write_file('a.py', 'import os\n\ndef hello():\n    print("Hello")\n'),
+        write_file('b.py', 'def world():\n    return 42\n'),
+        write_file('c.txt', 'hello world\n')
+    ]
+
+
+def test_trigrams():
+    assert trigrams('AbcD') == {'abc', 'bcd'}
+    assert trigrams('ab') == set()
+
+
+@pytest.mark.parametrize('pattern,expected', [
+    ('hello', ['hello']),
+    ('def \\w+\\(', ['def ', '(']),
+    ('ab*c', ['a', 'c']),
+    ('(foo)bar', ['foobar']),
+    ('foo|bar', []),
+    ('x(foo|bar)y', ['x', 'y']),
+    ('[', []),
+])
+def test_regex_literals(pattern, expected):
+    assert regex_literals(pattern) == expected
+
+
+def test_candidates(files):
+    index = TrigramIndex()
+    assert index.update(files)
+    assert len(index) == 3
+
+    assert index.candidates(Query('hello')) == [files[0], files[2]]
+    assert index.candidates(Query('WORLD')) == [files[1], files[2]]
+    assert index.candidates(Query('xyz')) == []
+    # Too short to use the index
+    assert index.candidates(Query('he')) == sorted(files)
+
+
+def test_search(files):
+    index = TrigramIndex()
+    index.update(files)
+
+    assert list(index.search(Query('hello'))) == [
+        (files[0], 3, 'def hello():'),
+        (files[0], 4, '    print("Hello")'),
+        (files[2], 1, 'hello world')
+    ]
+    assert list(index.search(Query('Hello', ignore_case=False))) == [
+        (files[0], 4, '    print("Hello")')
+    ]
+    assert list(index.search(Query('def \\w+\\(\\):', regex=True))) == [
+        (files[0], 3, 'def hello():'),
+        (files[1], 1, 'def world():')
+    ]
+
+
+def test_search_skips_searched_files(files):
+    index = TrigramIndex()
+    index.update(files)
+
+    searched = {}
+    assert len(list(index.search(Query('hello'), searched=searched))) == 3
+    assert sorted(searched) == [files[0], files[2]]
+    assert list(index.search(Query('hello'), searched=searched)) == []
+
+    _bump_mtime(files[2])
+    assert list(index.search(Query('hello'), searched=searched)) == [(files[2], 1, 'hello world')]
+
+
+def test_search_paths(files):
+    index = TrigramIndex()
+    index.update(files)
+
+    assert list(index.search(Query('hello'), paths={files[2]})) == [(files[2], 1, 'hello world')]
+
+
+def test_chunked_update(files):
+    index = TrigramIndex()
+    assert index.update(files[:1], remove=False)
+    assert index.update(files[1:], remove=False)
+    assert len(index) == 3
+
+    assert not index.retain(set(files))
+    assert index.retain(set(files[:1]))
+    assert index.candidates(Query('hello')) == [files[0]]
+
+
+def test_search_lines_are_split_by_line_feed(write_file):
+    path = write_file('d.txt', 'a\x0cb\u2028c\r\nhello\n')
+    index = TrigramIndex()
+    index.update([path])
+
+    assert list(index.search(Query('hello'))) == [(path, 2, 'hello')]
+
+
+@pytest.mark.parametrize('text, regex', [
+    ('hello\nworld', False),
+    ('hello\\nworld', True)
+])
+def test_query_line_break(text, regex):
+    with pytest.raises(ValueError):
+        Query(text, regex=regex)
+
+
+def test_update_is_incremental(files):
+    index = TrigramIndex()
+    index.update(files)
+    assert not index.update(files)
+
+    with open(files[1], 'a') as output:
+        output.write('# hello\n')
+    _bump_mtime(files[1])
+
+    assert index.update(files)
+    assert index.candidates(Query('hello')) == sorted(files)
+    assert index.candidates(Query('return 42')) == [files[1]]
+
+    assert index.update(files[:1])
+    assert index.candidates(Query('hello')) == [files[0]]
+    assert files[1] not in index
+
+
+def test_compaction(files):
+    index = TrigramIndex()
+    index.update(files)
+
+    for _ in range(3):
+        for path in files:
+            _bump_mtime(path)
+        index.update(files)
+
+    assert len(index._documents) <= 2 * len(files)
+    assert index.candidates(Query('world')) == [files[1], files[2]]
+
+
+def test_binary_files_are_skipped(tmpdir, files):
+    path = os.path.join(str(tmpdir), 'binary')
+    with open(path, 'wb') as output:
+        output.write(b'hello\0world')
+
+    index = TrigramIndex()
+    index.update(files + [path])
+
+    assert path in index
+    assert path not in index.candidates(Query('hello'))
+
+
+def test_large_files_are_always_candidates(monkeypatch, tmpdir, write_file, files):
+    monkeypatch.setattr('blackmamba.ide.trigram.MAX_FILE_SIZE', 64)
+    path = write_file('large.txt', 'x = 1\n' * 20 + 'hello\n')
+    cache_path = os.path.join(str(tmpdir), 'index.pickle')
+
+    index = TrigramIndex(cache_path)
+    index.update(files + [path])
+    assert index.candidates(Query('hello')) == [files[0], files[2], path]
+    assert index.candidates(Query('xyz')) == [path]
+    assert list(index.search(Query('hello'), paths={path})) == [(path, 21, 'hello')]
+
+    index.save()
+    index = TrigramIndex(cache_path)
+    assert index.load()
+    assert index.candidates(Query('xyz')) == [path]
+
+    for _ in range(3):
+        for f in files:
+            _bump_mtime(f)
+        index.update(files + [path])
+    assert index.candidates(Query('xyz')) == [path]
+
+    index.update(files)
+    assert index.candidates(Query('xyz')) == []
+
+
+def test_persistence(tmpdir, files):
+    cache_path = os.path.join(str(tmpdir), 'index.pickle')
+
+    index = TrigramIndex(cache_path)
+    index.update(files)
+    index.save()
+
+    index = TrigramIndex(cache_path)
+    assert index.load()
+    assert not index.update(files)
+    assert index.candidates(Query('hello')) == [files[0], files[2]]
+
+
+def test_update_check_cancels_update(files):
+    class Cancelled(Exception):
+        pass
+
+    def check():
+        raise Cancelled()
+
+    index = TrigramIndex()
+    with pytest.raises(Cancelled):
+        index.update(files, check)
+
+    assert index.update(files)
@@ -0,0 +1,166 @@
+#!python3
+
+import os
+from blackmamba.ide.workspace import Workspace
+
+
+_IGNORE_FOLDERS = {
+    '': ['.git'],
+    '.': ['Examples']
+}
+
+
+_TREE = ['x.py', 'x.txt', 'a/y.py', 'a/.hidden/h.py', 'a/b/z.md', 'a/stash/s.py',
+         '.git/config', 'Examples/e.py']
+
+
+def _relative(root, paths):
+    return sorted(os.path.relpath(p, root) for p in paths)
+
+
+def test_files_view(tmpdir, make_tree):
+    make_tree(_TREE)
+    root = str(tmpdir)
+
+    ws = Workspace(_IGNORE_FOLDERS)
+    view = ws.view(root, allow_file=lambda folder, name: not name.startswith('.'))
+    ws.update()
+    files = [os.path.join(folder, name) for folder, name in view.files()]
+
+    assert _relative(root, files) == ['a/.hidden/h.py', 'a/b/z.md', 'a/stash/s.py', 'a/y.py', 'x.py', 'x.txt']
+
+
+def test_python_files_view(tmpdir, make_tree):
+    make_tree(_TREE)
+    root = str(tmpdir)
+
+    ws = Workspace(_IGNORE_FOLDERS)
+    view = ws.view(root, allow_file=lambda folder, name: name.endswith('.py'))
+    ws.update()
+    files = [os.path.join(folder, name) for folder, name in view.files()]
+
+    assert _relative(root, files) == ['a/.hidden/h.py', 'a/stash/s.py', 'a/y.py', 'x.py']
+
+
+def test_folders_view(tmpdir, make_tree):
+    make_tree(_TREE)
+    root = str(tmpdir)
+
+    ws = Workspace(_IGNORE_FOLDERS)
+    view = ws.view(root, ignore_folders={'a': ['stash']}, ignore_hidden=True)
+    ws.update()
+
+    assert _relative(root, view.subfolders(root)) == ['a']
+    assert _relative(root, view.subfolders(os.path.join(root, 'a'))) == ['a/b']
+
+
+def test_views_share_index(tmpdir, make_tree):
+    make_tree(_TREE)
+    root = str(tmpdir)
+
+    ws = Workspace(_IGNORE_FOLDERS)
+    assert ws.view(root).index is ws.view(root, ignore_hidden=True).index
+
+
+def test_update(tmpdir, write_file, make_tree):
+    make_tree(_TREE)
+    root = str(tmpdir)
+
+    ws = Workspace(_IGNORE_FOLDERS)
+    view = ws.view(root)
+
+    # Index without cache is empty until revalidated
+    assert not list(view.files())
+    assert ws.update()
+    assert not ws.update()
+
+    write_file(os.path.join(root, 'new.py'))
+    mtime = os.stat(root).st_mtime + 10
+    os.utime(root, (mtime, mtime))
+
+    assert ws.update()
+    assert 'new.py' in [name for _, name in view.files()]
+
+
+def test_refresh_subtree(tmpdir, make_tree):
+    make_tree(_TREE)
+    root = str(tmpdir)
+
+    ws = Workspace(_IGNORE_FOLDERS)
+    view = ws.view(root)
+    ws.update()
+    folder = os.path.join(root, 'a', 'b')
+
+    os.makedirs(os.path.join(folder, 'c'))
+    assert view.refresh(folder)
+    assert _relative(root, view.subfolders(folder)) == ['a/b/c']
+    assert not view.refresh(folder)
+
+
+def test_persistent_index(tmpdir, make_tree):
+    root = tmpdir.mkdir('root')
+    make_tree(_TREE, root)
+    cache_folder = str(tmpdir.mkdir('cache'))
+
+    ws = Workspace(_IGNORE_FOLDERS, cache_folder)
+    ws.index(str(root))
+    ws.update()
+    assert len(os.listdir(cache_folder)) == 1
+
+    index = Workspace(_IGNORE_FOLDERS, cache_folder).index(str(root))
+    assert not index.is_empty
+
+
+def test_walk(tmpdir, make_tree):
+    make_tree(_TREE)
+    root = str(tmpdir)
+
+    ws = Workspace(_IGNORE_FOLDERS)
+    view = ws.view(root, allow_file=lambda folder, name: name.endswith('.py'), ignore_hidden=True)
+
+    walk = view.walk()
+    folder, files = next(walk)
+    assert folder == root
+    assert files == ['x.py']
+
+    # Index is not modified until the walk is finished
+    assert view.index.is_empty
+
+    files = [os.path.join(folder, name) for folder, names in walk for name in names]
+    assert _relative(root, files) == ['a/stash/s.py', 'a/y.py']
+    assert not view.index.is_empty
+    assert not ws.update()
+
+
+def test_walk_does_not_block_refresh(tmpdir, make_tree):
+    make_tree(_TREE)
+    root = str(tmpdir)
+
+    ws = Workspace(_IGNORE_FOLDERS)
+    view = ws.view(root)
+
+    walk = view.walk()
+    next(walk)
+
+    # Would deadlock if the walk held the index lock
+    assert view.refresh()
+    assert ws.update() is False
+    walk.close()
+
+    assert not view.index.is_empty
+
+
+def test_gitignore_view(tmpdir, make_tree):
+    make_tree(_TREE)
+    root = str(tmpdir)
+    tmpdir.join('a', '.gitignore').write('stash/\n*.md\n')
+
+    ws = Workspace(_IGNORE_FOLDERS)
+    view = ws.view(root, gitignore=True)
+    ws.update()
+
+    files = [os.path.join(folder, name) for folder, name in view.files()]
+    assert _relative(root, files) == ['a/.gitignore', 'a/.hidden/h.py', 'a/y.py', 'x.py', 'x.txt']
+
+    # Other views are not affected
+    assert len(list(ws.view(root).files())) == 7
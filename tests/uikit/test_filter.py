@@ -0,0 +1,182 @@
+#!python3
+
+import pytest
+from blackmamba.uikit.filter import ItemFilter, search_terms, narrows
+from blackmamba.uikit.store import ItemStore
+
+
+class _Item:
+    def __init__(self, value):
+        self.match_value = value
+
+    def __lt__(self, other):
+        return self.match_value < other.match_value
+
+
+def _values(result):
+    return [i.match_value for i in result.items]
+
+
+def test_search_terms():
+    assert search_terms(None) == ()
+    assert search_terms('  ') == ()
+    assert search_terms(' Foo  bAr ') == ('foo', 'bar')
+
+
+def test_narrows():
+    assert narrows(('ab',), ('a',))
+    assert narrows(('ab',), ('ab',))
+    assert narrows(('a', 'b'), ('a',))
+    assert narrows(('a', 'bc'), ('a', 'b'))
+    assert not narrows(('a',), ('ab',))
+    assert not narrows(('a',), ('a', 'b'))
+    assert not narrows(('x', 'b'), ('a', 'b'))
+    assert not narrows(('a',), ())
+
+
+def test_filter():
+    f = ItemFilter([_Item(v) for v in ['abc', 'abd', 'xab', 'a/b/c']])
+
+    assert _values(f.filter('')) == ['abc', 'abd', 'xab', 'a/b/c']
+    assert _values(f.filter('ab')) == ['abc', 'abd', 'xab', 'a/b/c']
+    assert _values(f.filter('a c')) == ['abc', 'a/b/c']
+    assert _values(f.filter('x b')) == ['xab']
+    assert _values(f.filter('b a')) == []
+
+
+def test_filter_orders_by_score():
+    f = ItemFilter([_Item(v) for v in ['a/b/c', 'abc', 'xabc', 'x/abc']])
+
+    assert _values(f.filter('abc')) == ['abc', 'x/abc', 'xabc', 'a/b/c']
+
+
+def test_filter_limit():
+    f = ItemFilter([_Item(v) for v in ['xab', 'ab', 'x/ab', 'yab']], limit=2)
+
+    assert _values(f.filter('ab')) == ['ab', 'x/ab']
+    assert len(f.filter('')) == 4
+    assert f.filter('').items is f.items
+
+
+def test_match_positions():
+    f = ItemFilter([_Item(v) for v in ['folder/open_quickly.py', 'other.py']])
+
+    assert f.filter('').match_positions(0) is None
+
+    result = f.filter('oq')
+    assert result.match_positions(0) == [7, 12]
+    assert result.match_positions(1) is None
+
+
+def test_filter_check_cancels_filtering():
+    class _Cancelled(Exception):
+        pass
+
+    def check():
+        raise _Cancelled()
+
+    f = ItemFilter([_Item(v) for v in ['abc', 'abd']])
+
+    with pytest.raises(_Cancelled):
+        f.filter('a', check)
+
+    assert _values(f.filter('ab')) == ['abc', 'abd']
+
+
+def test_result_keeps_previous_items():
+    f = ItemFilter([_Item('abc')])
+    result = f.filter('a')
+    f.items = [_Item('xyz')]
+
+    assert _values(result) == ['abc']
+    assert result.match_positions(0) == [0]
+
+
+def _count_matches(monkeypatch):
+    scanned = []
+    original = ItemStore.search
+
+    def counting_search(self, regex, candidates=None, check=None):
+        scanned.extend(range(len(self)) if candidates is None else candidates)
+        return original(self, regex, candidates, check)
+
+    monkeypatch.setattr(ItemStore, 'search', counting_search)
+    return scanned
+
+
+def test_filter_narrows_previous_result(monkeypatch):
+    scanned = _count_matches(monkeypatch)
+    f = ItemFilter([_Item(v) for v in ['abc', 'abd', 'xyz']])
+
+    assert _values(f.filter('a')) == ['abc', 'abd']
+    assert len(scanned) == 3
+
+    assert _values(f.filter('ab')) == ['abc', 'abd']
+    assert _values(f.filter('abc')) == ['abc']
+    assert len(scanned) == 3 + 2 + 2
+
+
+def test_filter_backspace_uses_cached_result(monkeypatch):
+    scanned = _count_matches(monkeypatch)
+    f = ItemFilter([_Item(v) for v in ['abc', 'abd', 'xyz']])
+
+    f.filter('a')
+    f.filter('ab')
+    f.filter('abc')
+    count = len(scanned)
+
+    assert _values(f.filter('ab')) == ['abc', 'abd']
+    assert _values(f.filter('a')) == ['abc', 'abd']
+    assert len(scanned) == count
+
+
+def test_filter_new_items_reset_cache():
+    f = ItemFilter([_Item('abc')])
+    assert _values(f.filter('a')) == ['abc']
+
+    f.items = [_Item('xyz'), _Item('ax')]
+    assert _values(f.filter('a')) == ['ax']
+
+
+def test_filter_extend():
+    f = ItemFilter([_Item('b'), _Item('d')])
+    f.extend([_Item('c'), _Item('a')])
+
+    assert _values(f.filter('')) == ['b', 'd', 'c', 'a']
+
+    f.extend([_Item('e')], sort=True)
+    assert _values(f.filter('')) == ['a', 'b', 'c', 'd', 'e']
+
+
+def test_filter_orders_ties_by_items_order():
+    f = ItemFilter([_Item('xab')], limit=2)
+    f.extend([_Item('yab'), _Item('wab')], sort=True)
+
+    assert _values(f.filter('ab')) == ['wab', 'xab']
+
+
+def test_filter_extend_scans_new_items_only(monkeypatch):
+    scanned = _count_matches(monkeypatch)
+    f = ItemFilter([_Item(v) for v in ['abc', 'abd', 'xyz']])
+
+    f.filter('a')
+    f.filter('ab')
+    count = len(scanned)
+
+    f.extend([_Item(v) for v in ['xab', 'axy', 'zzz']])
+    # 'a' scans all new items, 'ab' scans 'xab' & 'axy' only
+    assert len(scanned) == count + 3 + 2
+
+    assert _values(f.filter('ab')) == ['abc', 'abd', 'xab']
+    assert _values(f.filter('a')) == ['abc', 'abd', 'axy', 'xab']
+    assert len(scanned) == count + 3 + 2
+
+
+def test_filter_result_keeps_items_before_extend():
+    f = ItemFilter([_Item('abc')])
+    result = f.filter('')
+
+    f.extend([_Item('abd')], sort=True)
+
+    assert _values(result) == ['abc']
+    assert result.source is not f.items
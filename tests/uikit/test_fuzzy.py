@@ -0,0 +1,53 @@
+#!python3
+
+from blackmamba.uikit.fuzzy import BoundaryTable, FuzzyMatcher, top, SEPARATOR_BONUS, WORD_BONUS
+
+
+def _match(query, value):
+    return FuzzyMatcher(query.split(' ')).match(value, BoundaryTable(value))
+
+
+def test_boundary_table():
+    table = BoundaryTable('ab/cd_ef.py')
+
+    assert table.bonuses[0] == SEPARATOR_BONUS
+    assert table.bonuses[3] == SEPARATOR_BONUS
+    assert table.bonuses[6] == WORD_BONUS
+    assert table.bonuses[9] == WORD_BONUS
+    assert table.boundaries == {'a': 0, 'c': 3, 'e': 6, 'p': 9}
+    assert table.basename == 3
+
+
+def test_matches():
+    m = FuzzyMatcher(['oq'])
+
+    assert m.matches('open_quickly.py')
+    assert m.matches('o/q')
+    assert not m.matches('qo')
+    assert FuzzyMatcher(['a', 'b']).matches('xaxb')
+    assert FuzzyMatcher(['a.b']).matches('a.b')
+    assert not FuzzyMatcher(['a.b']).matches('axb')
+
+
+def test_match_prefers_boundaries():
+    assert _match('oq', 'too/open_quickly.py')[1] == [4, 9]
+
+
+def test_match_prefers_basename():
+    assert _match('ab', 'ab/x/ab.py')[1] == [5, 6]
+
+
+def test_consecutive_characters_score_higher():
+    assert _match('abc', 'abc')[0] > _match('abc', 'axbxc')[0]
+
+
+def test_no_match():
+    assert _match('abc', 'acb') is None
+
+
+def test_top():
+    scored = [(1, 0), (5, 1), (3, 2), (5, 3)]
+
+    assert top(scored, 2) == [1, 3]
+    assert top(scored, None) == [1, 3, 2, 0]
+    assert top(scored, None, lambda i: -i) == [3, 1, 2, 0]
@@ -0,0 +1,66 @@
+#!python3
+
+import re
+from blackmamba.uikit.store import ItemStore
+
+
+def test_values():
+    store = ItemStore(['abc', '', 'd\ne'])
+
+    assert len(store) == 3
+    assert store.value(0) == 'abc'
+    assert store.value(1) == ''
+    assert store.value(2) == 'd e'
+
+
+def test_empty_store():
+    store = ItemStore()
+
+    assert len(store) == 0
+    assert store.search(re.compile('a')) == []
+
+
+def test_search():
+    store = ItemStore(['abc', 'xaxa', 'bcd', 'a'])
+    regex = re.compile('a')
+
+    assert store.search(regex) == [0, 1, 3]
+    assert store.search(regex, [1, 2]) == [1]
+
+
+def test_search_does_not_cross_values():
+    store = ItemStore(['xa', 'bx'])
+
+    assert store.search(re.compile('a[^b\n]*b')) == []
+    assert store.search(re.compile('a[^b\n]*b'), [0, 1]) == []
+    assert store.search(re.compile('a'), [1]) == []
+
+
+def test_table():
+    store = ItemStore(['a/b'])
+
+    assert store.table(0) is store.table(0)
+    assert store.table(0).basename == 2
+
+
+def test_extend():
+    store = ItemStore(['abc'])
+    regex = re.compile('b')
+
+    store.extend(['xbx', 'd\ne'])
+    store.extend([])
+
+    assert len(store) == 3
+    assert store.value(1) == 'xbx'
+    assert store.value(2) == 'd e'
+    assert store.search(regex) == [0, 1]
+    assert store.search(regex, range(1, 3)) == [1]
+    assert store.table(1).basename == 0
+
+
+def test_extend_empty_store():
+    store = ItemStore()
+    store.extend(['a'])
+
+    assert store.value(0) == 'a'
+    assert store.search(re.compile('a')) == [0]
@@ -0,0 +1,43 @@
+#!python3
+
+from blackmamba.uikit.stream import batches, merge_sorted
+
+
+class _Clock:
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
+
+
+def test_batches_grow():
+    result = list(batches(range(20), size=2, max_size=8, interval=10))
+
+    assert [len(b) for b in result] == [2, 4, 8, 6]
+    assert [i for b in result for i in b] == list(range(20))
+
+
+def test_batches_interval():
+    clock = _Clock()
+
+    def items():
+        yield 1
+        clock.time = 1.0
+        yield 2
+        yield 3
+
+    assert list(batches(items(), size=100, interval=0.5, clock=clock)) == [[1, 2], [3]]
+
+
+def test_batches_empty():
+    assert list(batches([])) == []
+
+
+def test_merge_sorted():
+    items = [1, 3, 5]
+
+    assert merge_sorted(items, [4, 2, 6]) == [1, 2, 3, 4, 5, 6]
+    assert items == [1, 3, 5]
+    assert merge_sorted([], [2, 1]) == [1, 2]
+    assert merge_sorted(['b', 'C'], ['a'], key=str.lower) == ['a', 'b', 'C']
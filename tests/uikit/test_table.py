@@ -0,0 +1,76 @@
+#!python3
+
+from blackmamba.uikit.table import CellPool
+
+
+class _FakeCell:
+    def __init__(self, style):
+        self.style = style
+        self.text = None
+
+
+class _FakeUI:
+    """Minimal fake of the ui module."""
+    def __init__(self):
+        self.created = []
+
+    def TableViewCell(self, style):
+        cell = _FakeCell(style)
+        self.created.append(cell)
+        return cell
+
+
+def test_cell_for_the_same_row_is_reused():
+    ui = _FakeUI()
+    pool = CellPool(ui.TableViewCell)
+
+    cell = pool.cell('subtitle', 0)
+    assert pool.cell('subtitle', 0) is cell
+    assert len(ui.created) == 1
+
+
+def test_cells_are_created_up_to_capacity():
+    ui = _FakeUI()
+    pool = CellPool(ui.TableViewCell, capacity=3)
+
+    cells = [pool.cell('subtitle', row) for row in range(3)]
+    assert len(set(map(id, cells))) == 3
+
+    # Scroll down, least recently used cell (row 0) is reused
+    assert pool.cell('subtitle', 3) is cells[0]
+    assert pool.cell('subtitle', 4) is cells[1]
+    assert len(ui.created) == 3
+
+
+def test_recently_used_cells_are_kept():
+    ui = _FakeUI()
+    pool = CellPool(ui.TableViewCell, capacity=2)
+
+    first = pool.cell('subtitle', 0)
+    second = pool.cell('subtitle', 1)
+    pool.cell('subtitle', 0)
+
+    assert pool.cell('subtitle', 2) is second
+    assert pool.cell('subtitle', 0) is first
+
+
+def test_pools_are_separated_by_style():
+    ui = _FakeUI()
+    pool = CellPool(ui.TableViewCell, capacity=1)
+
+    subtitle = pool.cell('subtitle', 0)
+    default = pool.cell('default', 0)
+
+    assert subtitle.style == 'subtitle'
+    assert default.style == 'default'
+    assert pool.cell('subtitle', 1) is subtitle
+
+
+def test_clear():
+    ui = _FakeUI()
+    pool = CellPool(ui.TableViewCell)
+
+    cell = pool.cell('subtitle', 0)
+    pool.clear()
+
+    assert pool.cell('subtitle', 0) is not cell
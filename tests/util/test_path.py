@@ -0,0 +1,26 @@
+#!python3
+
+import os
+from blackmamba.util.path import find_project_root
+
+
+def test_find_project_root(tmpdir):
+    top = str(tmpdir)
+    package = os.path.join(top, 'project', 'package')
+    os.makedirs(package)
+    path = os.path.join(package, 'module.py')
+
+    assert find_project_root(path, top) == package
+
+    with open(os.path.join(top, 'project', 'setup.py'), 'wt') as output:
+        output.write('')
+    assert find_project_root(path, top) == os.path.join(top, 'project')
+
+
+def test_find_project_root_stops_at_top(tmpdir):
+    top = os.path.join(str(tmpdir), 'documents')
+    package = os.path.join(top, 'package')
+    os.makedirs(package)
+    os.makedirs(os.path.join(str(tmpdir), '.git'))
+
+    assert find_project_root(os.path.join(package, 'module.py'), top) == package
@@ -0,0 +1,90 @@
+#!python3
+
+import threading
+import time
+from blackmamba.util.worker import Worker
+
+
+def test_submit():
+    results = []
+    worker = Worker()
+
+    worker.submit(lambda token: 1, results.append)
+    assert worker.wait(5)
+    assert results == [1]
+
+
+def test_debounce_runs_latest_job_only():
+    results = []
+    executed = []
+    worker = Worker(0.2)
+
+    def make_job(value):
+        def job(token):
+            executed.append(value)
+            return value
+        return job
+
+    for i in range(5):
+        worker.submit(make_job(i), results.append)
+
+    assert worker.wait(5)
+    assert executed == [4]
+    assert results == [4]
+
+
+def test_newer_job_cancels_running_job():
+    results = []
+    started = threading.Event()
+    worker = Worker()
+
+    def slow_job(token):
+        started.set()
+        while True:
+            token.check()
+            time.sleep(0.01)
+
+    worker.submit(slow_job, results.append)
+    assert started.wait(5)
+
+    worker.submit(lambda token: 'fast', results.append)
+    assert worker.wait(5)
+    assert results == ['fast']
+
+
+def test_cancel():
+    results = []
+    worker = Worker(0.2)
+
+    generation = worker.submit(lambda token: 1, results.append)
+    worker.cancel()
+
+    assert worker.wait(5)
+    assert not worker.is_current(generation)
+    assert results == []
+
+
+def test_cancelled_result_is_not_published():
+    results = []
+    worker = Worker()
+
+    def job(token):
+        worker.cancel()
+        return 1
+
+    worker.submit(job, results.append)
+    assert worker.wait(5)
+    assert results == []
+
+
+def test_failing_job_does_not_stop_worker(capsys):
+    results = []
+    worker = Worker()
+
+    worker.submit(lambda token: 1 / 0, results.append)
+    assert worker.wait(5)
+
+    worker.submit(lambda token: 2, results.append)
+    assert worker.wait(5)
+    assert results == [2]
+    assert 'ZeroDivisionError' in capsys.readouterr().out